@@ -3,7 +3,7 @@ import os
 import re
 import time
 from pathlib import Path
-from typing import AsyncGenerator, Literal
+from typing import AsyncGenerator, Literal, Optional
 from urllib.parse import urlparse
 
 from arclet.alconna import Alconna, AllParam, Args
@@ -24,15 +24,23 @@ from nonebot_plugin_alconna import (
 from nonebot_plugin_alconna.builtins.extensions import ReplyRecordExtension
 from nonebot_plugin_session import SessionIdType, extract_session
 
-from .config import load_embedding_model_config
+from .config import load_embedding_model_config, mas_config
 from .core import UserMessagePayload, muika
+from .core.actions.rss import parser_pool, rss_fetcher, rss_prefetcher
 from .core.events import UserMessageEvent
 from .llm import ModelCompletions, ModelStreamCompletions
 from .models import Message, Resource
 from .plugin import load_plugins
 from .plugin.mcp import initialize_servers
+from .utils.segmenter import StreamSegmenter
 from .utils.SessionManager import SessionManager
-from .utils.utils import download_file, get_file_via_adapter
+from .utils.utils import (
+    cached_file_store,
+    download_file,
+    downloader,
+    file_store,
+    get_file_via_adapter,
+)
 
 COMMAND_PREFIXES = [".", "/"]
 PLUGINS_PATH = Path("./plugins")
@@ -42,6 +50,8 @@ START_TIME = time.time()
 connect_time = 0.0
 driver = get_driver()
 session_manager = SessionManager()
+download_semaphore = asyncio.Semaphore(mas_config.max_concurrent_downloads)
+"""全局下载并发限制"""
 
 
 def startup_plugins():
@@ -77,6 +87,18 @@ async def startup():
     logger.success("MAS 主框架已准备就绪✨")
 
 
+@driver.on_shutdown
+async def shutdown():
+    await muika.executor.scheduler.stop()
+    await muika.memory.writer.stop()
+    await rss_prefetcher.stop()
+    await rss_fetcher.close()
+    parser_pool.shutdown()
+    await downloader.close()
+    await file_store.save()
+    await cached_file_store.save()
+
+
 @driver.on_bot_connect
 async def bot_connected():
     logger.success("Bot 已连接，消息处理进程开始运行✨")
@@ -115,52 +137,79 @@ def _get_media_filename(media: uniseg.segment.Media, type: Literal["audio", "ima
 
 
 async def _extract_multi_resource(
-    message: UniMessage, type: Literal["audio", "image", "video", "file"], event: Event
-) -> list[Resource]:
+    resource: uniseg.segment.Media,
+    type: Literal["audio", "image", "video", "file"],
+    event: Event,
+    semaphore: asyncio.Semaphore,
+) -> Optional[Resource]:
     """
     提取单个多模态文件
+
+    :param semaphore: 单条消息内的下载并发限制
     """
-    resources = []
+    try:
+        if resource.path is not None:
+            path = str(resource.path)
+        elif resource.url is not None:
+            async with semaphore, download_semaphore:
+                path = await asyncio.wait_for(
+                    download_file(
+                        resource.url,
+                        file_name=_get_media_filename(resource, type),
+                        max_size=mas_config.max_download_size,
+                    ),
+                    timeout=mas_config.download_timeout,
+                )
+        elif resource.origin is not None:
+            logger.warning("无法通过通用方式获取文件URL，回退至适配器自有方式...")
+            async with semaphore, download_semaphore:
+                path = await asyncio.wait_for(
+                    get_file_via_adapter(resource.origin, event),  # type:ignore
+                    timeout=mas_config.download_timeout,
+                )
+        else:
+            return None
 
-    for resource in message:
-        assert isinstance(resource, uniseg.segment.Media)  # 正常情况下应该都是 Media 的子类
+        if not path:
+            return None
 
-        try:
-            if resource.path is not None:
-                path = str(resource.path)
-            elif resource.url is not None:
-                path = await download_file(resource.url, file_name=_get_media_filename(resource, type))
-            elif resource.origin is not None:
-                logger.warning("无法通过通用方式获取文件URL，回退至适配器自有方式...")
-                path = await get_file_via_adapter(resource.origin, event)  # type:ignore
-            else:
-                continue
+        result = Resource(type, path=path)
+        await result.ensure_mimetype_async()
+        return result
 
-            if path:
-                resources.append(Resource(type, path=path))
-        except Exception as e:
-            logger.error(f"处理文件失败: {e}")
+    except asyncio.TimeoutError:
+        logger.error(f"处理文件超时 ({mas_config.download_timeout}s): {resource}")
+    except Exception as e:
+        logger.error(f"处理文件失败: {e}")
 
-    return resources
+    return None
 
 
 async def _extract_multi_resources(message: UniMsg, event: Event) -> list[Resource]:
     """
-    提取多个多模态文件
+    并发提取多个多模态文件（结果顺序与消息中的顺序一致）
     """
-    resources = []
+    semaphore = asyncio.Semaphore(mas_config.max_downloads_per_message)
 
     message_audio = message.get(uniseg.Audio) + message.get(uniseg.Voice)
     message_images = message.get(uniseg.Image)
     message_file = message.get(uniseg.File)
     message_video = message.get(uniseg.Video)
 
-    resources.extend(await _extract_multi_resource(message_audio, "audio", event))
-    resources.extend(await _extract_multi_resource(message_file, "file", event))
-    resources.extend(await _extract_multi_resource(message_images, "image", event))
-    resources.extend(await _extract_multi_resource(message_video, "video", event))
+    jobs = []
+    for segments, type in (
+        (message_audio, "audio"),
+        (message_file, "file"),
+        (message_images, "image"),
+        (message_video, "video"),
+    ):
+        for resource in segments:
+            assert isinstance(resource, uniseg.segment.Media)  # 正常情况下应该都是 Media 的子类
+            jobs.append(_extract_multi_resource(resource, type, event, semaphore))  # type:ignore
+
+    results = await asyncio.gather(*jobs)
 
-    return resources
+    return [resource for resource in results if resource is not None]
 
 
 async def _send_multi_messages(resource: Resource):
@@ -199,27 +248,22 @@ async def _send_message(completions: ModelCompletions | AsyncGenerator[ModelStre
         raise FinishedException
 
     # stream
-    current_paragraph = ""
+    segmenter = StreamSegmenter(
+        flush_interval=mas_config.stream_flush_interval, max_length=mas_config.stream_max_segment_length
+    )
 
     async for chunk in completions:
         logger.debug(chunk)
-        current_paragraph += chunk.chunk
-        paragraphs = current_paragraph.split("\n\n")
 
-        while len(paragraphs) > 1:
-            current_paragraph = paragraphs[0].strip()
-            if current_paragraph:
-                await UniMessage(current_paragraph).send()
-            paragraphs = paragraphs[1:]
-
-        current_paragraph = paragraphs[-1].strip()
+        for paragraph in segmenter.feed(chunk.chunk):
+            await UniMessage(paragraph).send()
 
         if chunk.resources:
             for resource in chunk.resources:
                 await _send_multi_messages(resource)
 
-    if current_paragraph:
-        await UniMessage(current_paragraph).finish()
+    if last_paragraph := segmenter.close():
+        await UniMessage(last_paragraph).finish()
 
 
 @at_event.handle()
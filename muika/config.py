@@ -14,9 +14,11 @@ from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 from watchdog.observers.api import BaseObserver
 
-from .llm import EmbeddingConfig, ModelConfig
+from .llm import EmbeddingConfig, ModelConfig, RouteRule
 
 MODELS_CONFIG_PATH = Path("configs/models.yml").resolve()
+ROUTING_KEY = "routing"
+"""`configs/models.yml` 中模型路由规则所在的保留项"""
 EMBEDDINGS_CONFIG_PATH = Path("configs/embeddings.yml").resolve()
 
 _model_config_manager: Optional["ModelConfigManager"] = None
@@ -29,6 +31,42 @@ class MASConfig(BaseModel):
 
     input_timeout: int = 0
     """输入等待时间"""
+    input_max_wait: float = 10
+    """合并消息的最长等待时间（秒），自首条消息起计算，避免连续发送的消息使处理被无限推迟"""
+    enable_rss_prefetch: bool = False
+    """是否在后台按各订阅源的更新间隔预取 RSS，并在出现新条目时通知 Muika（每次通知都会触发一次模型调用）"""
+    rss_max_items: int = 20
+    """检查 RSS 更新时最多报告的条目数，<= 0 则不限制"""
+    rss_description_max_tokens: int = 80
+    """检查 RSS 更新时每个条目描述的最大 Token 数，<= 0 则不截断"""
+    history_max_tokens: int = 1500
+    """思考时近期对话（包括摘要）的最大 Token 数，超出时较早的对话会被折叠为摘要，<= 0 则不限制"""
+    history_summary_max_tokens: int = 300
+    """近期对话摘要的最大 Token 数"""
+    history_summarize: bool = False
+    """是否由默认模型生成近期对话的摘要（每次折叠都会触发一次模型调用），否则在本地截断生成"""
+    message_flush_interval: float = 2.0
+    """对话消息批量写入数据库的间隔（秒）"""
+    message_flush_batch_size: int = 64
+    """待写入的对话消息达到该条数时立即写入数据库"""
+    stream_cognition: bool = False
+    """思考时是否使用流式输出：决定发送消息时，消息在动作字段完整后立即发送，无需等待记忆字段生成完毕"""
+    stream_flush_interval: float = 1.5
+    """流式输出时，待发送文本的最长等待时间（秒），超过后在句子边界处提前发送"""
+    stream_max_segment_length: int = 300
+    """流式输出时，单条消息的最大长度，超过后在句子边界处提前发送"""
+    max_concurrent_downloads: int = 8
+    """全局最大并发下载数"""
+    max_downloads_per_message: int = 4
+    """单条消息内的最大并发下载数"""
+    download_timeout: float = 30
+    """单个文件的下载超时时间（秒）"""
+    max_download_size: int = 50 * 1024 * 1024
+    """单个文件的最大下载大小（字节）"""
+    files_quota_mb: int = 2048
+    """多模态文件存储的容量配额（MB），<= 0 则不限制"""
+    files_max_age_days: int = 30
+    """多模态文件的最长保存时间（天），<= 0 则不限制"""
     enable_embedding_cache: bool = True
     """启用嵌入缓存"""
 
@@ -85,6 +123,8 @@ class ModelConfigManager:
         """所有模型配置"""
         self.default_config = None
         """默认模型配置（非主 Muice 使用模型）"""
+        self.routes: list[RouteRule] = []
+        """模型路由规则"""
         self.observer: Optional[BaseObserver] = None
         """文件监视器"""
         self._listeners: List[Callable] = []
@@ -103,8 +143,9 @@ class ModelConfigManager:
             raise FileNotFoundError("configs/models.yml 不存在！请先创建")
 
         with open(MODELS_CONFIG_PATH, "r", encoding="utf-8") as f:
-            configs_dict = yaml_.safe_load(f)
+            configs_dict = yaml_.safe_load(f) or {}
 
+        routes = configs_dict.pop(ROUTING_KEY, None) or []
         if not configs_dict:
             raise ValueError("configs/models.yml 为空，请先至少定义一个模型配置")
 
@@ -118,6 +159,12 @@ class ModelConfigManager:
             # 如果没有指定默认配置，使用第一个
             self.default_config = next(iter(self.configs.values()))
 
+        self.routes = [RouteRule(**route) for route in routes]
+        for route in self.routes:
+            for name in [route.model, *route.fallbacks]:
+                if name not in self.configs:
+                    raise ValueError(f"模型路由规则引用了不存在的模型配置 '{name}'")
+
     def _start_file_watcher(self):
         """启动文件监视器"""
         if self.observer is not None:
@@ -171,6 +218,10 @@ class ModelConfigManager:
             logger.warning(f"指定的模型配置 '{model_config_name}' 不存在！")
             raise ValueError(f"指定的模型配置 '{model_config_name}' 不存在！")
 
+    def get_routes(self) -> list[RouteRule]:
+        """获取模型路由规则"""
+        return self.routes
+
     def get_name_from_config(self, config: ModelConfig) -> str:
         """
         从配置对象获取配置名称
@@ -215,6 +266,15 @@ def get_model_config(model_config_name: Optional[str] = None) -> ModelConfig:
     return model_config_manager.get_model_config(model_config_name)
 
 
+def get_model_routes() -> list[RouteRule]:
+    """
+    从配置文件 `configs/models.yml` 的 `routing` 项中获取模型路由规则
+
+    :raise FileNotFoundError: 配置文件不存在
+    """
+    return get_model_config_manager().get_routes()
+
+
 def get_embedding_model_config(embedding_config_name: Optional[str] = None) -> EmbeddingConfig:
     """
     从配置文件 `configs/models.yml` 中获取指定模型的配置对象
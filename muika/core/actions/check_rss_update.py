@@ -2,10 +2,17 @@ from __future__ import annotations
 
 from nonebot import logger
 
+from muika.config import mas_config
+
 from ..intents import CheckRSSUpdateIntent
 from ..state import MuikaState
 from ._registry import register_action
-from .rss import RSS_SOURCES, fetch_web_content, parse_rss_feed
+from .rss import (
+    RSS_SOURCES,
+    rss_prefetcher,
+    seen_items,
+    truncate_to_tokens,
+)
 
 
 @register_action("check_rss_update")
@@ -16,14 +23,27 @@ async def handle_check_rss_update(intent: CheckRSSUpdateIntent, state: MuikaStat
         raise ValueError(f"Unknown RSS source: {intent.rss_source}")
 
     logger.debug(f"Checking RSS feed: {rss_source.url}")
-    feed_data = await fetch_web_content(rss_source.url)
-    feed_contents = parse_rss_feed(feed_data)
+    feed_contents = await rss_prefetcher.get_entries(rss_source)
     logger.debug(f"Fetched {len(feed_contents)} entries from RSS feed.")
 
-    feed_outlines = [f"# RSS Feed Update from {rss_source.name}: \n"]
-    for entry in feed_contents:
+    await seen_items.load()
+    entries = seen_items.filter_new(rss_source.id, feed_contents) if intent.only_new else feed_contents
+    max_items = mas_config.rss_max_items
+    reported = entries[:max_items] if max_items > 0 else entries
+
+    # 只将已报告的条目标记为已读，超出数量限制的条目留待下次报告
+    seen_items.mark_seen(rss_source.id, reported)
+    await seen_items.save()
+
+    if intent.only_new and not entries:
+        feed_outlines = [f"# RSS Feed Update from {rss_source.name}: \n", "No new entries since the last check."]
+    else:
+        feed_outlines = [f"# RSS Feed Update from {rss_source.name} ({len(entries)} entries): \n"]
+
+    for entry in reported:
+        description = truncate_to_tokens(entry.description, mas_config.rss_description_max_tokens)
         outline = (
-            f"- title: {entry.title}; description: {entry.description};"
+            f"- title: {entry.title}; description: {description};"
             f" link: {entry.link}; published: {entry.published}\n"
         )
         feed_outlines.append(outline)
@@ -11,5 +11,6 @@ if TYPE_CHECKING:
 
 @register_action("plan_future_event")
 async def handle_plan_future_event(intent: PlanFutureEventIntent, executor: "Executor") -> str:
-    await executor.scheduler.schedule(intent)
+    if await executor.scheduler.schedule(intent) is None:
+        raise ValueError(f"Unable to parse time: {intent.when}")
     return "Future event planned."
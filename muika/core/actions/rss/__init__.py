@@ -1,12 +1,29 @@
-from ._parser import extract_web_content, fetch_web_content, parse_rss_feed
-from ._schema import CheckRSSUpdatePayload
+from ._fetcher import rss_fetcher
+from ._parser import (
+    ParsedResult,
+    extract_web_content,
+    fetch_web_content,
+    parse_rss_feed,
+    truncate_to_tokens,
+)
+from ._pool import parser_pool
+from ._prefetcher import rss_prefetcher
+from ._schema import CheckRSSUpdatePayload, RSSSource
+from ._seen import seen_items
 from ._source import AVAILABLE_RSS_SOURCES, RSS_SOURCES
 
 __all__ = [
     "CheckRSSUpdatePayload",
+    "RSSSource",
+    "ParsedResult",
     "parse_rss_feed",
     "extract_web_content",
     "RSS_SOURCES",
     "fetch_web_content",
     "AVAILABLE_RSS_SOURCES",
+    "rss_fetcher",
+    "seen_items",
+    "parser_pool",
+    "rss_prefetcher",
+    "truncate_to_tokens",
 ]
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from aiohttp import ClientResponse, ClientSession, ClientTimeout, TCPConnector
+from nonebot import logger
+
+from ._schema import RSSSource
+
+FETCH_TIMEOUT = 20
+"""单次请求的超时时间（秒）"""
+MAX_CONTENT_SIZE = 5 * 1024 * 1024
+"""单次请求的最大响应大小（字节）"""
+MAX_CONNECTIONS = 16
+"""连接池的最大连接数"""
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class FeedCacheEntry:
+    content: bytes
+    """最近一次获取的订阅源内容"""
+    fetched_at: float
+    """最近一次检查（包括 304 响应）的时间"""
+    etag: Optional[str] = None
+    """响应的 ETag"""
+    last_modified: Optional[str] = None
+    """响应的 Last-Modified"""
+
+
+class RSSFetcher:
+    """
+    RSS/网页获取服务
+
+    - 所有请求复用同一个连接池化的 `ClientSession`，并限制超时与响应大小
+    - 订阅源在 `update_interval` 内的重复检查直接返回缓存内容，不产生网络请求
+    - 超过更新间隔后使用 ETag/Last-Modified 发起条件请求，304 时直接复用缓存内容
+    """
+
+    def __init__(self, timeout: float = FETCH_TIMEOUT, max_size: int = MAX_CONTENT_SIZE) -> None:
+        self.timeout = timeout
+        """单次请求的超时时间（秒）"""
+        self.max_size = max_size
+        """单次请求的最大响应大小（字节）"""
+
+        self._session: Optional[ClientSession] = None
+        self._feeds: dict[str, FeedCacheEntry] = {}
+        """订阅源 ID -> 缓存"""
+        self._locks: dict[str, asyncio.Lock] = {}
+        """订阅源 ID -> 锁，避免同一订阅源被并发重复获取"""
+
+    def get_session(self) -> ClientSession:
+        """
+        获取共享的客户端会话
+        """
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                connector=TCPConnector(limit=MAX_CONNECTIONS),
+                timeout=ClientTimeout(total=self.timeout),
+                headers={"Accept-Encoding": "gzip, deflate"},
+            )
+        return self._session
+
+    async def _read_limited(self, response: ClientResponse, url: str, max_size: Optional[int] = None) -> bytes:
+        """
+        分块读取响应，超出大小限制时立即中止
+        """
+        max_size = self.max_size if max_size is None else max_size
+
+        content_length = response.content_length
+        if content_length is not None and content_length > max_size:
+            raise ValueError(f"响应大小超出限制 ({content_length} > {max_size} bytes): {url}")
+
+        chunks: list[bytes] = []
+        size = 0
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise ValueError(f"响应大小超出限制 (> {max_size} bytes): {url}")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def fetch(self, url: str, max_size: Optional[int] = None) -> bytes:
+        """
+        获取 RSS/网页内容的字节串（gzip 等压缩编码会被自动解压）
+
+        :param max_size: 最大响应大小（字节），默认为 `self.max_size`
+
+        :raise ValueError: 响应大小超出限制
+        :raise aiohttp.ClientResponseError: 请求失败
+        :raise asyncio.TimeoutError: 请求超时
+        """
+        async with self.get_session().get(url) as response:
+            response.raise_for_status()
+            return await self._read_limited(response, url, max_size)
+
+    def get_cached_feed(self, source: RSSSource) -> Optional[FeedCacheEntry]:
+        """
+        获取订阅源的缓存
+        """
+        return self._feeds.get(source.id)
+
+    def is_fresh(self, source: RSSSource) -> bool:
+        """
+        订阅源缓存是否仍在更新间隔内
+        """
+        entry = self._feeds.get(source.id)
+        return entry is not None and time.time() - entry.fetched_at < source.update_interval
+
+    async def fetch_feed(self, source: RSSSource, force: bool = False) -> bytes:
+        """
+        获取订阅源内容
+
+        :param source: 订阅源
+        :param force: 是否忽略更新间隔（仍会发起条件请求）
+
+        :return: 订阅源内容的字节串
+        """
+        lock = self._locks.setdefault(source.id, asyncio.Lock())
+        async with lock:
+            entry = self._feeds.get(source.id)
+            if entry is not None and not force and self.is_fresh(source):
+                logger.debug(f"订阅源 {source.id} 仍在更新间隔内，使用缓存内容")
+                return entry.content
+
+            headers = {}
+            if entry is not None and entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry is not None and entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+            async with self.get_session().get(source.url, headers=headers) as response:
+                if response.status == 304 and entry is not None:
+                    logger.debug(f"订阅源 {source.id} 未更新 (304)")
+                    entry.fetched_at = time.time()
+                    return entry.content
+
+                response.raise_for_status()
+                content = await self._read_limited(response, source.url)
+
+                self._feeds[source.id] = FeedCacheEntry(
+                    content=content,
+                    fetched_at=time.time(),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+                logger.debug(f"订阅源 {source.id} 已更新 ({len(content)} bytes)")
+                return content
+
+    async def close(self):
+        """
+        关闭客户端会话
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+rss_fetcher = RSSFetcher()
+"""全局 RSS/网页获取服务"""
@@ -1,8 +1,22 @@
+import hashlib
+import html
+import re
+from collections import OrderedDict
 from dataclasses import dataclass
+from typing import Any
 
 import feedparser
 import trafilatura
-from aiohttp import ClientSession
+
+from muika.llm.utils.tokens import truncate_to_tokens as _truncate_to_tokens
+
+from ._fetcher import rss_fetcher
+from ._pool import parser_pool
+
+MAX_PAGE_SIZE = 2 * 1024 * 1024
+"""提取网页正文时的最大网页大小（字节）"""
+PARSE_CACHE_SIZE = 256
+"""解析结果缓存的最大条目数"""
 
 
 @dataclass
@@ -11,14 +25,47 @@ class ParsedResult:
     link: str
     published: str
     description: str
+    id: str = ""
+    """条目的 GUID（可能为空）"""
+
+
+HTML_TAG = re.compile(r"<[^>]+>")
 
 
-def parse_rss_feed(rss_content: bytes | str) -> list[ParsedResult]:
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
     """
-    解析 RSS 内容，返回解析结果列表
+    去除 HTML 标签，并将文本截断至大约 `max_tokens` 个 Token
 
-    :param rss_content: RSS 内容的字节串或字符串
-    :return: 解析结果列表
+    :param max_tokens: 最大 Token 数，<= 0 则不截断
+    """
+    text = " ".join(html.unescape(HTML_TAG.sub(" ", text)).split())
+    return _truncate_to_tokens(text, max_tokens)
+
+
+_parse_cache: OrderedDict[tuple[str, str], Any] = OrderedDict()
+"""(URL 或解析类型, 内容哈希) -> 解析结果"""
+
+
+def _content_digest(content: bytes | str) -> str:
+    return hashlib.sha256(content.encode("utf-8") if isinstance(content, str) else content).hexdigest()
+
+
+def _cache_get(key: tuple[str, str]) -> Any:
+    if key in _parse_cache:
+        _parse_cache.move_to_end(key)
+        return _parse_cache[key]
+    return None
+
+
+def _cache_put(key: tuple[str, str], value: Any):
+    _parse_cache[key] = value
+    while len(_parse_cache) > PARSE_CACHE_SIZE:
+        _parse_cache.popitem(last=False)
+
+
+def _parse_rss_feed(rss_content: bytes | str) -> list[ParsedResult]:
+    """
+    解析 RSS 内容（在解析线程池中执行）
     """
     feed = feedparser.parse(rss_content)
     items = []
@@ -28,30 +75,56 @@ def parse_rss_feed(rss_content: bytes | str) -> list[ParsedResult]:
             link=entry.get("link", ""),  # type: ignore
             published=entry.get("published", ""),  # type: ignore
             description=entry.get("description", ""),  # type: ignore
+            id=entry.get("id", ""),  # type: ignore
         )
         items.append(item)
     return items
 
 
-async def fetch_web_content(link: str) -> bytes:
+def _extract_text(html_content: bytes) -> str:
+    """
+    提取网页正文（在解析线程池中执行）
+    """
+    content = trafilatura.extract(html_content)
+    return content if content else ""
+
+
+async def parse_rss_feed(rss_content: bytes | str) -> list[ParsedResult]:
+    """
+    解析 RSS 内容，返回解析结果列表（在解析线程池中执行，相同内容的解析结果会被缓存）
+
+    :param rss_content: RSS 内容的字节串或字符串
+    :return: 解析结果列表
+    """
+    key = ("rss", _content_digest(rss_content))
+    if (items := _cache_get(key)) is None:
+        items = await parser_pool.run(_parse_rss_feed, rss_content)
+        _cache_put(key, items)
+    return list(items)
+
+
+async def fetch_web_content(link: str, max_size: int | None = None) -> bytes:
     """
     异步获取 RSS/网页 内容的字节串
 
     :param link: RSS/网页链接
+    :param max_size: 最大内容大小（字节），默认使用获取服务的限制
     :return: RSS/网页内容的字节串
     """
-    async with ClientSession() as session:
-        async with session.get(link) as response:
-            return await response.read()
+    return await rss_fetcher.fetch(link, max_size=max_size)
 
 
 async def extract_web_content(url: str) -> str:
     """
-    通过文章链接提取网页正文内容
+    通过文章链接提取网页正文内容（在解析线程池中执行，结果按链接与网页内容哈希缓存）
 
     :param url: 文章链接
     :return: 提取的正文内容字符串
     """
-    html = await fetch_web_content(url)
-    content = trafilatura.extract(html)
-    return content if content else ""
+    html_content = await fetch_web_content(url, max_size=MAX_PAGE_SIZE)
+
+    key = (url, _content_digest(html_content))
+    if (content := _cache_get(key)) is None:
+        content = await parser_pool.run(_extract_text, html_content)
+        _cache_put(key, content)
+    return content
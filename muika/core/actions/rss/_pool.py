@@ -0,0 +1,72 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from nonebot import logger
+
+T = TypeVar("T")
+
+PARSE_WORKERS = 2
+"""解析线程数"""
+PARSE_TIMEOUT = 15
+"""单次解析的超时时间（秒）"""
+
+
+class ParserPool:
+    """
+    CPU 密集型解析任务（HTML 正文提取、RSS 解析）的有界线程池，使解析不阻塞事件循环
+
+    不使用进程池：在已有多个线程（`to_thread` 工作线程、数据库驱动、文件监视器等）的进程中 fork 可能使子进程
+    在继承的锁上死锁，而以 spawn 方式创建的子进程会重新导入插件包，插件包只能在 NoneBot 中导入。
+    线程无法被强制终止，任务超时时丢弃当前线程池并新建一个，使后续任务不被失控的解析任务阻塞
+    """
+
+    def __init__(self, max_workers: int = PARSE_WORKERS, timeout: float = PARSE_TIMEOUT) -> None:
+        self.max_workers = max_workers
+        """最大工作线程数"""
+        self.timeout = timeout
+        """单次解析的超时时间（秒）"""
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="muika-parser")
+        return self._executor
+
+    def _reset(self):
+        """
+        丢弃当前线程池（仍在运行的任务会在完成后自行退出）
+        """
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        在线程池中执行函数
+
+        :raise asyncio.TimeoutError: 执行超时
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), partial(func, *args))
+
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"解析任务超时 ({self.timeout}s): {getattr(func, '__name__', func)}")
+            self._reset()
+            raise
+
+    def shutdown(self):
+        """
+        关闭线程池
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+parser_pool = ParserPool()
+"""全局解析线程池"""
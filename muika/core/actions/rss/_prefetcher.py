@@ -0,0 +1,120 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from random import uniform
+from typing import Awaitable, Callable, Optional
+
+from nonebot import logger
+
+from ._fetcher import rss_fetcher
+from ._parser import ParsedResult, parse_rss_feed
+from ._schema import RSSSource
+from ._seen import get_item_key, seen_items
+from ._source import RSS_SOURCES
+
+INITIAL_DELAY = 30
+"""首次刷新的最大随机延迟（秒），用于错开各订阅源的刷新时间"""
+JITTER = 0.1
+"""刷新间隔的随机抖动比例"""
+
+UpdateCallback = Callable[[RSSSource, list[ParsedResult]], Awaitable[None]]
+
+
+@dataclass
+class WarmFeed:
+    items: list[ParsedResult]
+    """已解析的条目"""
+    refreshed_at: float
+    """最近一次刷新的时间"""
+
+
+class RSSPrefetcher:
+    """
+    RSS 后台预取
+
+    按各订阅源的 `update_interval`（带随机抖动）在后台刷新订阅源，在内存中保留解析后的条目，
+    并在出现未读的新条目时通知回调。检查 RSS 更新的意图可以直接使用内存中的条目，无需等待网络请求
+    """
+
+    def __init__(self, sources: Optional[dict[str, RSSSource]] = None, jitter: float = JITTER) -> None:
+        self.sources = RSS_SOURCES if sources is None else sources
+        """订阅源"""
+        self.jitter = jitter
+        """刷新间隔的随机抖动比例"""
+
+        self._feeds: dict[str, WarmFeed] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def _is_fresh(self, source: RSSSource) -> bool:
+        feed = self._feeds.get(source.id)
+        return feed is not None and time.time() - feed.refreshed_at < source.update_interval * (1 + self.jitter)
+
+    async def refresh(self, source: RSSSource, force: bool = True) -> list[ParsedResult]:
+        """
+        刷新订阅源
+
+        :param force: 是否忽略获取服务的更新间隔缓存（仍为条件请求）
+
+        :return: 相比上一次刷新新出现且未读的条目（首次刷新时返回空列表）
+        """
+        content = await rss_fetcher.fetch_feed(source, force=force)
+        items = await parse_rss_feed(content)
+
+        previous = self._feeds.get(source.id)
+        self._feeds[source.id] = WarmFeed(items=items, refreshed_at=time.time())
+        if previous is None:
+            return []
+
+        known = {get_item_key(item) for item in previous.items}
+        await seen_items.load()
+        return seen_items.filter_new(source.id, (item for item in items if get_item_key(item) not in known))
+
+    async def get_entries(self, source: RSSSource) -> list[ParsedResult]:
+        """
+        获取订阅源的条目，预取的条目仍在更新间隔内时直接返回
+        """
+        if self._is_fresh(source):
+            logger.debug(f"使用预取的订阅源条目: {source.id}")
+            return list(self._feeds[source.id].items)
+
+        await self.refresh(source, force=False)
+        return list(self._feeds[source.id].items)
+
+    async def _poll(self, source: RSSSource, on_update: UpdateCallback):
+        await asyncio.sleep(uniform(0, min(INITIAL_DELAY, source.update_interval)))
+
+        while True:
+            try:
+                new_items = await self.refresh(source)
+                if new_items:
+                    logger.info(f"订阅源 {source.id} 出现 {len(new_items)} 个新条目")
+                    await on_update(source, new_items)
+            except Exception as e:
+                logger.warning(f"刷新订阅源 {source.id} 失败: {e}")
+
+            await asyncio.sleep(source.update_interval * uniform(1 - self.jitter, 1 + self.jitter))
+
+    def start(self, on_update: UpdateCallback):
+        """
+        启动后台刷新任务
+
+        :param on_update: 出现新条目时的回调
+        """
+        if self._tasks:
+            return
+
+        self._tasks = [asyncio.create_task(self._poll(source, on_update)) for source in self.sources.values()]
+        logger.info(f"已启动 {len(self._tasks)} 个订阅源的后台预取")
+
+    async def stop(self):
+        """
+        停止后台刷新任务
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+rss_prefetcher = RSSPrefetcher()
+"""全局 RSS 后台预取"""
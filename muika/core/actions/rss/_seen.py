@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Mapping
+
+import aiofiles
+import nonebot_plugin_localstore as store
+from nonebot import logger
+
+from ._parser import ParsedResult
+
+MAX_SEEN_ITEMS_PER_SOURCE = 1000
+"""每个订阅源记录的最大条目数（应大于订阅源单次返回的条目数）"""
+
+
+def get_item_key(item: ParsedResult) -> str:
+    """
+    获取条目的唯一标识：优先使用 GUID，否则使用链接（或标题）的哈希
+    """
+    if item.id:
+        return item.id
+    return hashlib.sha1((item.link or item.title).encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+class SeenItemStore:
+    """
+    已读 RSS 条目记录
+
+    按订阅源分别记录已读条目的标识，超出容量时淘汰最早记录的条目，并持久化至 JSON 文件
+    """
+
+    def __init__(self, path: Path, max_items: int = MAX_SEEN_ITEMS_PER_SOURCE) -> None:
+        self.path = path
+        """持久化文件路径"""
+        self.max_items = max_items
+        """每个订阅源记录的最大条目数"""
+
+        self._seen: dict[str, OrderedDict[str, None]] = {}
+        self._loaded = False
+        self._dirty = False
+
+    async def load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not self.path.exists():
+            return
+
+        try:
+            async with aiofiles.open(self.path, "r", encoding="utf-8") as f:
+                data: dict[str, list[str]] = json.loads(await f.read())
+        except Exception as e:
+            logger.warning(f"加载 RSS 已读记录失败: {e}")
+            return
+
+        for source_id, keys in data.items():
+            self._seen[source_id] = OrderedDict.fromkeys(keys[-self.max_items :])
+
+    async def save(self):
+        if not self._dirty:
+            return
+
+        data = {source_id: list(keys) for source_id, keys in self._seen.items()}
+        self._dirty = False
+
+        temp_path = self.path.with_suffix(".json.part")
+        async with aiofiles.open(temp_path, "w", encoding="utf-8") as f:
+            await f.write(json.dumps(data, ensure_ascii=False))
+        os.replace(temp_path, self.path)
+
+    def filter_new(self, source_id: str, items: Iterable[ParsedResult]) -> list[ParsedResult]:
+        """
+        过滤出未读的条目
+        """
+        seen: Mapping[str, None] = self._seen.get(source_id, {})
+        return [item for item in items if get_item_key(item) not in seen]
+
+    def mark_seen(self, source_id: str, items: Iterable[ParsedResult]):
+        """
+        将条目标记为已读
+        """
+        seen = self._seen.setdefault(source_id, OrderedDict())
+        for item in items:
+            key = get_item_key(item)
+            if key in seen:
+                continue
+            seen[key] = None
+            self._dirty = True
+
+        while len(seen) > self.max_items:
+            seen.popitem(last=False)
+
+
+seen_items = SeenItemStore(store.get_plugin_data_dir() / "rss_seen.json")
+"""全局 RSS 已读记录"""
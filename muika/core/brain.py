@@ -1,21 +1,25 @@
-import json
 from json import JSONDecodeError
-from typing import Optional, Type, TypeVar, Union
+from typing import Any, Awaitable, Callable, Optional, Type, TypeVar, Union
 
 from nonebot import logger
 from pydantic import BaseModel, Field, TypeAdapter
 
-from muika.llm import ModelRequest, load_model
-from muika.llm.utils.json_utils import extract_json_from_text
+from muika.config import mas_config
+from muika.llm import ModelRequest, schema_registry
+from muika.llm.utils.json_utils import IncrementalJSONParser, extract_json_from_text
 from muika.llm.utils.thought_processor import general_processor
 
 from .events import Event
 from .intents import DoNothingIntent, Intent, SendMessageIntent
 from .memory import MemoryIntent, MemoryManager
+from .router import ModelRouter
 from .state import MuikaState
 
 TModel = TypeVar("TModel")
 
+MemberCallback = Callable[[str, Any], Awaitable[None]]
+ActionCallback = Callable[[Intent], Awaitable[None]]
+
 
 class CognitiveResult(BaseModel):
     action: Intent = Field(
@@ -31,28 +35,98 @@ class CognitiveResult(BaseModel):
 class MuikaBrain:
     def __init__(self) -> None:
         # 初始化模型类
-        self.intent_adapter: TypeAdapter[CognitiveResult] = TypeAdapter(CognitiveResult)
-        self.model = load_model()
+        self.intent_adapter: TypeAdapter[CognitiveResult] = schema_registry.get_adapter(CognitiveResult)
+        self.action_adapter: TypeAdapter[Intent] = schema_registry.get_adapter(Intent)
+        self.router = ModelRouter()
+        """模型路由，按事件与状态选择模型配置"""
+        # 预先加载默认模型，尽早暴露缺失的依赖
+        self.router.get_model()
 
     async def completions_format(
         self,
         prompt: str,
         system: str,
         response_model: Union[Type[TModel], TypeAdapter[TModel]],
+        event: Optional[Event] = None,
+        state: Optional[MuikaState] = None,
     ) -> TModel:
-        # 如果是 BaseModel 类型，转换为 TypeAdapter 统一处理
-        if isinstance(response_model, TypeAdapter):
-            adapter = response_model
-        else:
-            adapter = TypeAdapter(response_model)
+        """
+        调用模型并将输出解析为指定的结构
 
+        :param event: (可选)触发本次调用的事件，与 `state` 一同提供时按路由规则选择模型，否则使用默认模型
+        :param state: (可选)当前状态
+        """
+        # 统一转换为 TypeAdapter 处理，同一结构的 TypeAdapter 只构建一次
+        adapter = schema_registry.get_adapter(response_model)
         request = ModelRequest(prompt, system=system, format="json", json_schema=adapter)
-        completions = await self.model.ask(request)
+        if event is not None and state is not None:
+            completions = await self.router.ask(request, event, state)
+        else:
+            completions = await self.router.get_model().ask(request)
         if not completions.succeed:
             raise RuntimeError(f"模型调用失败: {completions.text}")
 
+        return self._parse_output(completions.text, adapter)
+
+    async def completions_format_stream(
+        self,
+        prompt: str,
+        system: str,
+        response_model: Union[Type[TModel], TypeAdapter[TModel]],
+        on_member: Optional[MemberCallback] = None,
+        event: Optional[Event] = None,
+        state: Optional[MuikaState] = None,
+    ) -> TModel:
+        """
+        以流式输出调用模型并将输出解析为指定的结构
+
+        输出经由增量 JSON 解析器处理，顶层对象的每个成员完成时立即回调 `on_member`（回调抛出异常时中止输出流）；
+        输出为有效的 JSON 对象时直接校验解析结果，否则回退至与 `completions_format` 相同的解析方式
+
+        :param on_member: (可选)顶层成员完成时的回调，参数为键与值
+        """
+        # 统一转换为 TypeAdapter 处理，同一结构的 TypeAdapter 只构建一次
+        adapter = schema_registry.get_adapter(response_model)
+        request = ModelRequest(prompt, system=system, format="json", json_schema=adapter)
+        if event is not None and state is not None:
+            response = await self.router.ask(request, event, state, stream=True)
+        else:
+            response = await self.router.get_model().ask(request, stream=True)
+
+        parser: Optional[IncrementalJSONParser] = IncrementalJSONParser()
+        chunks: list[str] = []
+        try:
+            async for chunk in response:
+                if not chunk.succeed:
+                    raise RuntimeError(f"模型调用失败: {chunk.chunk}")
+                chunks.append(chunk.chunk)
+                if parser is None:
+                    continue
+
+                try:
+                    members = parser.feed(chunk.chunk)
+                except ValueError as e:
+                    logger.debug(f"增量 JSON 解析失败，将在输出完成后回退至完整解析: {e}")
+                    parser = None
+                    continue
+
+                for key, value in members:
+                    if on_member is not None:
+                        await on_member(key, value)
+                if parser.done:
+                    # 对象已完整，忽略之后的输出（如代码块的结束标记）
+                    break
+        finally:
+            await response.aclose()
+
+        if parser is not None and parser.done:
+            return adapter.validate_python(parser.result)
+        return self._parse_output("".join(chunks), adapter)
+
+    @staticmethod
+    def _parse_output(text: str, adapter: TypeAdapter[TModel]) -> TModel:
         # Remove think tags.
-        _, result = general_processor(completions.text)
+        _, result = general_processor(text)
 
         try:
             obj = extract_json_from_text(result)
@@ -88,9 +162,17 @@ class MuikaBrain:
             f"Attention: {s.attention:.2f} ({focus_desc})]"
         )
 
-    async def think(self, event: Event, state: MuikaState, memory: MemoryManager) -> CognitiveResult:
+    async def think(
+        self,
+        event: Event,
+        state: MuikaState,
+        memory: MemoryManager,
+        on_action: Optional[ActionCallback] = None,
+    ) -> CognitiveResult:
         """
         核心认知层：调用 LLM 决定下一步行动
+
+        :param on_action: (可选)启用流式思考时，`action` 字段完整并通过校验后立即回调，无需等待 `memory` 字段生成完毕
         """
         # 1. 构建 System Prompt (人设 + 行为准则)
         system_prompt = (
@@ -119,7 +201,7 @@ class MuikaBrain:
 
         # 2. 构建 User Prompt (当前上下文)
         state_desc = self._get_mood_description(state)
-        memory_context = memory.get_prompt_memory()
+        memory_context = await memory.get_prompt_memory()
 
         last_intent_desc = ""
         if state.last_executed_intent:
@@ -141,6 +223,10 @@ class MuikaBrain:
                 context += " (The atmosphere is calm.)"
         elif event.type == "scheduled_trigger":
             context = f"Reminder/Task triggered: '{event.payload.what}'"
+        elif event.type == "rss_update":
+            context = f"RSS feed '{event.payload.feed}' has {event.payload.title}"
+            if event.payload.content:
+                context += f":\n{event.payload.content}"
         elif event.type == "action_feedback":
             reason = f" (reason: {event.payload.intent.reason})" if event.payload.intent.reason else ""
             context = f"Action Feedback received for intent '{event.payload.intent.name}'{reason}: "
@@ -154,7 +240,6 @@ class MuikaBrain:
         else:
             context = f"Unknown event: {event.type}"
 
-        schema = self.intent_adapter.json_schema()
         full_prompt = (
             f"{state_desc}\n"
             f"{memory_context}\n"
@@ -162,17 +247,43 @@ class MuikaBrain:
             f"Event Trigger: {context}\n\n"
             "Based on your state and memory, decide your next move. "
             "Output JSON matching the schema:"
-            f"{json.dumps(schema, indent=2)}"
+            f"{schema_registry.get(CognitiveResult).schema_text}"
         )
 
         # 3. 调用 LLM (使用你封装好的 completions_format)
         # 这里我们捕获潜在的错误，防止思考层崩溃导致主循环退出
+        early_action: Optional[Intent] = None
+
+        async def on_member(key: str, value: Any):
+            nonlocal early_action
+            if key != "action":
+                return
+            # 尽早校验判别字段，无效的动作会直接中止输出流
+            early_action = self.action_adapter.validate_python(value)
+            if on_action is not None:
+                await on_action(early_action)
+
         try:
-            intent = await self.completions_format(
-                prompt=full_prompt,
-                system=system_prompt,
-                response_model=self.intent_adapter,
-            )
+            if mas_config.stream_cognition:
+                intent = await self.completions_format_stream(
+                    prompt=full_prompt,
+                    system=system_prompt,
+                    response_model=self.intent_adapter,
+                    on_member=on_member,
+                    event=event,
+                    state=state,
+                )
+                if early_action is not None:
+                    # 解析结果是新的实例，换回已提前交付的动作，以便调用方识别并跳过重复执行
+                    intent.action = early_action
+            else:
+                intent = await self.completions_format(
+                    prompt=full_prompt,
+                    system=system_prompt,
+                    response_model=self.intent_adapter,
+                    event=event,
+                    state=state,
+                )
 
             # 如果决定回复但内容为空，强制转为 IGNORE
             if isinstance(intent.action, SendMessageIntent) and not intent.action:
@@ -182,6 +293,9 @@ class MuikaBrain:
 
         except Exception as e:
             logger.error(f"Muika thought process failed: {e}")
+            if early_action is not None:
+                # 动作已提前交付，仅丢失了记忆字段
+                return CognitiveResult(action=early_action, memory=None)
             # 兜底策略：发生错误时仅仅是发呆
             return CognitiveResult(
                 action=DoNothingIntent(
@@ -72,6 +72,13 @@ class ScheduledTriggerEvent:
     type: Literal["scheduled_trigger"] = "scheduled_trigger"
 
 
+@dataclass(frozen=True)
+class RSSUpdateEvent:
+    payload: RSSUpdate
+    timestamp: datetime = field(default_factory=datetime.now)
+    type: Literal["rss_update"] = "rss_update"
+
+
 @dataclass(frozen=True)
 class ActionFeedbackEvent:
     payload: ActionFeedbackPayload
@@ -80,5 +87,10 @@ class ActionFeedbackEvent:
 
 
 Event: TypeAlias = (
-    UserMessageEvent | TimeTickEvent | InternalReflectionEvent | ScheduledTriggerEvent | ActionFeedbackEvent
+    UserMessageEvent
+    | TimeTickEvent
+    | InternalReflectionEvent
+    | ScheduledTriggerEvent
+    | RSSUpdateEvent
+    | ActionFeedbackEvent
 )
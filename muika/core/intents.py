@@ -53,6 +53,10 @@ class CheckRSSUpdateIntent(IntentBase):
         ...,
         description=f"RSS source identifier. Available sources: {AVAILABLE_RSS_SOURCES}",
     )
+    only_new: bool = Field(
+        default=True,
+        description="Only report entries that have not been seen in previous checks.",
+    )
     persistence: SkipJsonSchema[Persistence] = Persistence.SHORT_TERM
 
 
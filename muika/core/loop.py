@@ -5,15 +5,28 @@ from typing import Optional
 
 from nonebot import logger
 
-from .brain import MuikaBrain
-from .events import ActionFeedbackEvent, ActionFeedbackPayload, Event, TimeTickEvent
+from muika.config import mas_config
+from muika.llm import create_model_summarizer
+
+from .actions.rss import ParsedResult, RSSSource, rss_prefetcher
+from .brain import CognitiveResult, MuikaBrain
+from .events import (
+    ActionFeedbackEvent,
+    ActionFeedbackPayload,
+    Event,
+    RSSUpdate,
+    RSSUpdateEvent,
+    TimeTickEvent,
+)
 from .executor import Executor
-from .intents import DoNothingIntent, Intent, Persistence
+from .intents import DoNothingIntent, Intent, Persistence, SendMessageIntent
 from .memory import MemoryManager
 from .state import MuikaState
+from .triage import create_default_triage
 
 CURIOSITY_THRESHOLD = 0.6
 CURIOSITY_DRIVE_INCREASE = 0.01
+RSS_UPDATE_MAX_TITLES = 10
 
 
 class Muika:
@@ -27,6 +40,14 @@ class Muika:
         self.event_queue: asyncio.Queue[Event] = asyncio.Queue()
         self.executor = Executor(self.event_queue)
         self.brain = MuikaBrain()
+        if mas_config.history_summarize:
+            # 较早的对话由默认模型逐步摘要，否则在本地截断生成
+            self.memory.history.summarizer = create_model_summarizer(
+                self.brain.router.get_model, mas_config.history_summary_max_tokens
+            )
+        self.triage = create_default_triage()
+        self._early_action: Optional[Intent] = None
+        """本轮思考过程中提前执行的意图"""
 
     async def collect_events(self) -> Event:
         """
@@ -44,6 +65,14 @@ class Muika:
         """
         await self.event_queue.put(event)
 
+    async def _on_rss_update(self, source: RSSSource, items: list[ParsedResult]):
+        """
+        后台预取发现新条目时，产生 RSS 更新事件
+        """
+        titles = "\n".join(f"- {item.title}" for item in items[:RSS_UPDATE_MAX_TITLES])
+        payload = RSSUpdate(feed=source.name, title=f"{len(items)} new entries", content=titles)
+        await self.create_event(RSSUpdateEvent(payload=payload))
+
     def should_think(self, event: Event) -> bool:
         if event.type == "time_tick":
             if self.state.loneliness > 0.8:
@@ -94,6 +123,57 @@ class Muika:
 
         return None
 
+    async def _execute_intent(self, current_intent: Intent) -> bool:
+        """
+        执行意图，并根据执行结果更新待执行意图与产生反馈事件
+
+        :return: 意图是否被执行
+        """
+        logger.info(f"Executing intent: {current_intent}")
+        execute_result = await self.executor.execute(current_intent, self.state)
+        if not execute_result.executed:
+            logger.debug("Intent execution skipped.")
+            return False
+
+        if execute_result.result and execute_result.result.success:
+            logger.success("Intent executed successfully.")
+            self.memory.record_intent(current_intent)
+            self.state.pending_intents.remove(current_intent)
+            self.state.active_intent = None
+        else:
+            failed_reason = execute_result.result.output if execute_result.result else "Unknown error"
+            logger.warning(f"Intent execution failed: {failed_reason}")
+            current_intent.failure_count += 1
+            if current_intent.failure_count >= 3:
+                logger.warning("Intent failed too many times, discarding.")
+                self.state.pending_intents.remove(current_intent)
+                self.state.active_intent = None
+
+        action_feedback_event = ActionFeedbackEvent(
+            payload=ActionFeedbackPayload(
+                intent=current_intent,
+                result=execute_result.result,
+            )
+        )
+        self.state.last_executed_intent = current_intent
+        await self.create_event(action_feedback_event)
+        return True
+
+    async def _on_early_action(self, action: Intent):
+        """
+        流式思考时动作字段完整后的回调：发送消息的意图立即执行，无需等待记忆字段生成完毕
+        """
+        if not isinstance(action, SendMessageIntent) or not self.should_execute(action):
+            return
+        if any(intent.persistence == Persistence.STICKY for intent in self.state.pending_intents):
+            # 常驻意图优先，交由正常流程选择
+            return
+
+        self._early_action = action
+        self.state.pending_intents.append(action)
+        self.state.active_intent = action
+        await self._execute_intent(action)
+
     async def loop(self):
         last_tick_time = time.time()
 
@@ -112,15 +192,27 @@ class Muika:
             logger.debug(f"Internal state updated: {self.state}")
 
             # 3. Self Think (决策 - 关键逻辑)
+            intent: Optional[CognitiveResult] = None
+            self._early_action = None
             if self.should_think(event):
-                intent = await self.brain.think(event, self.state, self.memory)
-                if intent.action.name != "do_nothing" and intent.action.confidence > 0.3:
+                # 分诊：简单事件跳过思考或直接使用模板意图，避免调用模型
+                triage_result = await self.triage.evaluate(event, self.state)
+                if triage_result.decision == "think":
+                    intent = await self.brain.think(event, self.state, self.memory, on_action=self._on_early_action)
+                elif triage_result.decision == "template" and triage_result.intent:
+                    intent = CognitiveResult(action=triage_result.intent, memory=None)
+
+            if intent:
+                executed_early = intent.action is self._early_action
+                if not executed_early and intent.action.name != "do_nothing" and intent.action.confidence > 0.3:
                     self.state.pending_intents.append(intent.action)
                 if intent.memory and intent.memory.type != "noop":
                     await self.memory.record_memory(intent.memory)
                 logger.debug(f"Intent created: {intent}")
-            else:
-                intent = None
+
+                if executed_early:
+                    # 意图已在思考过程中执行
+                    continue
 
             # 4. Decide & Execute Actions
             # Decide whether to execute an intent
@@ -134,36 +226,9 @@ class Muika:
                 continue
 
             # Execute the intent
-            current_intent = self.state.active_intent
-            logger.info(f"Executing intent: {current_intent}")
-            execute_result = await self.executor.execute(current_intent, self.state)
-            if not execute_result.executed:
-                logger.debug("Intent execution skipped.")
+            if not await self._execute_intent(self.state.active_intent):
                 continue
 
-            if execute_result.result and execute_result.result.success:
-                logger.success("Intent executed successfully.")
-                self.memory.record_intent(current_intent)
-                self.state.pending_intents.remove(current_intent)
-                self.state.active_intent = None
-            else:
-                failed_reason = execute_result.result.output if execute_result.result else "Unknown error"
-                logger.warning(f"Intent execution failed: {failed_reason}")
-                current_intent.failure_count += 1
-                if current_intent.failure_count >= 3:
-                    logger.warning("Intent failed too many times, discarding.")
-                    self.state.pending_intents.remove(current_intent)
-                    self.state.active_intent = None
-
-            action_feedback_event = ActionFeedbackEvent(
-                payload=ActionFeedbackPayload(
-                    intent=current_intent,
-                    result=execute_result.result,
-                )
-            )
-            self.state.last_executed_intent = current_intent
-            await self.create_event(action_feedback_event)
-
             # 5. Sleep
             self.curiosity_drive += self.state.curiosity * CURIOSITY_DRIVE_INCREASE * dt
             await asyncio.sleep(0.2)
@@ -175,4 +240,8 @@ class Muika:
         self.is_alive = True
         logger.info("Wake up...")
         await self.memory.load()
+        self.memory.writer.start()
+        await self.executor.scheduler.start()
+        if mas_config.enable_rss_prefetch:
+            rss_prefetcher.start(self._on_rss_update)
         await self.loop()
@@ -1,14 +1,21 @@
 import json
 from collections import deque
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Literal, Optional
 
 import aiofiles
 import nonebot_plugin_localstore as store
 from nonebot import logger
+from nonebot_plugin_orm import get_session
 from pydantic import BaseModel, Field
 
+from ..config import mas_config
+from ..database.crud import MessageORM
+from ..database.writer import MessageWriter
+from ..llm.history import HistoryBudget
+from ..models import Message
+from ..utils.utils import file_store
 from .events import Event
 from .intents import Intent, SendMessageIntent
 
@@ -18,6 +25,15 @@ class ConversationTurn:
     role: Literal["user", "muika", "internal"]
     content: str
     timestamp: datetime
+    resources: list[str] = field(default_factory=list)
+    """本轮对话引用的多模态文件路径"""
+
+
+TURN_PREFIXES = {"user": "User", "muika": "You", "system": "System", "internal": "My Inner Voice"}
+
+
+def render_turn(turn: ConversationTurn) -> str:
+    return f"{TURN_PREFIXES.get(turn.role, turn.role)}: {turn.content}"
 
 
 class MemoryIntent(BaseModel):
@@ -38,11 +54,15 @@ class MemoryItem(BaseModel):
 
 
 class MemoryManager:
-    def __init__(self, max_turns: int = 16):
+    def __init__(self, max_turns: int = 64):
         self.storage_path = store.get_plugin_data_dir() / "memory.json"
 
         self.recent_turns: deque[ConversationTurn] = deque(maxlen=max_turns)
         self.memory: dict[str, MemoryItem] = {}
+        self.history = HistoryBudget(mas_config.history_max_tokens, mas_config.history_summary_max_tokens)
+        """近期对话的 Token 预算，超出时较早的对话被折叠为摘要"""
+        self.writer = MessageWriter(mas_config.message_flush_interval, mas_config.message_flush_batch_size)
+        """对话消息的延迟批量写入"""
 
     async def _save(self):
         """持久化记忆到磁盘"""
@@ -52,13 +72,14 @@ class MemoryManager:
 
         data = {
             "memory": {k: v.model_dump(mode="json") for k, v in self.memory.items()},
-            # recent_turns 通常不需要持久化，或者只持久化最后几条用于热启动
+            # recent_turns 由消息表持久化，启动时从数据库热启动
         }
         async with aiofiles.open(self.storage_path, "w", encoding="utf-8") as f:
             await f.write(json.dumps(data, indent=2, ensure_ascii=False))
 
     async def load(self):
-        """从磁盘加载记忆"""
+        """从磁盘加载记忆，并从数据库恢复近期对话"""
+        await self._load_recent_turns()
         if not self.storage_path.exists():
             return
         try:
@@ -70,22 +91,59 @@ class MemoryManager:
         except Exception as e:
             logger.error(f"Failed to load memory: {e}")
 
+    async def _load_recent_turns(self):
+        """
+        从数据库中恢复最近的对话（热启动），只查询一页，由 `(profile, userid, groupid, time)` 索引支持
+        """
+        limit = self.recent_turns.maxlen or 16
+        try:
+            async with get_session() as session:
+                messages = await MessageORM.get_history(session, mas_config.master_id, limit=limit)
+        except Exception as e:
+            logger.error(f"Failed to load recent turns: {e}")
+            return
+
+        # 文件存储只保留近期对话引用的文件，较早消息引用的文件可能已被淘汰
+        existing = await file_store.existing(resource.path for message in messages for resource in message.resources)
+        for message in messages:
+            timestamp = message.format_time
+            if message.message or message.resources:
+                resources = [resource.path for resource in message.resources if resource.path in existing]
+                self._append_turn(ConversationTurn("user", message.message, timestamp, resources))
+            if message.respond:
+                self._append_turn(ConversationTurn("muika", message.respond, timestamp))
+
+        logger.debug(f"已从数据库恢复 {len(self.recent_turns)} 轮近期对话")
+
     def _build_key(self, category: str, key: str) -> str:
         return f"{category}:{key}"
 
+    def _append_turn(self, turn: ConversationTurn):
+        """
+        追加一轮对话，被挤出的对话不再引用其多模态文件
+        """
+        if self.recent_turns.maxlen and len(self.recent_turns) == self.recent_turns.maxlen:
+            file_store.release(self.recent_turns[0].resources)
+
+        file_store.retain(turn.resources)
+        self.recent_turns.append(turn)
+
     def record_event(self, event: Event) -> None:
         if event.type == "user_message":
-            self.recent_turns.append(
+            self.writer.add(event.payload.message)
+            self._append_turn(
                 ConversationTurn(
                     role="user",
                     content=event.payload.message.message,
                     timestamp=event.timestamp,
+                    resources=[resource.path for resource in event.payload.message.resources if resource.path],
                 )
             )
 
     def record_intent(self, intent: Intent):
         if isinstance(intent, SendMessageIntent):
-            self.recent_turns.append(
+            self.writer.add(Message(userid=mas_config.master_id, respond=intent.content))
+            self._append_turn(
                 ConversationTurn(
                     role="muika",
                     content=intent.content,
@@ -115,10 +173,11 @@ class MemoryManager:
 
         await self._save()
 
-    def get_prompt_memory(self) -> str:
+    async def get_prompt_memory(self) -> str:
         """
         将 KV 记忆转化为自然语言 Prompt。
         为了防止 Token 爆炸，这里应该有一个筛选逻辑，或者按重要性排序。
+        近期对话按 `history_max_tokens` 预算压缩，较早的对话以摘要形式给出。
         """
         parts = []
 
@@ -140,13 +199,18 @@ class MemoryManager:
 
         # 3. 对话历史 (Short-term)
         if self.recent_turns:
+            turns: list[ConversationTurn] = list(self.recent_turns)
+            summary = ""
+            if self.history.max_tokens > 0:
+                compacted = await self.history.compact(turns, render_turn)
+                turns, summary = compacted.turns, compacted.summary
+
+            if summary:
+                parts.append("\n## Summary of Earlier Conversation:")
+                parts.append(summary)
             parts.append(
                 "\n## Recent Context (Most recent at bottom): (Do NOT respond to these directly unless relevant)"
             )
-            for turn in self.recent_turns:
-                prefix = {"user": "User", "muika": "You", "system": "System", "internal": "My Inner Voice"}.get(
-                    turn.role, turn.role
-                )
-                parts.append(f"{prefix}: {turn.content}")
+            parts.extend(render_turn(turn) for turn in turns)
 
         return "\n".join(parts)
@@ -0,0 +1,121 @@
+from typing import AsyncGenerator, Literal, Optional, Union, overload
+
+from nonebot import logger
+
+from muika.config import get_model_config_manager, get_model_routes
+from muika.llm import (
+    BaseLLM,
+    ModelCompletions,
+    ModelRequest,
+    ModelStreamCompletions,
+    ResilientLLM,
+    RouteRule,
+    load_model,
+)
+from muika.llm.utils.tokens import estimate_tokens
+
+from .events import Event
+from .state import MuikaState
+
+
+class ModelRouter:
+    """
+    模型路由
+
+    按 `configs/models.yml` 中 `routing` 项的规则顺序，根据事件类型、状态阈值与 Prompt 大小选择模型配置，
+    第一个命中的规则生效；均未命中时使用默认模型配置。
+    调用经由 `ResilientLLM` 进行重试、熔断、后备与对冲请求
+    """
+
+    def __init__(self) -> None:
+        self._models: dict[str, BaseLLM] = {}
+        """模型配置名 -> 模型实例"""
+
+        get_model_config_manager().register_listener(self._on_config_changed)
+
+    def _on_config_changed(self, *_):
+        # 配置文件变化后丢弃所有模型实例，下次调用时按新配置重新加载
+        self._models.clear()
+
+    def get_model(self, name: Optional[str] = None) -> BaseLLM:
+        """
+        获取模型实例（同一模型配置只会加载一次）
+
+        :param name: 模型配置名，为空则使用默认模型配置
+        """
+        manager = get_model_config_manager()
+        config = manager.get_model_config(name)
+        name = name or manager.get_name_from_config(config)
+
+        if name not in self._models:
+            logger.debug(f"加载模型配置: {name}")
+            self._models[name] = load_model(config)
+        return self._models[name]
+
+    @staticmethod
+    def _match(rule: RouteRule, event: Event, state: MuikaState, prompt_tokens: int) -> bool:
+        if rule.events and event.type not in rule.events:
+            return False
+
+        if prompt_tokens < rule.min_prompt_tokens:
+            return False
+        if rule.max_prompt_tokens is not None and prompt_tokens > rule.max_prompt_tokens:
+            return False
+
+        for key, threshold in rule.min_state.items():
+            value = getattr(state, key, None)
+            if not isinstance(value, (int, float)) or value < threshold:
+                return False
+        for key, threshold in rule.max_state.items():
+            value = getattr(state, key, None)
+            if not isinstance(value, (int, float)) or value > threshold:
+                return False
+
+        return True
+
+    def select(self, event: Event, state: MuikaState, prompt: str = "") -> Optional[RouteRule]:
+        """
+        选择路由规则
+
+        :return: 第一个命中的规则，均未命中时返回 None（使用默认模型配置）
+        """
+        routes = get_model_routes()
+        if not routes:
+            return None
+
+        prompt_tokens = estimate_tokens(prompt)
+        for rule in routes:
+            if self._match(rule, event, state, prompt_tokens):
+                return rule
+        return None
+
+    @overload
+    async def ask(
+        self, request: ModelRequest, event: Event, state: MuikaState, *, stream: Literal[False] = False
+    ) -> ModelCompletions: ...
+
+    @overload
+    async def ask(
+        self, request: ModelRequest, event: Event, state: MuikaState, *, stream: Literal[True] = True
+    ) -> AsyncGenerator[ModelStreamCompletions, None]: ...
+
+    async def ask(
+        self, request: ModelRequest, event: Event, state: MuikaState, *, stream: bool = False
+    ) -> Union[ModelCompletions, AsyncGenerator[ModelStreamCompletions, None]]:
+        """
+        按路由规则调用模型，失败或超时后重试，仍失败则依次尝试后备模型
+
+        :param stream: 是否开启流式输出
+
+        :return: 模型输出；全部失败时返回 `succeed` 为 False 的输出
+        """
+        rule = self.select(event, state, (request.system or "") + request.prompt)
+        if rule is None:
+            return await ResilientLLM([self.get_model()]).ask(request, stream=stream)
+
+        models = [self.get_model(name) for name in [rule.model, *rule.fallbacks]]
+        resilient = ResilientLLM(
+            models, retries=rule.retries, timeout=rule.timeout, hedge=rule.hedge, hedge_delay=rule.hedge_delay
+        )
+        logger.debug(f"事件 {event.type} 已路由至模型配置: {rule.model}")
+        return await resilient.ask(request, stream=stream)
@@ -1,48 +1,221 @@
 import asyncio
+import heapq
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 
-import dateparser
 from nonebot import logger
+from nonebot_plugin_orm import get_session
 
+from ..database.crud import ScheduledEventORM
+from ..utils.time_parser import parse_time_async
 from .events import ScheduledTriggerEvent, ScheduledTriggerPayload
 from .intents import PlanFutureEventIntent
 
+MAX_SLEEP_SECONDS = 60
+"""调度任务的最长单次休眠时间，用于应对系统时间的跳变"""
+
+
+@dataclass
+class ScheduledEventInfo:
+    id: int
+    """计划事件 ID"""
+    when: str
+    """原始的自然语言时间"""
+    what: str
+    """计划内容"""
+    trigger_at: datetime
+    """触发时间"""
+
 
 class Scheduler:
+    """
+    计划事件调度器
+
+    计划事件持久化到数据库中，由单个后台任务按最小堆的顺序依次触发；
+    启动时会重新加载未触发的事件，并立即补发错过的事件
+    """
+
     def __init__(self, event_queue: asyncio.Queue):
         self.event_queue = event_queue
-        # self._tasks = []
 
-    def parse_time(self, natural_time: str) -> Optional[datetime]:
-        # settings={'PREFER_DATES_FROM': 'future'} 确保 '8am' 是明天的如果今天已经过了
-        return dateparser.parse(natural_time, settings={"PREFER_DATES_FROM": "future"})
+        self._events: dict[int, ScheduledEventInfo] = {}
+        """待触发事件"""
+        self._heap: list[tuple[float, int]] = []
+        """(触发时间戳, 事件 ID)，被取消或修改时间的旧条目在出堆时跳过"""
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def parse_time(self, natural_time: str) -> Optional[datetime]:
+        # 优先使用快速路径解析，回退至 dateparser 时在事件循环外执行（同样优先解析为未来的时间）
+        return await parse_time_async(natural_time)
+
+    def _push(self, info: ScheduledEventInfo):
+        self._events[info.id] = info
+        heapq.heappush(self._heap, (info.trigger_at.timestamp(), info.id))
+        self._wakeup.set()
+
+    async def start(self):
+        """
+        加载未触发的计划事件并启动调度任务
+        """
+        if self._task is not None and not self._task.done():
+            return
+
+        async with get_session() as session:
+            records = await ScheduledEventORM.get_pending_events(session)
+
+        now = datetime.now()
+        missed = 0
+        for record in records:
+            self._push(ScheduledEventInfo(record.id, record.when, record.what, record.trigger_at))
+            missed += record.trigger_at <= now
+
+        logger.info(f"已加载 {len(records)} 个计划事件，其中 {missed} 个已错过，将立即触发")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        停止调度任务（未触发的事件保留在数据库中）
+        """
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def schedule(self, intent: PlanFutureEventIntent) -> Optional[int]:
+        """
+        添加计划事件
 
-    async def schedule(self, intent: PlanFutureEventIntent):
+        :return: 计划事件 ID，时间无法解析时返回 None
+        """
         when_str = intent.when
         what_str = intent.what
-        payload = ScheduledTriggerPayload(when_str, what_str)
 
-        target_time = self.parse_time(when_str)
+        target_time = await self.parse_time(when_str)
         if not target_time:
             logger.error(f"无法解析时间: {when_str}")
-            return
-
-        now = datetime.now()
-        delay_seconds = (target_time - now).total_seconds()
+            return None
 
-        if delay_seconds < 0:
+        if target_time <= datetime.now():
             logger.warning("预定时间已过，立即触发")
-            delay_seconds = 0
 
-        logger.info(f"计划在 {target_time} ({delay_seconds:.0f}s 后) 触发事件: {payload}")
+        async with get_session() as session:
+            record = await ScheduledEventORM.add_event(session, when_str, what_str, target_time)
+            await session.commit()
+            info = ScheduledEventInfo(record.id, when_str, what_str, target_time)
+
+        logger.info(f"计划在 {target_time} 触发事件 #{info.id}: {what_str}")
+        self._push(info)
+        return info.id
+
+    async def cancel(self, event_id: int) -> bool:
+        """
+        取消计划事件
 
-        # 创建后台任务等待
-        asyncio.create_task(self._wait_and_trigger(delay_seconds, payload))
+        :return: 是否存在该待触发事件
+        """
+        if self._events.pop(event_id, None) is None:
+            return False
 
-    async def _wait_and_trigger(self, delay: float, payload: ScheduledTriggerPayload):
-        await asyncio.sleep(delay)
+        async with get_session() as session:
+            await ScheduledEventORM.set_status(session, event_id, "cancelled")
+            await session.commit()
 
+        logger.info(f"已取消计划事件 #{event_id}")
+        return True
+
+    async def reschedule(self, event_id: int, when: Union[str, datetime]) -> bool:
+        """
+        修改计划事件的触发时间
+
+        :param when: 新的触发时间（自然语言或 datetime）
+
+        :return: 是否修改成功
+        """
+        info = self._events.get(event_id)
+        if info is None:
+            return False
+
+        target_time = await self.parse_time(when) if isinstance(when, str) else when
+        if not target_time:
+            logger.error(f"无法解析时间: {when}")
+            return False
+
+        async with get_session() as session:
+            await ScheduledEventORM.reschedule_event(session, event_id, target_time)
+            await session.commit()
+
+        info.trigger_at = target_time
+        if isinstance(when, str):
+            info.when = when
+        self._push(info)
+
+        logger.info(f"计划事件 #{event_id} 已改至 {target_time} 触发")
+        return True
+
+    def list_events(self) -> list[ScheduledEventInfo]:
+        """
+        列出所有待触发的计划事件（按触发时间排序）
+        """
+        return sorted(self._events.values(), key=lambda info: info.trigger_at)
+
+    def _pop_due(self, now: float) -> tuple[list[ScheduledEventInfo], Optional[float]]:
+        """
+        取出所有到期的事件
+
+        :return: (到期事件, 距下一个事件的秒数)
+        """
+        due: list[ScheduledEventInfo] = []
+
+        while self._heap:
+            timestamp, event_id = self._heap[0]
+            info = self._events.get(event_id)
+
+            # 已取消或已修改时间的旧条目
+            if info is None or info.trigger_at.timestamp() != timestamp:
+                heapq.heappop(self._heap)
+                continue
+
+            if timestamp > now:
+                return due, timestamp - now
+
+            heapq.heappop(self._heap)
+            del self._events[event_id]
+            due.append(info)
+
+        return due, None
+
+    async def _trigger(self, info: ScheduledEventInfo):
         # 时间到了！生产一个事件回传给 Muika
-        event = ScheduledTriggerEvent(payload=payload)
-        await self.event_queue.put(event)
+        await self.event_queue.put(ScheduledTriggerEvent(payload=ScheduledTriggerPayload(info.when, info.what)))
+
+        async with get_session() as session:
+            await ScheduledEventORM.set_status(session, info.id, "delivered")
+            await session.commit()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            due, delay = self._pop_due(datetime.now().timestamp())
+
+            for info in due:
+                logger.info(f"触发计划事件 #{info.id}: {info.what}")
+                try:
+                    await self._trigger(info)
+                except Exception as e:
+                    logger.error(f"触发计划事件 #{info.id} 失败: {e}")
+
+            if due:
+                continue
+
+            timeout = MAX_SLEEP_SECONDS if delay is None else min(delay, MAX_SLEEP_SECONDS)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,144 @@
+import inspect
+from dataclasses import dataclass, field
+from random import choice
+from typing import Awaitable, Callable, Literal, Optional, Union
+
+from nonebot import logger
+
+from ..config import get_model_config
+from .events import Event
+from .intents import Intent, SendMessageIntent
+from .state import MuikaState
+
+TriageDecision = Literal["skip", "template", "think"]
+
+
+@dataclass
+class TriageResult:
+    decision: TriageDecision
+    """分诊结果：跳过思考 / 使用模板意图 / 交由模型思考"""
+    intent: Optional[Intent] = None
+    """模板意图（仅 decision 为 template 时有效）"""
+    reason: str = ""
+    """分诊原因"""
+
+
+@dataclass
+class TriageStats:
+    skipped: int = 0
+    """跳过思考的次数"""
+    templated: int = 0
+    """使用模板意图的次数"""
+    escalated: int = 0
+    """交由模型思考的次数"""
+    by_rule: dict[str, int] = field(default_factory=dict)
+    """各规则命中的次数"""
+
+    @property
+    def avoided(self) -> int:
+        """避免的模型调用次数"""
+        return self.skipped + self.templated
+
+
+TriageRule = Callable[[Event, MuikaState], Union[Optional[TriageResult], Awaitable[Optional[TriageResult]]]]
+
+TRIVIAL_FEEDBACK_INTENTS = {"plan_future_event"}
+"""执行成功后无需再次思考的意图"""
+STICKER_REPLIES = ["ehehe~", "(｡･ω･｡)", "♪", "嘿嘿~"]
+"""仅有表情的消息的模板回复"""
+
+
+class Triage:
+    """
+    思考前的分诊层
+
+    按注册顺序依次执行规则，第一个返回结果的规则决定是否跳过思考、直接使用模板意图或交由模型思考；
+    所有规则都未命中时交由模型思考。规则可以是同步或异步函数（如基于本地分类器或嵌入相似度的规则）
+    """
+
+    def __init__(self) -> None:
+        self.rules: list[TriageRule] = []
+        self.stats = TriageStats()
+        """分诊统计"""
+
+    def register(self, rule: TriageRule) -> TriageRule:
+        """
+        注册分诊规则（可用作装饰器）
+        """
+        self.rules.append(rule)
+        return rule
+
+    async def evaluate(self, event: Event, state: MuikaState) -> TriageResult:
+        """
+        对事件进行分诊
+        """
+        for rule in self.rules:
+            result = rule(event, state)
+            if inspect.isawaitable(result):
+                result = await result
+            if result is None:
+                continue
+
+            name = getattr(rule, "__name__", repr(rule))
+            self.stats.by_rule[name] = self.stats.by_rule.get(name, 0) + 1
+            if result.decision == "skip":
+                self.stats.skipped += 1
+            elif result.decision == "template":
+                self.stats.templated += 1
+            else:
+                self.stats.escalated += 1
+                return result
+
+            logger.debug(
+                f"分诊规则 {name} 命中: {result.decision} ({result.reason})，已避免 {self.stats.avoided} 次模型调用"
+            )
+            return result
+
+        self.stats.escalated += 1
+        return TriageResult("think")
+
+
+def skip_trivial_feedback(event: Event, state: MuikaState) -> Optional[TriageResult]:
+    """
+    执行成功且结果无需回应的意图反馈（如 "Future event planned."）
+    """
+    if event.type != "action_feedback":
+        return None
+
+    result = event.payload.result
+    if event.payload.intent.name in TRIVIAL_FEEDBACK_INTENTS and result and result.success:
+        return TriageResult("skip", reason=f"trivial feedback: {event.payload.intent.name}")
+    return None
+
+
+def reply_to_textless_message(event: Event, state: MuikaState) -> Optional[TriageResult]:
+    """
+    模型无法理解其内容的无文字用户消息，直接使用模板回复：
+
+    - 仅有表情的消息（表情不会被提取为多模态资源）
+    - 仅有图片、音视频或文件，但默认模型未启用多模态的消息
+
+    默认模型启用多模态时，仅有图片等多模态资源的消息交由模型思考
+    """
+    if event.type != "user_message" or event.payload.message.message.strip():
+        return None
+
+    if not event.payload.message.resources:
+        reason = "sticker-only message"
+    elif not get_model_config().multimodal:
+        reason = "media-only message without multimodal model"
+    else:
+        return None
+
+    intent = SendMessageIntent(content=choice(STICKER_REPLIES), confidence=0.6, reason=reason)
+    return TriageResult("template", intent=intent, reason=reason)
+
+
+def create_default_triage() -> Triage:
+    """
+    创建带有内置规则的分诊层
+    """
+    triage = Triage()
+    triage.register(skip_trivial_feedback)
+    triage.register(reply_to_textless_message)
+    return triage
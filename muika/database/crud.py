@@ -1,10 +1,15 @@
 from datetime import datetime
-from typing import Literal, Optional
+from typing import Literal, Optional, Sequence, Union
 
 from nonebot_plugin_orm import async_scoped_session
-from sqlalchemy import func, select
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .orm_models import Usage
+from ..models import Message, Resource
+from .orm_models import Msg, ScheduledEvent, Usage
+
+DBSession = Union[async_scoped_session, AsyncSession]
+"""数据库会话（`get_scoped_session` 或 `get_session` 获取的会话）"""
 
 
 class UsageORM:
@@ -54,3 +59,142 @@ class UsageORM:
             return
 
         session.add(Usage(plugin=plugin, type=type, date=date, tokens=total_tokens))
+
+
+class ScheduledEventORM:
+    @staticmethod
+    async def add_event(session: DBSession, when: str, what: str, trigger_at: datetime) -> ScheduledEvent:
+        """
+        添加计划事件
+        """
+        event = ScheduledEvent(when=when, what=what, trigger_at=trigger_at, status="pending", created_at=datetime.now())
+        session.add(event)
+        await session.flush()
+        return event
+
+    @staticmethod
+    async def get_pending_events(session: DBSession) -> list[ScheduledEvent]:
+        """
+        获取所有待触发的计划事件（按触发时间排序）
+        """
+        result = await session.execute(
+            select(ScheduledEvent).where(ScheduledEvent.status == "pending").order_by(ScheduledEvent.trigger_at)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def set_status(
+        session: DBSession, event_id: int, status: Literal["pending", "delivered", "cancelled"]
+    ) -> bool:
+        """
+        更新待触发计划事件的状态
+
+        :return: 是否存在该待触发事件
+        """
+        result = await session.execute(
+            update(ScheduledEvent)
+            .where(ScheduledEvent.id == event_id, ScheduledEvent.status == "pending")
+            .values(status=status)
+        )
+        return bool(result.rowcount)  # type:ignore
+
+    @staticmethod
+    async def reschedule_event(session: DBSession, event_id: int, trigger_at: datetime) -> bool:
+        """
+        修改待触发计划事件的触发时间
+
+        :return: 是否存在该待触发事件
+        """
+        result = await session.execute(
+            update(ScheduledEvent)
+            .where(ScheduledEvent.id == event_id, ScheduledEvent.status == "pending")
+            .values(trigger_at=trigger_at)
+        )
+        return bool(result.rowcount)  # type:ignore
+
+
+class MessageORM:
+    @staticmethod
+    def _to_row(message: Message) -> dict:
+        return {
+            "time": message.format_time,
+            "userid": message.userid,
+            "groupid": message.groupid,
+            "message": message.message,
+            "respond": message.respond,
+            "history": message.history,
+            "resources": [resource.to_dict() for resource in message.resources],
+            "usage": message.usage,
+            "profile": message.profile,
+        }
+
+    @staticmethod
+    def _to_message(record: Msg) -> Message:
+        return Message(
+            id=record.id,
+            time=record.time.strftime("%Y.%m.%d %H:%M:%S"),
+            userid=record.userid,
+            groupid=record.groupid,
+            message=record.message,
+            respond=record.respond,
+            history=record.history,
+            resources=[Resource(**resource) for resource in record.resources or []],
+            usage=record.usage,
+            profile=record.profile,
+        )
+
+    @staticmethod
+    async def add_messages(session: DBSession, messages: Sequence[Message]):
+        """
+        批量保存消息（单条 INSERT 语句，不回填消息 ID）
+
+        多模态资源的 mimetype 需预先确定（见 `Resource.ensure_mimetype_async`），以免在此处阻塞事件循环
+        """
+        if not messages:
+            return
+        await session.execute(insert(Msg), [MessageORM._to_row(message) for message in messages])
+
+    @staticmethod
+    async def get_history(
+        session: DBSession,
+        userid: str,
+        groupid: str = "-1",
+        profile: str = "_default",
+        limit: int = 20,
+        before: Optional[Message] = None,
+        history_only: bool = True,
+    ) -> list[Message]:
+        """
+        分页获取对话历史，按 `(profile, userid, groupid, time)` 索引查询
+
+        :param userid: 用户 ID
+        :param groupid: 群组 ID，私聊为 -1
+        :param profile: 存档
+        :param limit: 每页的消息数
+        :param before: (可选)上一页中最早的消息，为空则获取最近的一页
+        :param history_only: 是否只获取可用于对话历史的消息
+
+        :return: 消息列表（最早的在前）
+        """
+        query = select(Msg).where(Msg.profile == profile, Msg.userid == userid, Msg.groupid == groupid)
+        if history_only:
+            query = query.where(Msg.history == 1)
+        if before is not None and before.id is not None:
+            # 以 (time, id) 为游标翻页，同一秒内的消息不会被跳过
+            before_time = before.format_time
+            query = query.where(or_(Msg.time < before_time, and_(Msg.time == before_time, Msg.id < before.id)))
+
+        result = await session.execute(query.order_by(Msg.time.desc(), Msg.id.desc()).limit(limit))
+        return [MessageORM._to_message(record) for record in reversed(result.scalars().all())]
+
+    @staticmethod
+    async def count_history(session: DBSession, userid: str, groupid: str = "-1", profile: str = "_default") -> int:
+        """
+        获取对话历史的消息数
+        """
+        result = await session.execute(
+            select(func.count(Msg.id)).where(
+                Msg.profile == profile, Msg.userid == userid, Msg.groupid == groupid, Msg.history == 1
+            )
+        )
+        return result.scalar() or 0
@@ -1,5 +1,7 @@
+from datetime import datetime
+
 from nonebot_plugin_orm import Model
-from sqlalchemy import Integer, String
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 
@@ -9,3 +11,31 @@ class Usage(Model):
     type: Mapped[str] = mapped_column(String, nullable=False)
     date: Mapped[str] = mapped_column(String, nullable=False)
     tokens: Mapped[int] = mapped_column(Integer, nullable=True, default=0)
+
+
+class ScheduledEvent(Model):
+    __tablename__ = "muika_scheduled_event"
+    __table_args__ = (Index("ix_muika_scheduled_event_status_trigger_at", "status", "trigger_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    when: Mapped[str] = mapped_column(String, nullable=False)
+    what: Mapped[str] = mapped_column(String, nullable=False)
+    trigger_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="pending")
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
+
+
+class Msg(Model):
+    __tablename__ = "muika_msg"
+    __table_args__ = (Index("ix_muika_msg_profile_userid_groupid_time", "profile", "userid", "groupid", "time"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    time: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
+    userid: Mapped[str] = mapped_column(String, nullable=False)
+    groupid: Mapped[str] = mapped_column(String, nullable=False, default="-1")
+    message: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    respond: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    history: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    resources: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    usage: Mapped[int] = mapped_column(Integer, nullable=False, default=-1)
+    profile: Mapped[str] = mapped_column(String, nullable=False, default="_default")
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Optional
+
+from nonebot import logger
+from nonebot_plugin_orm import get_session
+
+from ..models import Message
+from .crud import MessageORM
+
+
+class MessageWriter:
+    """
+    消息的延迟批量写入
+
+    消息先进入内存缓冲区，每隔 `flush_interval` 秒（或缓冲区达到 `batch_size` 条时）以单条 INSERT 语句批量落库，
+    使消息的保存不阻塞对话流程。写入失败的消息会留在缓冲区中等待下次写入，超出 `max_buffered` 条时丢弃最早的消息
+    """
+
+    def __init__(self, flush_interval: float = 2.0, batch_size: int = 64, max_buffered: int = 4096) -> None:
+        """
+        :param flush_interval: 写入间隔（秒）
+        :param batch_size: 缓冲区达到该条数时立即写入
+        :param max_buffered: 缓冲区的最大条数
+        """
+        self.flush_interval = flush_interval
+        """写入间隔（秒）"""
+        self.batch_size = batch_size
+        """缓冲区达到该条数时立即写入"""
+        self.max_buffered = max_buffered
+        """缓冲区的最大条数"""
+
+        self._buffer: list[Message] = []
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, message: Message):
+        """
+        将消息加入写入缓冲区
+        """
+        self._buffer.append(message)
+        if len(self._buffer) > self.max_buffered:
+            dropped = len(self._buffer) - self.max_buffered
+            del self._buffer[:dropped]
+            logger.warning(f"消息写入缓冲区已满，丢弃最早的 {dropped} 条消息")
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """
+        立即写入缓冲区中的消息
+
+        :return: 写入的消息数
+        """
+        async with self._lock:
+            if not self._buffer:
+                return 0
+
+            messages, self._buffer = self._buffer, []
+            try:
+                await asyncio.gather(
+                    *(resource.ensure_mimetype_async() for message in messages for resource in message.resources)
+                )
+                async with get_session() as session:
+                    await MessageORM.add_messages(session, messages)
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"写入消息失败，将在下次写入时重试: {e}")
+                self._buffer[:0] = messages
+                return 0
+
+            logger.debug(f"已写入 {len(messages)} 条消息")
+            return len(messages)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # 停止任务时不中断正在进行的写入
+            await asyncio.shield(self.flush())
+
+    def start(self):
+        """
+        启动后台写入任务
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        停止后台写入任务，并写入缓冲区中剩余的消息
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
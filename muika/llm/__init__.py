@@ -1,15 +1,19 @@
 from ._base import BaseLLM, EmbeddingModel
-from ._config import EmbeddingConfig, ModelConfig
+from ._config import EmbeddingConfig, ModelConfig, RouteRule
 from ._dependencies import MODEL_DEPENDENCY_MAP, get_missing_dependencies
 from ._schema import ModelCompletions, ModelRequest, ModelStreamCompletions
+from .history import CompactedHistory, HistoryBudget, create_model_summarizer
 from .loader import load_embedding_model, load_model
 from .registry import get_embedding_class, get_llm_class, register
+from .resilience import CircuitBreaker, ResilientLLM
+from .schemas import SchemaEntry, SchemaRegistry, schema_registry
 
 __all__ = [
     "BaseLLM",
     "EmbeddingModel",
     "EmbeddingConfig",
     "ModelConfig",
+    "RouteRule",
     "ModelRequest",
     "ModelCompletions",
     "ModelStreamCompletions",
@@ -20,4 +24,12 @@ __all__ = [
     "get_embedding_class",
     "load_model",
     "load_embedding_model",
+    "HistoryBudget",
+    "CompactedHistory",
+    "create_model_summarizer",
+    "ResilientLLM",
+    "CircuitBreaker",
+    "SchemaEntry",
+    "SchemaRegistry",
+    "schema_registry",
 ]
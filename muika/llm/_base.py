@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 from abc import ABC, abstractmethod
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, AsyncGenerator, Literal, Optional, Union, overload
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Literal,
+    Optional,
+    Union,
+    overload,
+)
 
 import numpy as np
 from nonebot import logger
@@ -19,6 +28,17 @@ from ._schema import (
     ModelRequest,
     ModelStreamCompletions,
 )
+from .history import HistoryBudget, create_model_summarizer
+from .utils.images import preload_files_base64
+from .utils.uploads import (
+    TransferStats,
+    get_inline_size,
+    get_upload_scope,
+    upload_registry,
+)
+
+if TYPE_CHECKING:
+    from ..models import Resource
 
 
 class BaseLLM(ABC):
@@ -28,6 +48,11 @@ class BaseLLM(ABC):
     推荐使用该基类中定义的方法构建模型加载器类，但无论如何都必须实现 `ask` 方法
     """
 
+    uploadable_types: tuple[str, ...] = ()
+    """支持通过文件接口上传复用的资源类型，需同时实现 `_upload_file`"""
+    upload_ttl: float = 0
+    """提供者文件的有效期（秒），<= 0 则不过期"""
+
     def __init__(self, model_config: ModelConfig) -> None:
         """
         统一在此处声明变量
@@ -36,6 +61,20 @@ class BaseLLM(ABC):
         """模型配置"""
         self.is_running = False
         """模型状态"""
+        self.last_transfer_stats = TransferStats()
+        """最近一轮请求的多模态数据传输统计"""
+        self.history_budget: Optional[HistoryBudget] = None
+        """对话历史的 Token 预算"""
+
+        if model_config.history_max_tokens > 0:
+            summary_max_tokens = model_config.history_summary_max_tokens
+            summarizer = create_model_summarizer(self, summary_max_tokens) if model_config.history_summarize else None
+            self.history_budget = HistoryBudget(
+                model_config.history_max_tokens,
+                summary_max_tokens,
+                provider=model_config.provider,
+                summarizer=summarizer,
+            )
 
     def __init_subclass__(cls, **kwargs):
         """
@@ -70,6 +109,79 @@ class BaseLLM(ABC):
         """
         raise NotImplementedError
 
+    @property
+    def _upload_scope(self) -> str:
+        return get_upload_scope(self.config.provider, self.config.api_host, self.config.api_key)
+
+    async def _upload_file(self, resource: "Resource") -> str:
+        """
+        上传文件至提供者的文件接口
+
+        :return: 文件引用（文件 ID 或 URI）
+        """
+        raise NotImplementedError
+
+    def _get_uploaded_file(self, resource: "Resource") -> Optional[str]:
+        """
+        获取已上传文件的引用，未启用上传或文件未上传时返回 None（此时应回退为 Base64 内联）
+        """
+        if not (self.config.upload_files and resource.path and resource.type in self.uploadable_types):
+            return None
+        return upload_registry.lookup(self._upload_scope, resource.path)
+
+    async def _compact_history(self, request: "ModelRequest") -> "ModelRequest":
+        """
+        按 `history_max_tokens` 压缩请求的对话历史：较早的对话被折叠为摘要并附加至系统提示词，
+        较早对话中的多模态资源被移除
+
+        :return: 压缩后的请求副本，原请求保持不变（未启用预算时返回原请求）
+        """
+        if self.history_budget is None:
+            return request
+        return await self.history_budget.compact_request(request)
+
+    async def _preload_resources(
+        self, request: "ModelRequest", include_history: Optional[bool] = None
+    ) -> "ModelRequest":
+        """
+        在事件循环外预先上传或编码请求中的多模态文件，使随后的 `_build_messages` 不再阻塞事件循环
+
+        启用 `upload_files` 时，支持的文件会上传至提供者的文件接口（已上传的直接复用），其余文件预先进行 Base64 编码。
+        预加载前会先按 Token 预算压缩对话历史，被移除的资源不再加载
+
+        :param request: 模型调用请求体
+        :param include_history: 是否包括历史消息中的文件，默认仅在启用多模态时包括
+
+        :return: 压缩对话历史后的请求（之后应使用该请求构建上下文）
+        """
+        request = await self._compact_history(request)
+        include_history = self.config.multimodal if include_history is None else include_history
+
+        resources = [resource for resource in request.resources if resource.path]
+        if include_history:
+            resources.extend(resource for message in request.history for resource in message.resources if resource.path)
+
+        await asyncio.gather(*(resource.ensure_mimetype_async() for resource in resources))
+
+        stats = TransferStats()
+        if self.config.upload_files and self.uploadable_types:
+            uploadable = [resource for resource in resources if resource.type in self.uploadable_types]
+            stats = await upload_registry.ensure(self._upload_scope, uploadable, self._upload_file, self.upload_ttl)
+            resources = [resource for resource in resources if self._get_uploaded_file(resource) is None]
+
+        paths = [resource.path for resource in resources]
+        stats.inline_bytes = await asyncio.to_thread(get_inline_size, paths)
+        await preload_files_base64(paths)
+
+        self.last_transfer_stats = stats
+        if stats.sent_bytes or stats.reused_bytes:
+            logger.debug(
+                f"本轮多模态数据传输: 内联 {stats.inline_bytes} bytes, "
+                f"上传 {stats.uploaded_bytes} bytes ({stats.uploaded_files} 个文件), "
+                f"复用 {stats.reused_bytes} bytes ({stats.reused_files} 个文件)"
+            )
+        return request
+
     async def _ask_sync(
         self, messages: list, tools: Any, response_format: Any, total_tokens: int = 0
     ) -> "ModelCompletions":
@@ -1,5 +1,5 @@
 from importlib.util import find_spec
-from typing import Any, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, field_validator
 
@@ -58,6 +58,14 @@ class ModelConfig(BaseModel):
     """生成模态"""
     audio: Optional[Any] = None
     """多模态音频参数"""
+    upload_files: bool = False
+    """是否将多模态文件上传至提供者的文件接口，并在之后的对话中以文件 ID 引用（仅部分提供者支持）"""
+    history_max_tokens: int = 0
+    """对话历史（包括摘要）的最大 Token 数，超出时较早的对话会被折叠为摘要，<= 0 则不限制"""
+    history_summary_max_tokens: int = 300
+    """对话历史摘要的最大 Token 数"""
+    history_summarize: bool = False
+    """是否使用该模型生成对话历史摘要（否则使用本地截断摘要）"""
 
     @field_validator("provider")
     @classmethod
@@ -77,6 +85,37 @@ class ModelConfig(BaseModel):
         return provider
 
 
+class RouteRule(BaseModel):
+    """
+    模型路由规则（位于 `configs/models.yml` 的 `routing` 项中）
+
+    所有已填写的条件均满足时命中该规则，未填写的条件视为满足
+    """
+
+    model: str
+    """命中时使用的模型配置名"""
+    events: List[str] = []
+    """匹配的事件类型（如 `user_message`、`time_tick`），为空则匹配所有事件"""
+    min_state: Dict[str, float] = {}
+    """状态下限（如 `loneliness: 0.8`），状态值不低于该值时满足"""
+    max_state: Dict[str, float] = {}
+    """状态上限（如 `attention: 0.4`），状态值不高于该值时满足"""
+    min_prompt_tokens: int = 0
+    """Prompt 的最小估算 Token 数"""
+    max_prompt_tokens: Optional[int] = None
+    """Prompt 的最大估算 Token 数"""
+    fallbacks: List[str] = []
+    """主模型调用失败或超时后依次尝试的模型配置名"""
+    timeout: Optional[float] = None
+    """单次模型调用的超时时间（秒）"""
+    retries: int = 2
+    """每个模型的最大重试次数"""
+    hedge: bool = False
+    """是否启用对冲请求：主模型在首个 Token 延迟的 p95 内无输出时，同时请求首个后备模型并采用先完成的一方"""
+    hedge_delay: Optional[float] = None
+    """对冲等待时间（秒），为空则根据主模型的历史延迟估算"""
+
+
 class EmbeddingConfig(BaseModel):
     provider: str
     """所使用模型提供者的名称，位于 llm/embedding 下"""
@@ -0,0 +1,276 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Generic,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+from nonebot import logger
+
+from ._schema import ModelRequest
+from .utils.tokens import RESOURCE_TOKENS, estimate_tokens, truncate_to_tokens
+
+if TYPE_CHECKING:
+    from ..models import Message
+    from ._base import BaseLLM
+
+T = TypeVar("T")
+
+Summarizer = Callable[[str, str], Awaitable[str]]
+"""摘要函数：(已有摘要, 新折叠的对话文本) -> 新的摘要"""
+
+SUMMARY_CHUNK_TURNS = 4
+"""每次折叠的对话轮数，同时是折叠边界的缓存键所包含的对话轮数"""
+SUMMARY_CACHE_SIZE = 512
+"""摘要缓存的最大条目数（每个折叠边界占用至多 `SUMMARY_CHUNK_TURNS` 个条目）"""
+LOCAL_SUMMARY_TURN_TOKENS = 48
+"""本地摘要中每轮对话保留的最大 Token 数"""
+
+RESOURCE_PLACEHOLDERS = {"image": "[图片]", "audio": "[音频]", "video": "[视频]", "file": "[文件]"}
+"""旧对话中被移除的多模态资源的文字占位"""
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You compress chat history. Merge the existing summary and the new conversation into one concise summary "
+    "in the language of the conversation. Keep names, facts, preferences, promises and open questions; "
+    "drop greetings and small talk. Output only the summary."
+)
+
+
+@dataclass
+class CompactedHistory(Generic[T]):
+    summary: str
+    """被折叠的早期对话的摘要（未折叠时为空字符串）"""
+    turns: list[T]
+    """保留的近期对话"""
+    folded: int
+    """被折叠的对话数"""
+    tokens: int
+    """估算的总 Token 数（摘要与保留的对话）"""
+
+
+def render_message(message: "Message") -> str:
+    """
+    将一轮对话历史渲染为用于摘要与估算的文本
+    """
+    return f"User: {message.message}\nAssistant: {message.respond}"
+
+
+def create_model_summarizer(model: Union["BaseLLM", Callable[[], "BaseLLM"]], max_tokens: int) -> Summarizer:
+    """
+    创建使用模型生成摘要的摘要函数，模型调用经由 `ResilientLLM` 重试，仍失败时回退至本地摘要
+
+    :param model: 用于生成摘要的模型，或每次生成摘要时获取模型的函数（用于跟随配置变化）
+    :param max_tokens: 摘要的最大 Token 数
+    """
+    from ._base import BaseLLM
+    from .resilience import ResilientLLM
+
+    async def summarize(previous: str, text: str) -> str:
+        llm = model if isinstance(model, BaseLLM) else model()
+        prompt = f"Existing summary:\n{previous or '(none)'}\n\nNew conversation:\n{text}"
+        completions = await ResilientLLM([llm]).ask(ModelRequest(prompt, system=SUMMARY_SYSTEM_PROMPT))
+        if not completions.succeed or not completions.text.strip():
+            logger.warning(f"生成对话摘要失败，回退至本地摘要: {completions.text}")
+            return local_summary(previous, text, max_tokens)
+        return truncate_to_tokens(completions.text.strip(), max_tokens, llm.config.provider)
+
+    return summarize
+
+
+def _boundary_key(texts: Sequence[str]) -> str:
+    return hashlib.sha1("\0".join(texts).encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def local_summary(previous: str, text: str, max_tokens: int) -> str:
+    """
+    本地摘要：截断每轮对话并拼接，超出长度时优先保留较新的内容
+    """
+    lines = [truncate_to_tokens(line, LOCAL_SUMMARY_TURN_TOKENS) for line in text.splitlines() if line.strip()]
+    lines = previous.splitlines() + lines
+
+    # 从最旧的内容开始丢弃
+    tokens = sum(estimate_tokens(line) + 1 for line in lines)
+    while len(lines) > 1 and tokens > max_tokens:
+        tokens -= estimate_tokens(lines.pop(0)) + 1
+    return truncate_to_tokens("\n".join(lines), max_tokens)
+
+
+class HistoryBudget:
+    """
+    对话历史的 Token 预算
+
+    对话历史超出预算时，将较早的对话按固定轮数逐步并入滚动摘要（摘要按内容缓存，同一段对话只摘要一次），
+    只保留预算内的近期对话，并移除较早对话中的多模态资源。无论对话持续多久，历史部分的大小都保持在预算内
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 1500,
+        summary_max_tokens: int = 300,
+        keep_resource_turns: int = 2,
+        provider: Optional[str] = None,
+        summarizer: Optional[Summarizer] = None,
+    ) -> None:
+        """
+        :param max_tokens: 对话历史（包括摘要）的最大 Token 数
+        :param summary_max_tokens: 摘要的最大 Token 数（包含在 `max_tokens` 内）
+        :param keep_resource_turns: 保留多模态资源的最近对话轮数
+        :param provider: (可选)模型提供者，用于选择分词器系数
+        :param summarizer: (可选)摘要函数，为空则使用本地摘要
+        """
+        self.max_tokens = max_tokens
+        """对话历史（包括摘要）的最大 Token 数"""
+        self.summary_max_tokens = min(summary_max_tokens, max_tokens // 2)
+        """摘要的最大 Token 数"""
+        self.keep_resource_turns = keep_resource_turns
+        """保留多模态资源的最近对话轮数"""
+        self.provider = provider
+        """模型提供者"""
+        self.summarizer = summarizer
+        """摘要函数"""
+
+        self._summaries: OrderedDict[str, str] = OrderedDict()
+        """折叠边界之前若干轮对话的键 -> 截至该边界的摘要"""
+
+    async def _summarize(self, previous: str, text: str) -> str:
+        if self.summarizer is None:
+            return local_summary(previous, text, self.summary_max_tokens)
+        try:
+            return await self.summarizer(previous, text)
+        except Exception as e:
+            logger.warning(f"生成对话摘要失败，回退至本地摘要: {e}")
+            return local_summary(previous, text, self.summary_max_tokens)
+
+    def _lookup(self, texts: Sequence[str], end: int) -> Optional[str]:
+        """
+        获取截至第 `end` 轮（不含）的已缓存摘要
+        """
+        key = _boundary_key(texts[max(0, end - SUMMARY_CHUNK_TURNS) : end])
+        summary = self._summaries.get(key)
+        if summary is not None:
+            self._summaries.move_to_end(key)
+        return summary
+
+    def _store(self, texts: Sequence[str], end: int, summary: str):
+        """
+        缓存截至第 `end` 轮（不含）的摘要
+
+        边界之前的每个后缀均作为键，使边界之前的对话部分滑出窗口后仍可以找到该边界
+        """
+        for start in range(max(0, end - SUMMARY_CHUNK_TURNS), end):
+            self._summaries[_boundary_key(texts[start:end])] = summary
+        while len(self._summaries) > SUMMARY_CACHE_SIZE:
+            self._summaries.popitem(last=False)
+
+    async def _fold(self, texts: Sequence[str], keep_from: int) -> tuple[str, int]:
+        """
+        将较早的对话折叠为摘要，至少折叠前 `keep_from` 轮（始终保留最后一轮）
+
+        摘要滚动生成：从最近的已缓存折叠边界（锚点）开始，每次将 `SUMMARY_CHUNK_TURNS` 轮对话并入已有摘要。
+        折叠边界以其之前若干轮对话的内容为键，与其在序列中的位置无关，因此最早的对话滑出窗口后锚点仍然有效，
+        每轮新的对话平均只需 1 / `SUMMARY_CHUNK_TURNS` 次摘要
+
+        :return: 摘要与被折叠的对话数
+        """
+        if keep_from <= 0:
+            return "", 0
+
+        last = len(texts) - 1
+        summary = ""
+        folded = 0
+        for end in range(min(keep_from + SUMMARY_CHUNK_TURNS - 1, last), 0, -1):
+            cached = self._lookup(texts, end)
+            if cached is not None:
+                summary, folded = cached, end
+                break
+
+        while folded < min(keep_from, last):
+            end = min(folded + SUMMARY_CHUNK_TURNS, last)
+            summary = await self._summarize(summary, "\n".join(texts[folded:end]))
+            self._store(texts, end, summary)
+            folded = end
+
+        return summary, folded
+
+    async def compact(
+        self,
+        turns: Sequence[T],
+        render: Callable[[T], str],
+        cost: Optional[Callable[[T], int]] = None,
+    ) -> CompactedHistory[T]:
+        """
+        按预算压缩对话历史
+
+        :param turns: 对话历史（最早的在前）
+        :param render: 将一轮对话渲染为文本的函数
+        :param cost: (可选)估算一轮对话 Token 数的函数，默认估算渲染后的文本
+
+        :return: 摘要与保留的近期对话
+        """
+        costs = [cost(turn) if cost else estimate_tokens(render(turn), self.provider) for turn in turns]
+        total = sum(costs)
+        if total <= self.max_tokens:
+            return CompactedHistory("", list(turns), 0, total)
+
+        # 从最近的对话开始保留，直至用尽除摘要外的预算（至少保留最近一轮）
+        budget = self.max_tokens - self.summary_max_tokens
+        kept_tokens = 0
+        keep_from = len(turns)
+        while keep_from > 0 and (kept_tokens + costs[keep_from - 1] <= budget or keep_from == len(turns)):
+            keep_from -= 1
+            kept_tokens += costs[keep_from]
+
+        # 从已缓存的折叠边界开始按固定轮数折叠，使摘要可以被缓存复用
+        summary, folded = await self._fold([render(turn) for turn in turns], keep_from)
+        kept = list(turns[folded:])
+        tokens = estimate_tokens(summary, self.provider) + sum(costs[folded:])
+
+        logger.debug(f"对话历史已压缩: 折叠 {folded} 轮，保留 {len(kept)} 轮，约 {total} -> {tokens} tokens")
+        return CompactedHistory(summary, kept, folded, tokens)
+
+    def message_cost(self, message: "Message") -> int:
+        """
+        估算一轮对话历史的 Token 数（包括多模态资源）
+        """
+        text_tokens = estimate_tokens(render_message(message), self.provider)
+        return text_tokens + sum(RESOURCE_TOKENS.get(resource.type, 0) for resource in message.resources)
+
+    def _strip_resources(self, message: "Message") -> "Message":
+        placeholders = " ".join(RESOURCE_PLACEHOLDERS.get(resource.type, "[文件]") for resource in message.resources)
+        return replace(message, message=f"{message.message} {placeholders}".strip(), resources=[])
+
+    async def compact_messages(self, history: Sequence["Message"]) -> CompactedHistory["Message"]:
+        """
+        按预算压缩 `ModelRequest.history`，并移除较早对话中的多模态资源
+        """
+        cutoff = len(history) - self.keep_resource_turns
+        history = [
+            self._strip_resources(message) if index < cutoff and message.resources else message
+            for index, message in enumerate(history)
+        ]
+        return await self.compact(history, render_message, self.message_cost)
+
+    async def compact_request(self, request: ModelRequest) -> ModelRequest:
+        """
+        按预算压缩请求的对话历史，被折叠的对话以摘要的形式附加至系统提示词
+
+        请求可能在重试、后备模型与对冲请求之间共享，因此不修改原请求
+
+        :return: 压缩后的请求副本（无需压缩时返回原请求）
+        """
+        if not request.history:
+            return request
+
+        compacted = await self.compact_messages(request.history)
+        system = request.system
+        if compacted.summary:
+            summary = f"Summary of the earlier conversation:\n{compacted.summary}"
+            system = f"{system}\n\n{summary}" if system else summary
+        return replace(request, history=compacted.turns, system=system)
@@ -131,6 +131,7 @@ class Echo(BaseLLM):
 
         :return: 模型输出体
         """
+        request = await self._preload_resources(request)
         messages = self._build_messages(request)
 
         if stream:
@@ -26,7 +26,6 @@ from azure.ai.inference.models import (
 from azure.core.credentials import AzureKeyCredential
 from azure.core.exceptions import HttpResponseError
 from nonebot import logger
-from pydantic import TypeAdapter
 
 from .. import (
     BaseLLM,
@@ -35,7 +34,9 @@ from .. import (
     ModelRequest,
     ModelStreamCompletions,
     register,
+    schema_registry,
 )
+from ..utils.images import get_file_base64
 from ..utils.tools import function_call_handler
 
 
@@ -67,15 +68,17 @@ class Azure(BaseLLM):
             elif resource.type == "audio":
                 multi_content_items.append(
                     AudioContentItem(
-                        input_audio=InputAudio.load(audio_file=resource.path, audio_format=resource.path.split(".")[-1])
+                        input_audio=InputAudio(
+                            data=get_file_base64(local_path=resource.path), format=resource.path.split(".")[-1]
+                        )
                     )
                 )
             elif resource.type == "image":
+                image_format = resource.path.split(".")[-1]
                 multi_content_items.append(
                     ImageContentItem(
-                        image_url=ImageUrl.load(
-                            image_file=resource.path,
-                            image_format=resource.path.split(".")[-1],
+                        image_url=ImageUrl(
+                            url=f"data:image/{image_format};base64,{get_file_base64(local_path=resource.path)}",
                             detail=ImageDetailLevel.AUTO,
                         )
                     )
@@ -316,19 +319,16 @@ class Azure(BaseLLM):
     async def ask(
         self, request: ModelRequest, *, stream: bool = False
     ) -> Union[ModelCompletions, AsyncGenerator[ModelStreamCompletions, None]]:
+        request = await self._preload_resources(request, include_history=True)
         messages = self._build_messages(request)
 
         tools = self.__build_tools_definition(request.tools) if request.tools else []
 
         if request.format == "json" and request.json_schema:
-            if isinstance(request.json_schema, TypeAdapter):
-                schema = request.json_schema.json_schema()
-            else:
-                schema = request.json_schema.model_json_schema()
-
+            # description 随请求变化，因此只复用 JSON Schema
             response_format = JsonSchemaFormat(
                 name="Recipe_JSON_Schema",
-                schema=schema,
+                schema=schema_registry.get_schema(request.json_schema),
                 description=request.prompt,
                 strict=True,
             )
@@ -391,6 +391,7 @@ class Dashscope(BaseLLM):
         self.stream = stream if stream is not None else False
 
         tools = request.tools if request.tools else []
+        request = await self._compact_history(request)
         messages = self._build_messages(request)
         if request.format == "json" and request.json_schema:
             # logger.warning("该模型加载器不支持传入 Json Schema 模型，请确保您已经在模型提示词中传入了相关 json 字段")
@@ -35,6 +35,7 @@ from .. import (
     ModelRequest,
     ModelStreamCompletions,
     register,
+    schema_registry,
 )
 from ..utils.images import get_file_base64
 from ..utils.tools import function_call_handler
@@ -42,6 +43,9 @@ from ..utils.tools import function_call_handler
 
 @register("gemini")
 class Gemini(BaseLLM):
+    uploadable_types = ("image",)
+    upload_ttl = 47 * 3600  # Files API 中的文件在 48 小时后过期
+
     def __init__(self, model_config: ModelConfig) -> None:
         super().__init__(model_config)
         self._require("model_name", "api_key")
@@ -111,7 +115,7 @@ class Gemini(BaseLLM):
             schema = response_format
             if isinstance(response_format, TypeAdapter):
                 # 将 TypeAdapter 转换为 json schema dict
-                schema = response_format.json_schema()
+                schema = schema_registry.get_schema(response_format)
 
             gemini_config.response_mime_type = "application/json"
             gemini_config.response_schema = schema
@@ -126,14 +130,25 @@ class Gemini(BaseLLM):
 
         for resource in request.resources:
             if resource.type == "image" and resource.path is not None:
+                mimetype = resource.ensure_mimetype() or "image/jpeg"
+                if file_uri := self._get_uploaded_file(resource):
+                    user_parts.append(Part.from_uri(file_uri=file_uri, mime_type=mimetype))
+                    continue
+
                 user_parts.append(
-                    Part.from_bytes(
-                        data=get_file_base64(resource.path), mime_type=resource.mimetype or "image/jpeg"  # type:ignore
-                    )
+                    Part.from_bytes(data=get_file_base64(resource.path), mime_type=mimetype)  # type:ignore
                 )
 
         return user_parts
 
+    async def _upload_file(self, resource: Resource) -> str:
+        file = await self.client.aio.files.upload(
+            file=resource.path, config={"mime_type": resource.ensure_mimetype() or "image/jpeg"}
+        )
+        if not file.uri:
+            raise ValueError(f"文件上传后未返回 URI: {resource.path}")
+        return file.uri
+
     def _build_messages(self, request: ModelRequest) -> list[ContentOrDict]:
         messages: List[ContentOrDict] = []
 
@@ -311,6 +326,7 @@ class Gemini(BaseLLM):
     async def ask(
         self, request: ModelRequest, *, stream: bool = False
     ) -> Union[ModelCompletions, AsyncGenerator[ModelStreamCompletions, None]]:
+        request = await self._preload_resources(request, include_history=True)
         messages = self._build_messages(request)
         response_format = request.json_schema if request.format == "json" else None
 
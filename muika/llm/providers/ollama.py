@@ -3,7 +3,6 @@ from typing import Any, AsyncGenerator, List, Literal, Optional, Union, overload
 import ollama
 from nonebot import logger
 from ollama import ResponseError
-from pydantic import TypeAdapter
 
 from .. import (
     BaseLLM,
@@ -12,6 +11,7 @@ from .. import (
     ModelRequest,
     ModelStreamCompletions,
     register,
+    schema_registry,
 )
 from ..utils.images import get_file_base64
 from ..utils.tools import function_call_handler
@@ -201,12 +201,10 @@ class Ollama(BaseLLM):
         self, request: ModelRequest, *, stream: bool = False
     ) -> Union[ModelCompletions, AsyncGenerator[ModelStreamCompletions, None]]:
         tools = request.tools if request.tools else []
+        request = await self._preload_resources(request, include_history=True)
         messages = self._build_messages(request)
         if request.format == "json" and request.json_schema:
-            if isinstance(request.json_schema, TypeAdapter):
-                format = request.json_schema.json_schema()
-            else:
-                format = request.json_schema.model_json_schema()
+            format = schema_registry.get_schema(request.json_schema)
         else:
             format = None
 
@@ -1,6 +1,7 @@
 import base64
 import json
 from io import BytesIO
+from pathlib import Path
 from typing import Any, AsyncGenerator, List, Literal, Union, overload
 
 import openai
@@ -11,7 +12,6 @@ from openai.types.shared_params.response_format_json_schema import (
     JSONSchema,
     ResponseFormatJSONSchema,
 )
-from pydantic import TypeAdapter
 
 from muika.models import Resource
 
@@ -22,15 +22,21 @@ from .. import (
     ModelRequest,
     ModelStreamCompletions,
     register,
+    schema_registry,
 )
 from ..utils.images import get_file_base64
 from ..utils.tools import function_call_handler
 
 
+def _build_response_format(schema: dict) -> ResponseFormatJSONSchema:
+    return ResponseFormatJSONSchema(type="json_schema", json_schema=JSONSchema(**schema, strict=True))
+
+
 @register("openai")
 class Openai(BaseLLM):
     _tools: List[ChatCompletionToolParam]
     modalities: Union[List[Literal["text", "audio"]], NotGiven]
+    uploadable_types = ("file",)
 
     def __init__(self, model_config: ModelConfig) -> None:
         super().__init__(model_config)
@@ -75,12 +81,20 @@ class Openai(BaseLLM):
                 user_content.append({"type": "video_url", "video_url": {"url": file_data}})
 
             elif resource.type == "file":
+                if file_id := self._get_uploaded_file(resource):
+                    user_content.append({"type": "file", "file": {"file_id": file_id}})
+                    continue
+
                 file_format = resource.path.split(".")[-1]
                 file_data = f"data:;base64,{get_file_base64(local_path=resource.path)}"
                 user_content.append({"type": "file", "file": {"file_data": file_data}})
 
         return {"role": "user", "content": user_content}
 
+    async def _upload_file(self, resource: Resource) -> str:
+        file = await self.client.files.create(file=Path(resource.path), purpose="user_data")
+        return file.id
+
     def _build_messages(self, request: ModelRequest) -> list:
         messages = []
 
@@ -358,16 +372,10 @@ class Openai(BaseLLM):
     ) -> Union[ModelCompletions, AsyncGenerator[ModelStreamCompletions, None]]:
         tools = request.tools if request.tools else NOT_GIVEN
 
+        request = await self._preload_resources(request)
         messages = self._build_messages(request)
         if request.format == "json" and request.json_schema:
-            if isinstance(request.json_schema, TypeAdapter):
-                schema = request.json_schema.json_schema()
-            else:
-                schema = request.json_schema.model_json_schema()
-
-            response_format = ResponseFormatJSONSchema(
-                type="json_schema", json_schema=JSONSchema(**schema, strict=True)
-            )
+            response_format = schema_registry.get(request.json_schema).get_format("openai", _build_response_format)
         else:
             response_format = NOT_GIVEN
 
@@ -0,0 +1,332 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from math import ceil
+from random import uniform
+from typing import AsyncGenerator, Literal, Optional, Sequence, Union, overload
+
+from nonebot import logger
+
+from ._base import BaseLLM
+from ._schema import ModelCompletions, ModelRequest, ModelStreamCompletions
+
+FAILURE_THRESHOLD = 5
+"""熔断器打开前允许的连续失败次数"""
+COOLDOWN = 30.0
+"""熔断器打开后的冷却时间（秒），冷却结束后进入半开状态"""
+LATENCY_WINDOW = 50
+"""用于估算首个 Token 延迟分位数的样本数"""
+MIN_LATENCY_SAMPLES = 10
+"""估算分位数所需的最少样本数"""
+DEFAULT_HEDGE_DELAY = 10.0
+"""样本不足时的对冲等待时间（秒）"""
+
+Result = Union[ModelCompletions, AsyncGenerator[ModelStreamCompletions, None]]
+
+
+class ModelFailure(Exception):
+    """
+    单次模型调用失败（模型返回 `succeed=False`、抛出异常或超时）
+    """
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    模型提供者的熔断器
+
+    连续失败 `failure_threshold` 次后打开，冷却期内直接跳过该提供者；冷却结束后进入半开状态放行请求，
+    成功则关闭，失败则重新打开
+    """
+
+    failure_threshold: int = FAILURE_THRESHOLD
+    """打开前允许的连续失败次数"""
+    cooldown: float = COOLDOWN
+    """打开后的冷却时间（秒）"""
+    failures: int = 0
+    """连续失败次数"""
+    opened_at: Optional[float] = None
+    """打开的时间"""
+
+    @property
+    def state(self) -> Literal["closed", "open", "half_open"]:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"连续失败 {self.failures} 次，熔断器已打开 ({self.cooldown}s)")
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """
+    首个 Token（非流式调用则为完整输出）的延迟统计
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float):
+        self._samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        获取延迟分位数，样本不足时返回 None
+
+        :param q: 分位数 (0, 1]
+        """
+        if len(self._samples) < MIN_LATENCY_SAMPLES:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(len(samples), ceil(q * len(samples))) - 1]
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+"""提供者服务地址 -> 熔断器"""
+_latencies: dict[str, LatencyTracker] = {}
+"""提供者与模型 -> 延迟统计"""
+
+
+def get_breaker(model: BaseLLM) -> CircuitBreaker:
+    """
+    获取模型提供者的熔断器（同一提供者的同一服务地址共用）
+    """
+    return _breakers.setdefault(f"{model.config.provider}:{model.config.api_host}", CircuitBreaker())
+
+
+def get_latency_tracker(model: BaseLLM) -> LatencyTracker:
+    """
+    获取模型的延迟统计
+    """
+    key = f"{model.config.provider}:{model.config.api_host}:{model.config.model_name}"
+    return _latencies.setdefault(key, LatencyTracker())
+
+
+async def _chain_stream(
+    first: ModelStreamCompletions, rest: AsyncGenerator[ModelStreamCompletions, None]
+) -> AsyncGenerator[ModelStreamCompletions, None]:
+    try:
+        yield first
+        async for chunk in rest:
+            yield chunk
+    finally:
+        await rest.aclose()
+
+
+async def _failed_stream(message: str) -> AsyncGenerator[ModelStreamCompletions, None]:
+    yield ModelStreamCompletions(chunk=message, succeed=False)
+
+
+async def _discard(result: Result):
+    if not isinstance(result, ModelCompletions):
+        await result.aclose()
+
+
+class ResilientLLM:
+    """
+    具备重试、熔断、后备与对冲请求的模型调用包装
+
+    - 主模型依次重试（指数退避 + 随机抖动），仍失败后按顺序切换至后备模型；熔断器打开的提供者会被跳过
+    - 启用对冲时，若主模型在首个 Token 延迟的 p95 内没有输出，则同时向首个后备模型发起请求，
+      采用先成功的一方并取消另一方
+    - 流式调用以收到首个输出块为成功，之后的错误不再重试
+    """
+
+    def __init__(
+        self,
+        models: Sequence[BaseLLM],
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        timeout: Optional[float] = None,
+        hedge: bool = False,
+        hedge_delay: Optional[float] = None,
+    ) -> None:
+        """
+        :param models: 主模型与后备模型，按优先级排序
+        :param retries: 每个模型的最大重试次数
+        :param backoff: 首次重试前的基础等待时间（秒），之后每次翻倍
+        :param max_backoff: 重试前的最长等待时间（秒）
+        :param timeout: 单次调用（流式调用则为首个输出块）的超时时间（秒）
+        :param hedge: 是否启用对冲请求
+        :param hedge_delay: 对冲等待时间（秒），为空则使用主模型首个 Token 延迟的 p95
+        """
+        if not models:
+            raise ValueError("至少需要一个模型")
+
+        self.models = list(models)
+        """主模型与后备模型"""
+        self.retries = retries
+        """每个模型的最大重试次数"""
+        self.backoff = backoff
+        """首次重试前的基础等待时间（秒）"""
+        self.max_backoff = max_backoff
+        """重试前的最长等待时间（秒）"""
+        self.timeout = timeout
+        """单次调用的超时时间（秒）"""
+        self.hedge = hedge
+        """是否启用对冲请求"""
+        self.hedge_delay = hedge_delay
+        """对冲等待时间（秒）"""
+
+    def _get_hedge_delay(self, model: BaseLLM) -> float:
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        p95 = get_latency_tracker(model).percentile(0.95)
+        return DEFAULT_HEDGE_DELAY if p95 is None else p95
+
+    async def _first_result(self, model: BaseLLM, request: ModelRequest, stream: bool) -> Result:
+        if not stream:
+            completions = await model.ask(request)
+            if not completions.succeed:
+                raise ModelFailure(completions.text)
+            return completions
+
+        response = await model.ask(request, stream=True)
+        try:
+            # 调用失败的输出块会被用量记录装饰器过滤，因此没有输出即视为失败
+            first = await response.__anext__()
+        except StopAsyncIteration:
+            raise ModelFailure("模型无输出")
+        except BaseException:
+            await response.aclose()
+            raise
+        return _chain_stream(first, response)
+
+    async def _attempt(self, model: BaseLLM, request: ModelRequest, stream: bool) -> Result:
+        """
+        单次模型调用，并记录熔断器状态与延迟
+
+        :raise ModelFailure: 调用失败
+        """
+        breaker = get_breaker(model)
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self._first_result(model, request, stream), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            raise ModelFailure(f"模型调用超时 ({self.timeout}s)")
+        except ModelFailure:
+            breaker.record_failure()
+            raise
+        except Exception as e:
+            breaker.record_failure()
+            raise ModelFailure(f"模型调用出错: {e}") from e
+
+        breaker.record_success()
+        get_latency_tracker(model).record(time.monotonic() - start)
+        return result
+
+    async def _with_retries(self, model: BaseLLM, request: ModelRequest, stream: bool, retries: int) -> Result:
+        """
+        :raise ModelFailure: 所有尝试均失败
+        """
+        breaker = get_breaker(model)
+        failure = ModelFailure(f"{model.config.provider} 没有剩余的重试次数")
+        for attempt in range(retries + 1):
+            if attempt:
+                if breaker.state == "open":
+                    raise ModelFailure(f"{model.config.provider} 熔断器已打开")
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+                await asyncio.sleep(uniform(delay / 2, delay))
+                logger.warning(f"重试模型调用 ({attempt}/{retries}): {model.config.provider}")
+
+            try:
+                return await self._attempt(model, request, stream)
+            except ModelFailure as e:
+                failure = e
+                logger.warning(f"模型调用失败: {e}")
+
+        raise failure
+
+    async def _hedged(self, primary: BaseLLM, secondary: BaseLLM, request: ModelRequest, stream: bool) -> Result:
+        """
+        对冲请求：主模型超出等待时间仍无输出（或已失败）时，同时向后备模型发起请求，采用先成功的一方
+
+        :raise ModelFailure: 两者均失败
+        """
+        failure = ModelFailure("对冲请求均失败")
+        pending = {asyncio.create_task(self._attempt(primary, request, stream))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self._get_hedge_delay(primary))
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                failure = task.exception()  # type:ignore
+
+            logger.info(f"主模型 {primary.config.provider} 响应缓慢或失败，发起对冲请求: {secondary.config.provider}")
+            pending.add(asyncio.create_task(self._attempt(secondary, request, stream)))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                results = [task.result() for task in done if task.exception() is None]
+                if results:
+                    for result in results[1:]:
+                        await _discard(result)
+                    return results[0]
+                failure = next(iter(done)).exception()  # type:ignore
+        finally:
+            # 取消仍在进行的一方
+            for task in pending:
+                task.cancel()
+
+        raise failure
+
+    @overload
+    async def ask(self, request: ModelRequest, *, stream: Literal[False] = False) -> ModelCompletions: ...
+
+    @overload
+    async def ask(
+        self, request: ModelRequest, *, stream: Literal[True] = True
+    ) -> AsyncGenerator[ModelStreamCompletions, None]: ...
+
+    @overload
+    async def ask(
+        self, request: ModelRequest, *, stream: bool = False
+    ) -> Union[ModelCompletions, AsyncGenerator[ModelStreamCompletions, None]]: ...
+
+    async def ask(self, request: ModelRequest, *, stream: bool = False) -> Result:
+        """
+        模型交互询问（与 `BaseLLM.ask` 一致）
+
+        :return: 模型输出体；所有模型均失败时返回 `succeed=False` 的输出
+        """
+        # 熔断器全部打开时仍尝试主模型，避免请求被直接丢弃
+        models = [model for model in self.models if get_breaker(model).state != "open"] or self.models[:1]
+
+        failure = ModelFailure("没有可用的模型")
+        hedged = 0
+        if self.hedge and len(models) > 1:
+            try:
+                return await self._hedged(models[0], models[1], request, stream)
+            except ModelFailure as e:
+                # 主模型与首个后备模型均已尝试过一次
+                failure = e
+                hedged = 2
+
+        for index, model in enumerate(models):
+            retries = self.retries - 1 if index < hedged else self.retries
+            if retries < 0:
+                continue
+
+            try:
+                return await self._with_retries(model, request, stream, retries)
+            except ModelFailure as e:
+                failure = e
+                logger.warning(f"模型 {model.config.provider} 不可用，尝试下一个模型")
+
+        logger.error(f"所有模型调用均失败: {failure}")
+        if stream:
+            return _failed_stream(str(failure))
+        return ModelCompletions(text=str(failure), succeed=False)
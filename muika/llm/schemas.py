@@ -0,0 +1,110 @@
+import json
+from collections import OrderedDict
+from functools import cached_property
+from typing import Any, Callable, Type, TypeVar, Union, overload
+
+from nonebot import logger
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+SCHEMA_REGISTRY_MAX_ENTRIES = 256
+"""结构注册表的最大条目数"""
+
+
+class SchemaEntry:
+    """
+    某一输出结构的预编译数据：`TypeAdapter`、JSON Schema 以及各提供者的 `response_format`
+    """
+
+    def __init__(self, response_model: Any) -> None:
+        self.adapter: TypeAdapter = (
+            response_model if isinstance(response_model, TypeAdapter) else TypeAdapter(response_model)
+        )
+        """结构的 TypeAdapter"""
+
+        self._formats: dict[str, Any] = {}
+        """提供者 -> response_format"""
+
+    @cached_property
+    def schema(self) -> dict:
+        """JSON Schema"""
+        return self.adapter.json_schema()
+
+    @cached_property
+    def schema_text(self) -> str:
+        """格式化后的 JSON Schema 文本，用于拼接进 Prompt"""
+        return json.dumps(self.schema, indent=2)
+
+    def get_format(self, provider: str, factory: Callable[[dict], T]) -> T:
+        """
+        获取提供者的 `response_format`，只在首次获取时构建
+
+        :param provider: 提供者名称
+        :param factory: 由 JSON Schema 构建 `response_format` 的函数
+        """
+        if provider not in self._formats:
+            self._formats[provider] = factory(self.schema)
+        return self._formats[provider]
+
+
+class SchemaRegistry:
+    """
+    进程内共享的输出结构注册表
+
+    以输出类型（或 `TypeAdapter` 实例）为键，同一结构的 `TypeAdapter`、JSON Schema 与各提供者的 `response_format`
+    只构建一次，由所有模型提供者与插件共享。传入 `TypeAdapter` 时以实例为键，请复用同一实例（或直接传入类型）
+    """
+
+    def __init__(self, max_entries: int = SCHEMA_REGISTRY_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        """最大条目数"""
+
+        self._entries: OrderedDict[Any, SchemaEntry] = OrderedDict()
+
+    def get(self, response_model: Any) -> SchemaEntry:
+        """
+        获取输出结构的预编译数据
+
+        :param response_model: 输出类型（如 `BaseModel` 子类、`list[...]`、`Annotated[Union[...], ...]`）或 `TypeAdapter` 实例
+        """
+        try:
+            entry = self._entries.get(response_model)
+        except TypeError:
+            # 不可哈希的类型无法缓存
+            logger.debug(f"输出结构不可哈希，无法缓存: {response_model!r}")
+            return SchemaEntry(response_model)
+
+        if entry is not None:
+            self._entries.move_to_end(response_model)
+            return entry
+
+        entry = self._entries[response_model] = SchemaEntry(response_model)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    @overload
+    def get_adapter(self, response_model: Union[Type[T], TypeAdapter[T]]) -> TypeAdapter[T]: ...
+
+    @overload
+    def get_adapter(self, response_model: Any) -> TypeAdapter: ...
+
+    def get_adapter(self, response_model: Any) -> TypeAdapter:
+        """
+        获取输出结构的 `TypeAdapter`
+        """
+        return self.get(response_model).adapter
+
+    def get_schema(self, response_model: Any) -> dict:
+        """
+        获取输出结构的 JSON Schema
+        """
+        return self.get(response_model).schema
+
+    def clear(self):
+        self._entries.clear()
+
+
+schema_registry = SchemaRegistry()
+"""全局输出结构注册表"""
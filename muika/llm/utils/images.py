@@ -1,16 +1,93 @@
+import asyncio
 import base64
-from typing import Optional
+import os
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+ENCODE_CHUNK_SIZE = 3 * 256 * 1024
+"""分块编码的块大小（须为 3 的倍数，保证各块的编码结果可以直接拼接）"""
+ENCODED_CACHE_MAX_BYTES = 128 * 1024 * 1024
+"""编码结果缓存的最大总大小"""
+
+_encoded_cache: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+"""(路径, 修改时间, 文件大小) -> Base64 编码结果"""
+_encoded_cache_size = 0
+
+
+def _cache_key(local_path: str) -> tuple[str, int, int]:
+    stat = os.stat(local_path)
+    return (os.path.abspath(local_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _cache_get(key: tuple[str, int, int]) -> Optional[str]:
+    encoded = _encoded_cache.get(key)
+    if encoded is not None:
+        _encoded_cache.move_to_end(key)
+    return encoded
+
+
+def _cache_put(key: tuple[str, int, int], encoded: str):
+    global _encoded_cache_size
+
+    if len(encoded) > ENCODED_CACHE_MAX_BYTES or key in _encoded_cache:
+        return
+
+    _encoded_cache[key] = encoded
+    _encoded_cache_size += len(encoded)
+
+    while _encoded_cache_size > ENCODED_CACHE_MAX_BYTES:
+        _, evicted = _encoded_cache.popitem(last=False)
+        _encoded_cache_size -= len(evicted)
+
+
+def _encode_file(local_path: str) -> str:
+    """
+    分块读取并编码文件，原始文件内容不会与其编码结果同时完整驻留内存
+    """
+    encoded = bytearray()
+    with open(local_path, "rb") as f:
+        while chunk := f.read(ENCODE_CHUNK_SIZE):
+            encoded += base64.b64encode(chunk)
+    return encoded.decode("ascii")
 
 
 def get_file_base64(local_path: Optional[str] = None, file_bytes: Optional[bytes] = None) -> str:
     """
     获取本地图像 Base64 的方法
+
+    本地文件的编码结果会按 (路径, 修改时间, 文件大小) 缓存，可事先通过 `preload_files_base64` 在事件循环外完成编码
     """
     if local_path:
-        with open(local_path, "rb") as f:
-            image_data = base64.b64encode(f.read()).decode("utf-8")
-            return image_data
+        key = _cache_key(local_path)
+        if (encoded := _cache_get(key)) is not None:
+            return encoded
+
+        encoded = _encode_file(local_path)
+        _cache_put(key, encoded)
+        return encoded
     if file_bytes:
         image_base64 = base64.b64encode(file_bytes)
         return image_base64.decode("utf-8")
     raise ValueError("You must pass in a valid parameter!")
+
+
+async def get_file_base64_async(local_path: str) -> str:
+    """
+    在事件循环外获取本地文件的 Base64 编码
+    """
+    key = await asyncio.to_thread(_cache_key, local_path)
+    if (encoded := _cache_get(key)) is not None:
+        return encoded
+
+    encoded = await asyncio.to_thread(_encode_file, local_path)
+    _cache_put(key, encoded)
+    return encoded
+
+
+async def preload_files_base64(local_paths: Iterable[str]):
+    """
+    并发地在事件循环外预先编码多个文件并写入缓存，随后的 `get_file_base64` 调用将直接命中缓存
+    """
+    paths = {path for path in local_paths if path}
+    # 编码失败的文件交由后续的同步调用处理
+    await asyncio.gather(*(get_file_base64_async(path) for path in paths), return_exceptions=True)
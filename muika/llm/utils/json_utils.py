@@ -1,6 +1,48 @@
 import json
 import re
-from typing import Any, Union
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type:ignore
+
+THINK_START = "<think>"
+THINK_END = "</think>"
+BRACKETS = {"{": "}", "[": "]"}
+OBJECT_STARTS = frozenset('"}')
+ARRAY_STARTS = frozenset('"{[]-0123456789tfn')
+SIGNIFICANT_CHARS = re.compile(r'[{}\[\]"\\<]')
+
+
+def loads(text: str) -> Any:
+    """
+    解析 JSON 文本，安装了 orjson 时优先使用 orjson
+
+    orjson 不接受字符串中未转义的控制字符（模型输出中较常见），此时回退至标准库的非严格模式
+
+    :raise json.JSONDecodeError: 不是有效的 JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text, strict=False)
+
+
+def _try_loads(text: str, start: int, end: int, errors: list[str]) -> tuple[bool, Any]:
+    # 快速排除正文中的 `{xxx}`、`[xxx]`：对象的首个非空白字符只能是引号或右括号，数组的只能是值的开头或右括号
+    first = text[start + 1 : end].lstrip()[:1]
+    if first not in (OBJECT_STARTS if text[start] == "{" else ARRAY_STARTS):
+        errors.append(f"不是有效的 JSON: {text[start : min(end, start + 20)]}")
+        return False, None
+
+    try:
+        return True, loads(text[start:end])
+    except json.JSONDecodeError as e:
+        errors.append(str(e))
+        return False, None
 
 
 def extract_json_from_text(text: str) -> Union[dict, list, Any]:
@@ -8,49 +50,210 @@ def extract_json_from_text(text: str) -> Union[dict, list, Any]:
     从文本中提取 JSON 对象。
 
     支持直接的 JSON 字符串，Markdown 代码块包裹的 JSON，以及嵌入在文本中的 JSON 对象。
+    整段文本不是 JSON 时，单次扫描文本：跳过 `<think>` 块，感知字符串与转义，通过括号配对找到首个完整的顶层 JSON 对象
+    （没有对象时使用首个顶层数组，避免选中正文中的 `[1]` 等引用标记）；
+    某个完整的括号区间无法解析时（如正文中的 `{xxx}`），依次尝试其直接子区间再继续扫描。
+    文本被截断导致外层括号未闭合时，尝试未闭合括号内已完整的子区间
+
+    :raise ValueError: 无法在文本中识别 JSON 结构，或提取的内容不是有效的 JSON
     """
     cleaned_result = text.strip()
 
     # 1. 尝试直接解析
     try:
-        return json.loads(cleaned_result, strict=False)
+        return loads(cleaned_result)
     except json.JSONDecodeError:
         pass
 
-    json_str = None
-
-    # 2. 尝试提取 Markdown 代码块
-    pattern = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
-    match = pattern.search(cleaned_result)
-    if match:
-        json_str = match.group(1)
-    else:
-        # 3. 尝试寻找最外层的大括号或方括号
-        # 匹配 {...} 或者 [...]
-        # 这里使用比较简单的正则，可能无法处理嵌套很深或者不平衡的情况，但在多数LLM输出中有效
-
-        # 尝试匹配对象
-        match_obj = re.search(r"(\{.*\})", cleaned_result, re.DOTALL)
-        # 尝试匹配数组
-        match_arr = re.search(r"(\[.*\])", cleaned_result, re.DOTALL)
-
-        if match_obj and match_arr:
-            # 如果两个都匹配到了，看谁更长或者根据位置（这里简单取最长的，通常是我们要的）
-            # 或者看谁在外层。通常LLM只会输出一个主要的JSON。
-            if len(match_obj.group(1)) > len(match_arr.group(1)):
-                json_str = match_obj.group(1)
+    # 2. 括号配对扫描
+    errors: list[str] = []
+    # (期望的右括号, 左括号位置, 已完整的直接子区间)
+    stack: list[tuple[str, int, list[tuple[int, int]]]] = []
+    # 首个顶层数组（没有对象时使用）
+    array: Optional[list] = None
+    in_string = False
+    index = 0
+
+    # 只在有意义的字符处停留，其余文本由正则跳过
+    while match := SIGNIFICANT_CHARS.search(cleaned_result, index):
+        index = match.start()
+        char = cleaned_result[index]
+
+        if in_string:
+            if char == "\\":
+                # 跳过被转义的字符
+                index += 2
+                continue
+            if char == '"':
+                in_string = False
+
+        elif not stack:
+            # JSON 之外：跳过 <think> 块
+            if char == "<" and cleaned_result.startswith(THINK_START, index):
+                think_end = cleaned_result.find(THINK_END, index)
+                if think_end >= 0:
+                    index = think_end + len(THINK_END)
+                    continue
+            elif char in BRACKETS:
+                stack.append((BRACKETS[char], index, []))
+
+        elif char == '"':
+            in_string = True
+        elif char in BRACKETS:
+            stack.append((BRACKETS[char], index, []))
+        elif char == stack[-1][0]:
+            _, start, children = stack.pop()
+            if stack:
+                stack[-1][2].append((start, index + 1))
             else:
-                json_str = match_arr.group(1)
-        elif match_obj:
-            json_str = match_obj.group(1)
-        elif match_arr:
-            json_str = match_arr.group(1)
+                for span in [(start, index + 1), *children]:
+                    ok, obj = _try_loads(cleaned_result, *span, errors)
+                    if ok and not isinstance(obj, list):
+                        return obj
+                    if ok:
+                        array = obj if array is None else array
+                        break
+
+        index += 1
+
+    if array is not None:
+        return array
 
-    if not json_str:
+    # 3. 文本被截断：尝试未闭合括号内已完整的子区间
+    for _, _, children in stack:
+        for span in children:
+            ok, obj = _try_loads(cleaned_result, *span, errors)
+            if ok:
+                return obj
+
+    if not errors:
         raise ValueError("无法在文本中识别 JSON 结构")
+    raise ValueError(f"提取的内容不是有效的 JSON: {errors[0]}")
 
-    try:
-        return json.loads(json_str, strict=False)
-    except json.JSONDecodeError as e:
-        # 如果提取出来的部分还是无法解析
-        raise ValueError(f"提取的内容不是有效的 JSON: {e}") from e
+
+class IncrementalJSONParser:
+    """
+    增量 JSON 对象解析器
+
+    逐块输入模型的流式输出：跳过 JSON 之前的文本（包括 `<think>` 块与 Markdown 代码块标记），
+    在顶层对象的每个成员完成时立即解析并返回该成员；对象完整后 `done` 为 True，完整对象位于 `result`。
+    每个字符只扫描一次，不会重复解析已输入的内容
+    """
+
+    def __init__(self) -> None:
+        self.done = False
+        """顶层对象是否已完整"""
+        self.result: Any = None
+        """完整的顶层对象"""
+
+        self._prefix = ""
+        """JSON 开始前的待判断文本"""
+        self._in_think = False
+        self._text = ""
+        """从顶层对象的左大括号开始的文本"""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._key_start = 0
+        self._value_start: Optional[int] = None
+
+    def _skip_prefix(self, chunk: str) -> str:
+        """
+        跳过 JSON 之前的文本，返回从顶层对象开始的部分（尚未开始则返回空字符串）
+        """
+        self._prefix += chunk
+        while True:
+            if self._in_think:
+                end = self._prefix.find(THINK_END)
+                if end < 0:
+                    self._prefix = self._prefix[-len(THINK_END) :]
+                    return ""
+                self._prefix = self._prefix[end + len(THINK_END) :]
+                self._in_think = False
+                continue
+
+            brace = self._prefix.find("{")
+            think = self._prefix.find(THINK_START)
+            if think >= 0 and (brace < 0 or think < brace):
+                self._prefix = self._prefix[think + len(THINK_START) :]
+                self._in_think = True
+                continue
+
+            if brace < 0:
+                # 保留可能是 `<think>` 前半部分的结尾
+                self._prefix = self._prefix[-len(THINK_START) :]
+                return ""
+
+            text, self._prefix = self._prefix[brace:], ""
+            return text
+
+    def _complete_member(self, end: int) -> tuple[str, Any]:
+        raw = self._text[self._value_start : end]
+        try:
+            value = loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"成员 {self._key!r} 不是有效的 JSON: {e}") from e
+
+        member = (self._key or "", value)
+        self._key = None
+        self._value_start = None
+        return member
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """
+        输入一块文本
+
+        :return: 本次输入后完成的顶层成员 (键, 值) 列表
+
+        :raise ValueError: 输出不是有效的 JSON 对象
+        """
+        if self.done:
+            return []
+
+        if not self._text:
+            chunk = self._skip_prefix(chunk)
+            if not chunk:
+                return []
+
+        self._text += chunk
+        members: list[tuple[str, Any]] = []
+        text = self._text
+
+        for index in range(self._pos, len(text)):
+            char = text[index]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._value_start is None:
+                        self._key = json.loads(text[self._key_start : index + 1], strict=False)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None:
+                    self._key_start = index
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._value_start is not None:
+                        members.append(self._complete_member(index))
+                    self.done = True
+                    self.result = loads(text[: index + 1])
+                    break
+            elif self._depth == 1:
+                if char == ":":
+                    self._value_start = index + 1
+                elif char == ",":
+                    members.append(self._complete_member(index))
+
+        self._pos = len(text)
+        return members
@@ -0,0 +1,54 @@
+import re
+from typing import Optional
+
+WIDE_CHAR = re.compile(r"[\u2e80-\u9fff\uac00-\ud7af\uff00-\uffef]")
+"""中日韩等宽字符"""
+
+PROVIDER_TOKEN_RATIOS: dict[str, tuple[float, float]] = {
+    "openai": (1.0, 4.0),
+    "azure": (1.0, 4.0),
+    "gemini": (0.8, 4.0),
+    "dashscope": (0.7, 4.0),
+    "ollama": (1.0, 3.5),
+}
+"""各提供者分词器的粗略系数：(每个中日韩字符的 Token 数, 每个 Token 对应的其他字符数)"""
+DEFAULT_TOKEN_RATIO = (1.0, 4.0)
+"""未知提供者的分词器系数"""
+
+RESOURCE_TOKENS: dict[str, int] = {
+    "image": 768,
+    "audio": 512,
+    "video": 2048,
+    "file": 1024,
+}
+"""各类型多模态资源的粗略 Token 数"""
+
+
+def estimate_tokens(text: str, provider: Optional[str] = None) -> int:
+    """
+    粗略估算文本的 Token 数（默认中日韩字符按 1 个 Token 计，其余字符按 4 个字符 1 个 Token 计）
+
+    :param provider: (可选)模型提供者，用于选择分词器系数
+    """
+    wide_ratio, chars_per_token = PROVIDER_TOKEN_RATIOS.get(provider or "", DEFAULT_TOKEN_RATIO)
+    wide = len(WIDE_CHAR.findall(text))
+    return int(wide * wide_ratio + (len(text) - wide) / chars_per_token + 0.99)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, provider: Optional[str] = None) -> str:
+    """
+    将文本截断至大约 `max_tokens` 个 Token
+
+    :param max_tokens: 最大 Token 数，<= 0 则不截断
+    :param provider: (可选)模型提供者，用于选择分词器系数
+    """
+    if max_tokens <= 0 or estimate_tokens(text, provider) <= max_tokens:
+        return text
+
+    wide_ratio, chars_per_token = PROVIDER_TOKEN_RATIOS.get(provider or "", DEFAULT_TOKEN_RATIO)
+    tokens = 0.0
+    for index, char in enumerate(text):
+        tokens += wide_ratio if WIDE_CHAR.match(char) else 1 / chars_per_token
+        if tokens > max_tokens:
+            return text[:index].rstrip() + "…"
+    return text
@@ -0,0 +1,219 @@
+"""
+多模态文件上传复用
+
+启用 `upload_files` 后，支持文件接口的模型提供者会将多模态文件上传一次，之后的对话轮次中直接以文件 ID 引用，
+不再每轮都将历史消息中的文件以 Base64 内联进请求体
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Awaitable, Callable, Iterable, Optional
+
+from nonebot import logger
+
+from muika.models import Resource
+
+UPLOAD_REGISTRY_MAX_ENTRIES = 4096
+"""上传记录的最大条目数"""
+
+
+@dataclass
+class UploadedFile:
+    file_id: str
+    """提供者返回的文件引用（文件 ID 或 URI）"""
+    size: int
+    """文件大小"""
+    uploaded_at: float = field(default_factory=time.time)
+    """上传时间"""
+
+
+@dataclass
+class TransferStats:
+    """
+    单轮请求的多模态数据传输统计
+    """
+
+    inline_bytes: int = 0
+    """以 Base64 内联进请求体的字节数"""
+    uploaded_bytes: int = 0
+    """本轮新上传至文件接口的字节数"""
+    reused_bytes: int = 0
+    """通过文件引用复用（免于传输）的字节数"""
+    uploaded_files: int = 0
+    """本轮新上传的文件数"""
+    reused_files: int = 0
+    """本轮复用的文件数"""
+
+    @property
+    def sent_bytes(self) -> int:
+        """本轮实际发送的多模态数据字节数"""
+        return self.inline_bytes + self.uploaded_bytes
+
+
+def get_upload_scope(provider: str, api_host: str, api_key: str) -> str:
+    """
+    获取上传记录的作用域，文件 ID 只在同一服务与账户下有效
+    """
+    key_digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    return f"{provider}:{api_host}:{key_digest}"
+
+
+def _file_key(local_path: str) -> tuple[str, int, int]:
+    stat = os.stat(local_path)
+    return (os.path.abspath(local_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _encoded_size(size: int) -> int:
+    return (size + 2) // 3 * 4
+
+
+class UploadRegistry:
+    def __init__(self, max_entries: int = UPLOAD_REGISTRY_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        """最大条目数"""
+
+        self._entries: OrderedDict[tuple[str, tuple[str, int, int]], UploadedFile] = OrderedDict()
+        """(作用域, (路径, 修改时间, 文件大小)) -> 上传记录"""
+        self._path_index: dict[tuple[str, str], tuple[str, int, int]] = {}
+        """(作用域, 路径) -> 最近一次登记的文件键，供同步的 `lookup` 使用"""
+        self._pending: dict[tuple[str, tuple[str, int, int]], asyncio.Task[UploadedFile]] = {}
+        """进行中的上传任务，避免并发请求重复上传同一文件"""
+
+        self.total_uploaded_bytes = 0
+        """累计上传字节数"""
+        self.total_reused_bytes = 0
+        """累计复用字节数"""
+
+    def _get(self, scope: str, key: tuple[str, int, int], ttl: float) -> Optional[UploadedFile]:
+        entry = self._entries.get((scope, key))
+        if entry is None:
+            return None
+        if ttl > 0 and time.time() - entry.uploaded_at >= ttl:
+            del self._entries[(scope, key)]
+            return None
+        self._entries.move_to_end((scope, key))
+        return entry
+
+    def _put(self, scope: str, key: tuple[str, int, int], entry: UploadedFile):
+        self._entries[(scope, key)] = entry
+        self._entries.move_to_end((scope, key))
+        self._path_index[(scope, key[0])] = key
+
+        while len(self._entries) > self.max_entries:
+            (evicted_scope, evicted_key), _ = self._entries.popitem(last=False)
+            if self._path_index.get((evicted_scope, evicted_key[0])) == evicted_key:
+                del self._path_index[(evicted_scope, evicted_key[0])]
+
+    def _forget_pending(self, pending_key: tuple[str, tuple[str, int, int]], _: asyncio.Task):
+        self._pending.pop(pending_key, None)
+
+    def lookup(self, scope: str, local_path: str) -> Optional[str]:
+        """
+        查询文件在指定作用域下的引用（须事先通过 `ensure` 上传）
+
+        :return: 文件引用，未上传时返回 None
+        """
+        key = self._path_index.get((scope, os.path.abspath(local_path)))
+        if key is None:
+            return None
+        entry = self._entries.get((scope, key))
+        return entry.file_id if entry else None
+
+    async def _upload(
+        self, scope: str, key: tuple[str, int, int], resource: Resource, uploader: Callable[[Resource], Awaitable[str]]
+    ) -> UploadedFile:
+        file_id = await uploader(resource)
+        entry = UploadedFile(file_id=file_id, size=key[2])
+        self._put(scope, key, entry)
+        self.total_uploaded_bytes += entry.size
+        logger.debug(f"已上传文件: {resource.path} -> {file_id} ({entry.size} bytes)")
+        return entry
+
+    async def ensure(
+        self,
+        scope: str,
+        resources: Iterable[Resource],
+        uploader: Callable[[Resource], Awaitable[str]],
+        ttl: float = 0,
+    ) -> TransferStats:
+        """
+        确保文件已上传至文件接口，已上传且未过期的文件直接复用
+
+        上传失败的文件不会登记，随后构建消息时将回退为 Base64 内联
+
+        :param scope: 上传作用域
+        :param resources: 需要上传的多模态资源
+        :param uploader: 上传函数，返回文件引用
+        :param ttl: 上传记录的有效期（秒），<= 0 则不过期
+
+        :return: 本轮的上传统计（不含内联部分）
+        """
+        stats = TransferStats()
+        jobs: dict[tuple[str, int, int], Resource] = {}
+        seen: set[tuple[str, int, int]] = set()
+
+        for resource in resources:
+            try:
+                key = await asyncio.to_thread(_file_key, resource.path)
+            except OSError:
+                continue
+
+            if key in seen:
+                continue
+            seen.add(key)
+
+            if (entry := self._get(scope, key, ttl)) is not None:
+                self._path_index[(scope, key[0])] = key
+                stats.reused_bytes += entry.size
+                stats.reused_files += 1
+                continue
+
+            jobs[key] = resource
+
+        tasks = []
+        created: set[tuple[str, int, int]] = set()
+        for key, resource in jobs.items():
+            task = self._pending.get((scope, key))
+            if task is None:
+                task = asyncio.create_task(self._upload(scope, key, resource, uploader))
+                task.add_done_callback(partial(self._forget_pending, (scope, key)))
+                self._pending[(scope, key)] = task
+                created.add(key)
+            tasks.append(task)
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for (key, resource), result in zip(jobs.items(), results):
+            if isinstance(result, BaseException):
+                logger.warning(f"上传文件失败，将回退为内联传输: {resource.path} ({result})")
+            elif key in created:
+                stats.uploaded_bytes += result.size
+                stats.uploaded_files += 1
+            else:
+                # 由并发的其他请求上传，对本轮而言属于复用
+                stats.reused_bytes += result.size
+                stats.reused_files += 1
+
+        self.total_reused_bytes += stats.reused_bytes
+        return stats
+
+
+def get_inline_size(local_paths: Iterable[str]) -> int:
+    """
+    估算以 Base64 内联传输的文件大小
+    """
+    size = 0
+    for path in local_paths:
+        try:
+            size += _encoded_size(os.path.getsize(path))
+        except OSError:
+            continue
+    return size
+
+
+upload_registry = UploadRegistry()
+"""全局上传记录"""
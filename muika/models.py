@@ -19,12 +19,15 @@ class Resource:
     raw: Optional[Union[bytes, BytesIO]] = field(default=None)
     """二进制数据（只使用于模型返回且不保存到数据库中）"""
     mimetype: Optional[str] = field(default=None)
-    """文件元数据类型(eg. `image/jpeg`)"""
+    """文件元数据类型(eg. `image/jpeg`)，未传入时在首次调用 `ensure_mimetype` 时检测"""
     extension: Optional[str] = field(default=None)
     """文件扩展名(eg. `.jpg`)"""
 
     def __post_init__(self):
-        self.ensure_mimetype()
+        # 构造时不再检测文件类型，避免反复构造实例时产生阻塞 I/O
+        self._mimetype_resolved = self.mimetype is not None
+        if self.mimetype and not self.extension:
+            self.extension = guess_extension(self.mimetype)
 
     def __hash__(self) -> int:
         return hash(self.get_file())
@@ -40,22 +43,40 @@ class Resource:
             return result
         raise FileNotFoundError("该实例没有一个具体的文件对象！")
 
-    def ensure_mimetype(self):
+    def _set_mimetype(self, mimetype: Optional[str]):
+        self.mimetype = mimetype
+        self._mimetype_resolved = True
+        if mimetype:
+            self.extension = guess_extension(mimetype)
+
+    def ensure_mimetype(self) -> Optional[str]:
         """
-        保证 mimetype 是确定的
+        保证 mimetype 是确定的（仅在首次调用时检测）
+
+        在事件循环中应优先使用 `ensure_mimetype_async`
         """
-        from .utils.utils import guess_mimetype
+        if not self._mimetype_resolved:
+            from .utils.utils import guess_mimetype
 
-        self.mimetype = guess_mimetype(self)
-        if self.mimetype:
-            self.extension = guess_extension(self.mimetype)
+            self._set_mimetype(guess_mimetype(self))
+        return self.mimetype
+
+    async def ensure_mimetype_async(self) -> Optional[str]:
+        """
+        保证 mimetype 是确定的，读取文件头的操作在事件循环外进行
+        """
+        if not self._mimetype_resolved:
+            from .utils.utils import guess_mimetype_async
+
+            self._set_mimetype(await guess_mimetype_async(self))
+        return self.mimetype
 
     def to_dict(self) -> dict:
         """
         落库时存储的数据
         (注意：与模型进行交互的多模态文件必须在本地拥有备份)
         """
-        return {"type": self.type, "path": self.path, "mimetype": self.mimetype}
+        return {"type": self.type, "path": self.path, "mimetype": self.ensure_mimetype()}
 
 
 @total_ordering
@@ -2,6 +2,11 @@
 MAS Function Call Plugin
 """
 
-from .caller import get_function_calls, get_function_list, on_function_call
+from .caller import (
+    get_function_calls,
+    get_function_list,
+    invalidate_function_list,
+    on_function_call,
+)
 
-__all__ = ["get_function_calls", "get_function_list", "on_function_call"]
+__all__ = ["get_function_calls", "get_function_list", "invalidate_function_list", "on_function_call"]
@@ -8,7 +8,11 @@
 - 用于获取已注册函数调用的实用函数
 """
 
+import asyncio
 import inspect
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
 from typing import Any, Optional, Type, get_type_hints
 
 from nonebot import logger
@@ -30,6 +34,55 @@ from .utils import async_wrap
 
 _caller_data: dict[str, "Caller"] = {}
 """函数注册表，存储所有注册的函数"""
+_function_list_cache: Optional[list[tuple["Caller", dict[str, Any]]]] = None
+"""工具列表缓存，仅在函数注册表变化时失效"""
+_rule_results_cache: OrderedDict[tuple[int, int], tuple[Bot, Event, dict[str, bool]]] = OrderedDict()
+"""响应规则检查结果缓存，以 (bot, event) 为键，在同一次请求中复用"""
+_RULE_RESULTS_CACHE_SIZE = 32
+
+DEPENDENCY_PROVIDERS: dict[type, ContextVar] = {
+    Bot: current_bot,
+    Event: current_event,
+    Matcher: current_matcher,
+}
+
+
+@dataclass
+class InjectSlot:
+    """依赖注入计划中的单个参数槽位"""
+
+    name: str
+    """参数名"""
+    provider: Optional[ContextVar] = None
+    """依赖提供者（Bot、Event、Matcher...）"""
+    default: Any = inspect.Parameter.empty
+    """参数默认值"""
+
+
+def compile_injection_plan(function: Any) -> list[InjectSlot]:
+    """
+    解析函数签名，生成依赖注入计划
+
+    签名与类型注解只在此处解析一次，调用时仅需按槽位填充参数
+    """
+    sig = inspect.signature(function)
+    hints = get_type_hints(function)
+
+    plan: list[InjectSlot] = []
+
+    for name, param in sig.parameters.items():
+        param_type = hints.get(name, None)
+        provider = None
+
+        if param_type and isinstance(param_type, type):
+            for dep_type, dep_provider in DEPENDENCY_PROVIDERS.items():
+                if issubclass(param_type, dep_type):
+                    provider = dep_provider
+                    break
+
+        plan.append(InjectSlot(name=name, provider=provider, default=param.default))
+
+    return plan
 
 
 class Caller:
@@ -48,6 +101,10 @@ class Caller:
         """函数对象"""
         self.default: dict[str, Any] = {}
         """默认值"""
+        self._injection_plan: Optional[list[InjectSlot]] = None
+        """依赖注入计划（注册时生成）"""
+        self._data: Optional[dict[str, Any]] = None
+        """函数描述信息缓存（注册时生成）"""
 
         self.module_name: str = ""
         """函数所在模块名称"""
@@ -71,39 +128,39 @@ class Caller:
             module_name = ""
         self.module_name = module_name
 
+        try:
+            self._injection_plan = compile_injection_plan(func)
+        except NameError as e:
+            # 前向引用的类型在注册时可能尚未定义，推迟到首次调用时再解析
+            logger.debug(f"Function Call 函数 {self._name} 的类型注解暂无法解析，将在调用时生成注入计划: {e}")
+
+        self._data = self._build_data()
+
         _caller_data[self._name] = self
+        invalidate_function_list()
         logger.debug(f"Function Call 函数 {self.module_name}.{self._name} 已成功加载")
         return func
 
     async def _inject_dependencies(self, kwargs: dict) -> dict:
         """
-        自动解析参数并进行依赖注入
+        根据注入计划填充参数并进行依赖注入
         """
-        sig = inspect.signature(self.function)
-        hints = get_type_hints(self.function)
+        if self._injection_plan is None:
+            self._injection_plan = compile_injection_plan(self.function)
 
         inject_args = kwargs.copy()
 
-        for name, param in sig.parameters.items():
-            param_type = hints.get(name, None)
-
-            if param_type and isinstance(param_type, type):
-                if issubclass(param_type, Bot):
-                    inject_args[name] = current_bot.get()
-
-                elif issubclass(param_type, Event):
-                    inject_args[name] = current_event.get()
-
-                elif issubclass(param_type, Matcher):
-                    inject_args[name] = current_matcher.get()
+        for slot in self._injection_plan:
+            if slot.provider is not None:
+                inject_args[slot.name] = slot.provider.get()
 
             # 填充默认值
-            elif param.default != inspect.Parameter.empty:
-                inject_args[name] = kwargs.get(name, param.default)
+            elif slot.default is not inspect.Parameter.empty:
+                inject_args.setdefault(slot.name, slot.default)
 
             # 如果参数未提供，则检查是否有默认值
-            elif name not in inject_args:
-                raise ValueError(f"缺少必要参数: {name}")
+            elif slot.name not in inject_args:
+                raise ValueError(f"缺少必要参数: {slot.name}")
 
         return inject_args
 
@@ -119,6 +176,16 @@ class Caller:
         return await self.function(**inject_args)
 
     def data(self) -> dict[str, Any]:
+        """
+        获取函数描述信息（注册时生成并缓存，请勿修改返回的字典）
+
+        :return: 可用于 Function_call 的字典
+        """
+        if self._data is None:
+            self._data = self._build_data()
+        return self._data
+
+    def _build_data(self) -> dict[str, Any]:
         """
         生成函数描述信息
 
@@ -184,19 +251,57 @@ def get_function_calls() -> dict[str, Caller]:
     return _caller_data
 
 
+def invalidate_function_list():
+    """
+    使工具列表缓存失效（在插件加载、函数注册时调用）
+    """
+    global _function_list_cache
+    _function_list_cache = None
+    _rule_results_cache.clear()
+
+
+async def _check_rules(bot: Bot, event: Event) -> dict[str, bool]:
+    """
+    并发检查所有带有响应规则的函数，同一 (bot, event) 的结果会被缓存
+    """
+    key = (id(bot), id(event))
+    if cached := _rule_results_cache.get(key):
+        cached_bot, cached_event, results = cached
+        # 对象被回收后 id 可能被复用，需确认仍是同一对象
+        if cached_bot is bot and cached_event is event:
+            _rule_results_cache.move_to_end(key)
+            return results
+
+    state: T_State = {}
+    ruled_callers = [caller for caller in _caller_data.values() if caller._rule is not None]
+    passed = await asyncio.gather(*(caller._rule(bot, event, state) for caller in ruled_callers))  # type:ignore
+    results = {caller._name: ok for caller, ok in zip(ruled_callers, passed)}
+
+    _rule_results_cache[key] = (bot, event, results)
+    if len(_rule_results_cache) > _RULE_RESULTS_CACHE_SIZE:
+        _rule_results_cache.popitem(last=False)
+
+    return results
+
+
 async def get_function_list() -> list[dict[str, dict]]:
     """
     获取所有已注册的function call函数，并转换为工具格式
 
     :return: 所有已注册的function call函数列表
     """
-    tools: list[dict[str, dict]] = []
+    global _function_list_cache
+
+    if _function_list_cache is None:
+        _function_list_cache = [(caller, caller.data()) for caller in _caller_data.values()]
+
+    if not any(caller._rule is not None for caller, _ in _function_list_cache):
+        return [data for _, data in _function_list_cache]
+
     bot: Bot = current_bot.get()
     event: Event = current_event.get()
-    state: T_State = {}
-
-    for name, caller in _caller_data.items():
-        if caller._rule is None or await caller._rule(bot, event, state):
-            tools.append(caller.data())
+    rule_results = await _check_rules(bot, event)
 
-    return tools
+    return [
+        data for caller, data in _function_list_cache if caller._rule is None or rule_results.get(caller._name, False)
+    ]
@@ -1,6 +1,9 @@
+import asyncio
 import inspect
+from bisect import insort
 from collections import defaultdict
 from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import (
     Any,
     Awaitable,
@@ -30,56 +33,121 @@ DEPENDENCY_PROVIDERS: dict[type, ContextVar] = {
 }
 
 
-def _match_union(param_type: type, arg: object) -> bool:
-    if get_origin(param_type) is Union:
-        return any(isinstance(arg, t) for t in get_args(param_type))
-    return False
+@dataclass
+class HookSlot:
+    """钩子函数依赖注入计划中的单个参数槽位"""
+
+    name: str
+    """参数名"""
+    accepts: tuple[type, ...] = ()
+    """可直接注入的 hook_arg 类型（Union 类型会被展开）"""
+    provider: Optional[ContextVar] = None
+    """依赖提供者（Bot、Event、Matcher...）"""
+
+
+def compile_injection_plan(function: HOOK_FUNC) -> list[HookSlot]:
+    """
+    解析钩子函数签名，生成依赖注入计划
+
+    签名与类型注解只在注册时解析一次，运行时仅需按槽位匹配 hook_arg
+    """
+    sig = inspect.signature(function)
+    hints = get_type_hints(function)
+
+    plan: list[HookSlot] = []
+
+    for name in sig.parameters:
+        param_type = hints.get(name, None)
+        if not param_type:
+            continue
+
+        if get_origin(param_type) is Union:
+            accepts = tuple(t for t in get_args(param_type) if isinstance(t, type))
+        elif isinstance(param_type, type):
+            accepts = (param_type,)
+        else:
+            continue
+
+        provider = None
+        if isinstance(param_type, type):
+            for dep_type, dep_provider in DEPENDENCY_PROVIDERS.items():
+                if issubclass(param_type, dep_type):
+                    provider = dep_provider
+                    break
+
+        plan.append(HookSlot(name=name, accepts=accepts, provider=provider))
+
+    return plan
+
+
+@dataclass
+class DispatchTable:
+    """某一钩子类型在某一流式状态下的调度表（已按优先级排序）"""
+
+    ordered: List["Hooked"] = field(default_factory=list)
+    """需按优先级依次执行的钩子"""
+    side_effect: List["Hooked"] = field(default_factory=list)
+    """仅产生副作用、可并发执行的钩子"""
+    has_rules: bool = False
+    """表中是否存在需要检查响应规则的钩子"""
 
 
 class HookManager:
     def __init__(self):
         self._hooks: Dict[HookType, List["Hooked"]] = defaultdict(list)
+        self._dispatch_tables: Dict[tuple[HookType, bool], DispatchTable] = {}
 
-    async def _inject_dependencies(self, function: HOOK_FUNC, *hook_args: HOOK_ARGS) -> dict:
+    async def _inject_dependencies(self, hooked: "Hooked", *hook_args: HOOK_ARGS) -> dict:
         """
-        自动解析参数并进行依赖注入
+        根据钩子函数的注入计划填充参数
         """
-        sig = inspect.signature(function)
-        hints = get_type_hints(function)
-
         inject_args: dict[str, Any] = {}
 
-        for name, param in sig.parameters.items():
-            param_type = hints.get(name, None)
-            if not param_type:
-                continue
-
+        for slot in hooked.get_injection_plan():
+            # 1. 直接匹配 hook_arg（包括 Union 类型）
             for hook_arg in hook_args:
-                # 1. Union 类型注入 hook_arg
-                if _match_union(param_type, hook_arg):
-                    inject_args[name] = hook_arg
-                    break
-
-                # 2. 直接匹配 hook_arg
-                if isinstance(hook_arg, param_type):
-                    inject_args[name] = hook_arg
+                if isinstance(hook_arg, slot.accepts):
+                    inject_args[slot.name] = hook_arg
                     break
 
-                # 3. 依赖提供者匹配（Bot、Event、Matcher...）
-                for dep_type, provider in DEPENDENCY_PROVIDERS.items():
-                    if isinstance(param_type, type) and issubclass(param_type, dep_type):
-                        inject_args[name] = provider.get()
-                        break
+            # 2. 依赖提供者匹配（Bot、Event、Matcher...）
+            else:
+                if slot.provider is not None:
+                    inject_args[slot.name] = slot.provider.get()
 
         return inject_args
 
+    def _build_dispatch_tables(self, hook_type: HookType):
+        """
+        为指定钩子类型重建流式/非流式两张调度表
+        """
+        for stream in (True, False):
+            table = DispatchTable()
+            for hooked in self._hooks[hook_type]:
+                if hooked.stream is not None and hooked.stream != stream:
+                    continue
+                (table.side_effect if hooked.side_effect else table.ordered).append(hooked)
+                table.has_rules = table.has_rules or bool(hooked.rule and hooked.rule.checkers)
+            self._dispatch_tables[(hook_type, stream)] = table
+
     def register(self, hook_type: HookType, hooked: "Hooked"):
         """
         注册一个挂钩函数
         """
-        self._hooks[hook_type].append(hooked)
+        # 同优先级下保持注册顺序
+        insort(self._hooks[hook_type], hooked, key=lambda x: x.priority)
+        self._build_dispatch_tables(hook_type)
         return hooked
 
+    async def _call(self, hooked: "Hooked", *hook_args: HOOK_ARGS):
+        """
+        执行单个钩子函数
+        """
+        args = await self._inject_dependencies(hooked, *hook_args)
+        result = hooked.function(**args)
+        if isinstance(result, Awaitable):
+            await result
+
     async def run(self, hook_type: HookType, *hook_args: HOOK_ARGS, stream: bool = False):
         """
         运行所有的钩子函数
@@ -88,24 +156,32 @@ class HookManager:
         :param hook_arg: 消息处理流程中对应的数据类
         :param stream: 当前是否为流式状态
         """
-        hookeds = self._hooks[hook_type]
-        hookeds.sort(key=lambda x: x.priority)
+        table = self._dispatch_tables.get((hook_type, stream))
+        if table is None:
+            return
+
+        ordered, side_effect = table.ordered, table.side_effect
+
+        if table.has_rules:
+            bot: Bot = current_bot.get()
+            event: Event = current_event.get()
+            state: T_State = {}
 
-        bot: Bot = current_bot.get()
-        event: Event = current_event.get()
-        state: T_State = {}
+            async def _check(hooked: "Hooked") -> bool:
+                return not hooked.rule or await hooked.rule(bot, event, state)
 
-        for hooked in hookeds:
-            args = await self._inject_dependencies(hooked.function, *hook_args)
+            # 各钩子的响应规则互不依赖，并发检查
+            candidates = ordered + side_effect
+            passed = await asyncio.gather(*(_check(hooked) for hooked in candidates))
+            enabled = {id(hooked) for hooked, ok in zip(candidates, passed) if ok}
+            ordered = [hooked for hooked in ordered if id(hooked) in enabled]
+            side_effect = [hooked for hooked in side_effect if id(hooked) in enabled]
 
-            if (hooked.stream is not None and hooked.stream == stream) or (
-                hooked.rule and not await hooked.rule(bot, event, state)
-            ):
-                continue
+        for hooked in ordered:
+            await self._call(hooked, *hook_args)
 
-            result = hooked.function(**args)
-            if isinstance(result, Awaitable):
-                await result
+        if side_effect:
+            await asyncio.gather(*(self._call(hooked, *hook_args) for hooked in side_effect))
 
 
 hook_manager = HookManager()
@@ -115,7 +191,12 @@ class Hooked:
     """挂钩函数对象"""
 
     def __init__(
-        self, hook_type: HookType, priority: int = 10, stream: Optional[bool] = None, rule: Optional[Rule] = None
+        self,
+        hook_type: HookType,
+        priority: int = 10,
+        stream: Optional[bool] = None,
+        rule: Optional[Rule] = None,
+        side_effect: bool = False,
     ):
         self.hook_type = hook_type
         """钩子函数类型"""
@@ -125,9 +206,21 @@ class Hooked:
         """是否仅在(非)流式中运行"""
         self.rule: Optional[Rule] = rule
         """启用规则"""
+        self.side_effect = side_effect
+        """是否仅产生副作用（不修改传入数据），此类钩子会在其余钩子执行后并发执行"""
 
         self.function: HOOK_FUNC
         """函数对象"""
+        self._injection_plan: Optional[list[HookSlot]] = None
+        """依赖注入计划（注册时生成）"""
+
+    def get_injection_plan(self) -> list[HookSlot]:
+        """
+        获取依赖注入计划，若注册时未能生成则在此处生成
+        """
+        if self._injection_plan is None:
+            self._injection_plan = compile_injection_plan(self.function)
+        return self._injection_plan
 
     def __call__(self, func: HOOK_FUNC) -> HOOK_FUNC:
         """
@@ -141,12 +234,18 @@ class Hooked:
         else:
             module_name = ""
 
+        try:
+            self._injection_plan = compile_injection_plan(func)
+        except NameError as e:
+            # 前向引用的类型在注册时可能尚未定义，推迟到首次运行时再解析
+            logger.debug(f"挂钩函数 {func.__name__} 的类型注解暂无法解析，将在运行时生成注入计划: {e}")
+
         hook_manager.register(self.hook_type, self)
         logger.success(f"挂钩函数 {module_name}.{func.__name__} 已成功加载")
         return func
 
 
-def on_before_pretreatment(priority: int = 10, rule: Optional[Rule] = None) -> Hooked:
+def on_before_pretreatment(priority: int = 10, rule: Optional[Rule] = None, side_effect: bool = False) -> Hooked:
     """
     注册一个钩子函数
     这个函数将在传入消息 (`Muice` 的 `_prepare_prompt()`) 前调用
@@ -154,11 +253,12 @@ def on_before_pretreatment(priority: int = 10, rule: Optional[Rule] = None) -> H
 
     :param priority: 调用优先级
     :param rule: Nonebot 的响应规则
+    :param side_effect: 是否仅产生副作用（如日志、统计），此类钩子将并发执行
     """
-    return Hooked(HookType.BEFORE_PRETREATMENT, priority=priority, rule=rule)
+    return Hooked(HookType.BEFORE_PRETREATMENT, priority=priority, rule=rule, side_effect=side_effect)
 
 
-def on_before_completion(priority: int = 10, rule: Optional[Rule] = None) -> Hooked:
+def on_before_completion(priority: int = 10, rule: Optional[Rule] = None, side_effect: bool = False) -> Hooked:
     """
     注册一个钩子函数。
     这个函数将在传入模型(`Muice` 的 `model.ask()`)前调用
@@ -166,11 +266,12 @@ def on_before_completion(priority: int = 10, rule: Optional[Rule] = None) -> Hoo
 
     :param priority: 调用优先级
     :param rule: Nonebot 的响应规则
+    :param side_effect: 是否仅产生副作用（如日志、统计），此类钩子将并发执行
     """
-    return Hooked(HookType.BEFORE_MODEL_COMPLETION, priority=priority, rule=rule)
+    return Hooked(HookType.BEFORE_MODEL_COMPLETION, priority=priority, rule=rule, side_effect=side_effect)
 
 
-def on_stream_chunk(priority: int = 10, rule: Optional[Rule] = None) -> Hooked:
+def on_stream_chunk(priority: int = 10, rule: Optional[Rule] = None, side_effect: bool = False) -> Hooked:
     """
     注册一个钩子函数。
     这个函数将在流式调用中途(`Muice` 的 `model.ask()`)调用
@@ -178,11 +279,14 @@ def on_stream_chunk(priority: int = 10, rule: Optional[Rule] = None) -> Hooked:
 
     :param priority: 调用优先级
     :param rule: Nonebot 的响应规则
+    :param side_effect: 是否仅产生副作用（如日志、统计），此类钩子将并发执行
     """
-    return Hooked(HookType.ON_STREAM_CHUNK, priority=priority, rule=rule)
+    return Hooked(HookType.ON_STREAM_CHUNK, priority=priority, rule=rule, side_effect=side_effect)
 
 
-def on_after_completion(priority: int = 10, stream: Optional[bool] = None, rule: Optional[Rule] = None) -> Hooked:
+def on_after_completion(
+    priority: int = 10, stream: Optional[bool] = None, rule: Optional[Rule] = None, side_effect: bool = False
+) -> Hooked:
     """
     注册一个钩子函数。
     这个函数将在传入模型(`Muice` 的 `model.ask()`)后调用（流式则传入整合后的数据）
@@ -193,11 +297,12 @@ def on_after_completion(priority: int = 10, stream: Optional[bool] = None, rule:
     :param priority: 调用优先级
     :param stream: 是否仅在(非)流式中处理，None 则无限制
     :param rule: Nonebot 的响应规则
+    :param side_effect: 是否仅产生副作用（如日志、统计），此类钩子将并发执行
     """
-    return Hooked(HookType.AFTER_MODEL_COMPLETION, priority=priority, stream=stream, rule=rule)
+    return Hooked(HookType.AFTER_MODEL_COMPLETION, priority=priority, stream=stream, rule=rule, side_effect=side_effect)
 
 
-def on_finish_chat(priority: int = 10, rule: Optional[Rule] = None) -> Hooked:
+def on_finish_chat(priority: int = 10, rule: Optional[Rule] = None, side_effect: bool = False) -> Hooked:
     """
     注册一个钩子函数。
     这个函数将在结束对话(存库前)调用
@@ -205,5 +310,6 @@ def on_finish_chat(priority: int = 10, rule: Optional[Rule] = None) -> Hooked:
 
     :param priority: 调用优先级
     :param rule: Nonebot 的响应规则
+    :param side_effect: 是否仅产生副作用（如日志、统计），此类钩子将并发执行
     """
-    return Hooked(HookType.ON_FINISHING_CHAT, priority=priority, rule=rule)
+    return Hooked(HookType.ON_FINISHING_CHAT, priority=priority, rule=rule, side_effect=side_effect)
@@ -19,6 +19,7 @@ from nonebot import load_plugin as load_plugin_as_nonebot
 from nonebot import logger
 from nonebot.plugin import PluginMetadata
 
+from .func_call.caller import invalidate_function_list
 from .models import Plugin
 from .utils import path_to_module_name
 
@@ -57,6 +58,7 @@ def load_plugin(plugin_path: Path | str, base_path=Path.cwd()) -> Optional[Plugi
         plugin = Plugin(name=nb_plugin.module_name, module=nb_plugin.module, package_name=module_name, meta=metadata)
 
         _plugins[plugin.package_name] = plugin
+        invalidate_function_list()
 
         return plugin
 
@@ -1,4 +1,5 @@
 import asyncio
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
 from nonebot import logger
@@ -8,42 +9,124 @@ from nonebot_plugin_alconna.uniseg import UniMessage, UniMsg
 from ..config import mas_config
 
 
+@dataclass
+class SessionStats:
+    received: int = 0
+    """收到的消息数"""
+    merged: int = 0
+    """被合并进同一批次的后续消息数"""
+    flushed: int = 0
+    """交付处理的批次数"""
+    capped: int = 0
+    """因达到最长等待时间而强制交付的批次数"""
+
+
+@dataclass
+class _PendingSession:
+    messages: List[UniMsg] = field(default_factory=list)
+    """待合并的消息"""
+    first_at: float = 0
+    """首条消息到达的时间"""
+    waiter: Optional["asyncio.Future[Optional[UniMessage]]"] = None
+    """当前接管会话的处理器（最后一条消息的处理器）"""
+    timer: Optional[asyncio.TimerHandle] = None
+    """防抖定时器"""
+
+
 class SessionManager:
-    def __init__(self) -> None:
-        self.sessions: Dict[str, List[UniMsg]] = {}
-        self._lock: asyncio.Lock = asyncio.Lock()
-        self._timeout = mas_config.input_timeout
+    """
+    会话消息防抖合并
 
-    async def _put(self, sid: str, msg: UniMsg) -> None:
-        async with self._lock:
-            if sid not in self.sessions:
-                self.sessions[sid] = []
-            self.sessions[sid].append(msg)
+    每个会话只维护一个可重新调度的定时器：新消息到达时推迟定时器，并让上一条消息的处理器立即退出；
+    定时器到期后，合并的消息交由最后一条消息的处理器处理。为避免连续发送消息导致处理被无限推迟，
+    自首条消息起最多等待 `input_max_wait` 秒
+    """
 
-    async def _get_messages_length(self, sid: str) -> int:
-        async with self._lock:
-            return len(self.sessions.get(sid, []))
+    def __init__(self) -> None:
+        self.sessions: Dict[str, _PendingSession] = {}
+        self.stats = SessionStats()
+        """合并统计"""
+        self._timeout = mas_config.input_timeout
+        self._max_wait = max(mas_config.input_max_wait, self._timeout)
 
     def merge_messages(self, sid: str) -> UniMessage:
         merged_message = UniMessage()
 
-        for message in self.sessions.pop(sid, []):
+        session = self.sessions.pop(sid, None)
+        for message in session.messages if session else []:
             merged_message += message
 
         return merged_message
 
+    def _flush(self, sid: str, capped: bool = False):
+        """
+        定时器到期，将合并的消息交给当前接管会话的处理器
+        """
+        session = self.sessions.get(sid)
+        if session is None or session.waiter is None:
+            return
+
+        waiter = session.waiter
+        message_count = len(session.messages)
+        merged_message = self.merge_messages(sid)
+        if waiter.done():
+            return
+
+        self.stats.flushed += 1
+        if capped:
+            self.stats.capped += 1
+            logger.debug(f"会话 {sid} 已达到最长等待时间，强制处理 {message_count} 条消息")
+        else:
+            logger.debug(f"无新消息，当前处理器接管会话 {sid}，共 {message_count} 条消息")
+
+        waiter.set_result(merged_message)
+
+    def _schedule(self, sid: str, session: _PendingSession):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        if session.timer is not None:
+            session.timer.cancel()
+
+        deadline = session.first_at + self._max_wait
+        capped = now + self._timeout >= deadline
+        session.timer = loop.call_at(min(now + self._timeout, deadline), self._flush, sid, capped)
+
     async def put_and_wait(self, event: Event, message: UniMsg) -> Optional[UniMessage]:
+        """
+        放入消息并等待后续消息
+
+        :return: 合并后的消息；若有新消息插入，当前处理器不再接管会话，返回 None
+        """
         sid = event.get_session_id()
-        await self._put(sid, message)
+        loop = asyncio.get_running_loop()
+        self.stats.received += 1
+
+        session = self.sessions.get(sid)
+        if session is None:
+            session = self.sessions[sid] = _PendingSession(first_at=loop.time())
+        else:
+            self.stats.merged += 1
+
+        session.messages.append(message)
+
+        # 上一条消息的处理器立即退出，不再保持等待
+        if session.waiter is not None and not session.waiter.done():
+            logger.debug(f"发现新消息插入，上一处理器退出，会话 {sid} 交由当前处理器处理")
+            session.waiter.set_result(None)
 
-        old_length = await self._get_messages_length(sid)
-        logger.debug(f"开始等待后续消息 ({self._timeout}s): 会话 {sid}, 当前消息数 {old_length}")
-        await asyncio.sleep(self._timeout)
-        new_length = await self._get_messages_length(sid)
+        waiter: "asyncio.Future[Optional[UniMessage]]" = loop.create_future()
+        session.waiter = waiter
+        self._schedule(sid, session)
 
-        if new_length != old_length:
-            logger.debug(f"发现新消息插入，当前处理器退出，会话 {sid} 交由后续处理器处理")
-            return None
+        logger.debug(f"开始等待后续消息 ({self._timeout}s): 会话 {sid}, 当前消息数 {len(session.messages)}")
 
-        logger.debug(f"无新消息，当前处理器接管会话 {sid}")
-        return self.merge_messages(sid)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            # 接管会话的处理器被取消时，丢弃该会话的待处理消息
+            if self.sessions.get(sid) is session and session.waiter is waiter:
+                if session.timer is not None:
+                    session.timer.cancel()
+                self.sessions.pop(sid, None)
+            raise
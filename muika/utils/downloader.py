@@ -0,0 +1,170 @@
+"""
+共享下载服务
+
+- 每个代理设置复用一个连接池化的 `httpx.AsyncClient`
+- 以分块流式的方式写入磁盘（写入操作不阻塞事件循环），并可限制文件大小
+- 文件以内容哈希命名并交由 `FileStore` 分片存放，相同内容只保存一份
+- 相同 URL 的重复下载在 `url_cache_ttl` 内直接返回本地文件；过期后以 ETag/Last-Modified 发起条件请求，
+  304 时复用本地文件，否则重新下载（URL 的内容可能已变化，如头像）
+"""
+
+import asyncio
+import hashlib
+import os
+import ssl
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import aiofiles
+import httpx
+from nonebot import logger
+
+from .file_store import FileStore
+
+CHUNK_SIZE = 64 * 1024
+"""流式下载的分块大小"""
+URL_CACHE_TTL = 600
+"""URL 索引条目的有效期（秒），过期后需重新验证"""
+
+
+@dataclass
+class URLCacheEntry:
+    path: str
+    """本地路径"""
+    expires_at: float
+    """有效期截止时间（在此之前不发起请求）"""
+    etag: Optional[str] = None
+    """响应的 ETag"""
+    last_modified: Optional[str] = None
+    """响应的 Last-Modified"""
+
+
+class Downloader:
+    def __init__(
+        self,
+        headers: Optional[dict[str, str]] = None,
+        url_cache_size: int = 1024,
+        url_cache_ttl: float = URL_CACHE_TTL,
+    ) -> None:
+        self.headers = headers or {}
+        """请求头"""
+        self.url_cache_size = url_cache_size
+        """URL 索引的最大条目数"""
+        self.url_cache_ttl = url_cache_ttl
+        """URL 索引条目的有效期（秒），<= 0 则每次都重新验证"""
+
+        self._ssl_context = ssl.create_default_context()
+        self._ssl_context.set_ciphers("DEFAULT")
+        self._clients: dict[Optional[str], httpx.AsyncClient] = {}
+        """按代理地址区分的客户端池"""
+        self._url_index: OrderedDict[tuple[str, str, str], URLCacheEntry] = OrderedDict()
+        """(URL, 存储根目录, 文件后缀) -> 本地文件"""
+
+    def get_client(self, proxy: Optional[str] = None) -> httpx.AsyncClient:
+        """
+        获取指定代理设置下共享的客户端
+        """
+        client = self._clients.get(proxy)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(proxy=proxy, verify=self._ssl_context, headers=self.headers)
+            self._clients[proxy] = client
+        return client
+
+    async def _lookup_url(self, key: tuple[str, str, str]) -> Optional[URLCacheEntry]:
+        entry = self._url_index.get(key)
+        if entry is None:
+            return None
+        if not await asyncio.to_thread(os.path.exists, entry.path):
+            del self._url_index[key]
+            return None
+        self._url_index.move_to_end(key)
+        return entry
+
+    def _remember_url(self, key: tuple[str, str, str], entry: URLCacheEntry):
+        self._url_index[key] = entry
+        self._url_index.move_to_end(key)
+        while len(self._url_index) > self.url_cache_size:
+            self._url_index.popitem(last=False)
+
+    async def download(
+        self,
+        url: str,
+        store: FileStore,
+        suffix: str = "",
+        proxy: Optional[str] = None,
+        max_size: Optional[int] = None,
+    ) -> str:
+        """
+        流式下载文件，并以内容哈希命名保存
+
+        :param url: 文件在线地址
+        :param store: 文件存储
+        :param suffix: 文件后缀（如 `.jpg`）
+        :param proxy: 代理地址
+        :param max_size: 文件最大大小（字节），为 None 则不限制
+
+        :return: 保存后的本地路径
+
+        :raise ValueError: 文件大小超出限制
+        :raise httpx.HTTPStatusError: 请求失败
+        """
+        key = (url, str(store.root), suffix)
+        entry = await self._lookup_url(key)
+        if entry is not None and entry.expires_at > time.time():
+            logger.debug(f"命中下载缓存: {url} -> {entry.path}")
+            store.touch(entry.path)
+            return entry.path
+
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        client = self.get_client(proxy)
+        temp_path = store.root / f".{time.time_ns()}.part"
+        hasher = hashlib.sha256()
+        size = 0
+
+        try:
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and entry is not None:
+                    logger.debug(f"文件未变化 (304)，复用本地文件: {url} -> {entry.path}")
+                    entry.expires_at = time.time() + self.url_cache_ttl
+                    store.touch(entry.path)
+                    return entry.path
+
+                response.raise_for_status()
+                validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+                content_length = response.headers.get("Content-Length")
+                if max_size is not None and content_length and int(content_length) > max_size:
+                    raise ValueError(f"文件大小超出限制 ({content_length} > {max_size} bytes): {url}")
+
+                async with aiofiles.open(temp_path, "wb") as file:
+                    async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                        size += len(chunk)
+                        if max_size is not None and size > max_size:
+                            raise ValueError(f"文件大小超出限制 (> {max_size} bytes): {url}")
+                        hasher.update(chunk)
+                        await file.write(chunk)
+
+            local_path = await store.commit(temp_path, hasher.hexdigest(), suffix)
+
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        await store.add(local_path, size)
+        self._remember_url(key, URLCacheEntry(str(local_path), time.time() + self.url_cache_ttl, *validators))
+        return str(local_path)
+
+    async def close(self):
+        """
+        关闭所有客户端
+        """
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
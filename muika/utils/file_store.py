@@ -0,0 +1,304 @@
+"""
+多模态文件存储管理
+
+- 文件按内容哈希的前两位分片存放到子目录中，避免单一目录下文件过多
+- 维护一个轻量索引（大小、最近访问时间、引用计数），并持久化至 `index.json`
+- 超出容量配额或超过最长保存时间的文件会按 LRU 顺序淘汰，但被近期对话引用的文件和刚写入的文件不会被淘汰
+- 引用计数只覆盖内存中的近期对话，数据库中较早消息引用的文件仍可能被淘汰，读取历史消息时需处理文件缺失的情况
+  （见 `FileStore.existing`）
+- 文件系统操作（创建分片目录、移动文件、检查文件是否存在）均在事件循环外执行
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import aiofiles
+from nonebot import logger
+
+INDEX_FILE_NAME = "index.json"
+SAVE_INTERVAL = 60
+"""索引的最短保存间隔（秒）"""
+SWEEP_INTERVAL = 3600
+"""按时间淘汰的最短检查间隔（秒）"""
+LOW_WATERMARK = 0.9
+"""超出配额时，淘汰至配额的该比例以下"""
+
+
+def _filter_existing(paths: list[str]) -> list[str]:
+    return [path for path in paths if os.path.exists(path)]
+
+
+@dataclass
+class FileEntry:
+    size: int
+    """文件大小"""
+    last_access: float
+    """最近访问时间"""
+    refs: int = 0
+    """被近期对话引用的次数（不持久化）"""
+
+
+class FileStore:
+    def __init__(self, root: Path, quota: int = 0, max_age: float = 0, retention: float = 3600) -> None:
+        self.root = root
+        """存储根目录"""
+        self.quota = quota
+        """容量配额（字节），<= 0 则不限制"""
+        self.max_age = max_age
+        """文件最长保存时间（秒），<= 0 则不限制"""
+        self.retention = retention
+        """新写入（或刚访问）文件的最短保留时间（秒）"""
+        self.index_path = root / INDEX_FILE_NAME
+
+        self._root = root.resolve()
+        """规范化的存储根目录（只在初始化时解析一次）"""
+        self._shards: set[str] = set()
+        """已创建的分片目录"""
+        self._entries: dict[str, FileEntry] = {}
+        self._total_size = 0
+        self._loaded = False
+        self._dirty = False
+        self._last_save = 0.0
+        self._last_sweep = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def total_size(self) -> int:
+        return self._total_size
+
+    def path_for(self, digest: str, suffix: str = "") -> Path:
+        """
+        获取内容哈希对应的分片存储路径（不访问文件系统）
+        """
+        return self._root / digest[:2] / f"{digest}{suffix}"
+
+    def _key(self, path: Union[str, Path]) -> Optional[str]:
+        try:
+            return Path(os.path.abspath(path)).relative_to(self._root).as_posix()
+        except ValueError:
+            return None
+
+    def _commit(self, temp_path: Path, path: Path) -> bool:
+        shard = path.parent.name
+        if shard not in self._shards:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._shards.add(shard)
+        if path.exists():
+            temp_path.unlink()
+            return False
+        os.replace(temp_path, path)
+        return True
+
+    async def commit(self, temp_path: Path, digest: str, suffix: str = "") -> Path:
+        """
+        将临时文件以内容哈希命名移入分片目录（在事件循环外执行），相同内容的文件已存在时丢弃临时文件
+
+        :return: 文件的存储路径
+        """
+        path = self.path_for(digest, suffix)
+        if not await asyncio.to_thread(self._commit, temp_path, path):
+            logger.debug(f"文件内容已存在，复用本地文件: {path}")
+        return path
+
+    async def existing(self, paths: Iterable[str]) -> set[str]:
+        """
+        获取仍存在的文件（在事件循环外检查）。数据库中的消息引用的文件可能已被淘汰，读取历史消息时应先过滤
+        """
+        return set(await asyncio.to_thread(_filter_existing, list(paths)))
+
+    def _scan(self) -> dict[str, FileEntry]:
+        """
+        扫描存储目录，重建索引
+        """
+        entries: dict[str, FileEntry] = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename == INDEX_FILE_NAME or filename.endswith(".part"):
+                    continue
+                full_path = Path(dirpath) / filename
+                stat = full_path.stat()
+                entries[full_path.relative_to(self.root).as_posix()] = FileEntry(stat.st_size, stat.st_mtime)
+        return entries
+
+    async def load(self):
+        """
+        加载索引，若索引不存在或损坏则扫描目录重建
+        """
+        if self._loaded:
+            return
+
+        entries: Optional[dict[str, FileEntry]] = None
+        if self.index_path.exists():
+            try:
+                async with aiofiles.open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.loads(await f.read())
+                entries = {k: FileEntry(size=v["size"], last_access=v["last_access"]) for k, v in data.items()}
+            except Exception as e:
+                logger.warning(f"加载文件索引失败，将重新扫描目录: {e}")
+
+        if entries is None:
+            entries = await asyncio.to_thread(self._scan)
+            self._dirty = True
+
+        # 引用计数只在运行期间有效，合并加载前产生的引用
+        for key, entry in self._entries.items():
+            if key in entries:
+                entries[key].refs = entry.refs
+
+        self._entries = entries
+        self._total_size = sum(entry.size for entry in entries.values())
+        self._loaded = True
+        logger.debug(f"文件索引已加载: {self.root} ({len(entries)} 个文件, {self._total_size} bytes)")
+
+    async def save(self, force: bool = True):
+        """
+        持久化索引
+
+        :param force: 为 False 时，距离上次保存不足 `SAVE_INTERVAL` 秒则跳过
+        """
+        if not self._dirty or (not force and time.time() - self._last_save < SAVE_INTERVAL):
+            return
+
+        data = {k: {"size": v.size, "last_access": v.last_access} for k, v in self._entries.items()}
+        self._dirty = False
+        self._last_save = time.time()
+
+        temp_path = self.index_path.with_suffix(".json.part")
+        async with aiofiles.open(temp_path, "w", encoding="utf-8") as f:
+            await f.write(json.dumps(data))
+        os.replace(temp_path, self.index_path)
+
+    async def add(self, path: Union[str, Path], size: Optional[int] = None):
+        """
+        登记一个新写入的文件，并在需要时触发淘汰
+
+        :param size: (可选)文件大小，为空则读取文件信息
+        """
+        await self.load()
+
+        key = self._key(path)
+        if key is None:
+            return
+
+        if size is None:
+            size = await asyncio.to_thread(os.path.getsize, path)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = FileEntry(size=size, last_access=time.time())
+            self._total_size += size
+        else:
+            # 已登记（或由 retain 占位）的文件，更新大小与访问时间
+            self._total_size += size - entry.size
+            entry.size = size
+            entry.last_access = time.time()
+        self._dirty = True
+
+        await self.evict()
+        await self.save(force=False)
+
+    def touch(self, path: Union[str, Path]):
+        """
+        更新文件的最近访问时间
+        """
+        if (key := self._key(path)) and (entry := self._entries.get(key)):
+            entry.last_access = time.time()
+            self._dirty = True
+
+    def retain(self, paths: Iterable[str]):
+        """
+        增加文件的引用计数（被引用的文件不会被淘汰）
+        """
+        for path in paths:
+            key = self._key(path)
+            if key is None:
+                continue
+            entry = self._entries.get(key)
+            if entry is None:
+                # 索引尚未加载或文件尚未登记，先占位记录引用
+                entry = self._entries.setdefault(key, FileEntry(size=0, last_access=time.time()))
+            entry.refs += 1
+            entry.last_access = time.time()
+
+    def release(self, paths: Iterable[str]):
+        """
+        减少文件的引用计数
+        """
+        for path in paths:
+            if (key := self._key(path)) and (entry := self._entries.get(key)):
+                entry.refs = max(0, entry.refs - 1)
+
+    def _select_victims(self, now: float) -> list[str]:
+        candidates = [
+            (entry.last_access, key)
+            for key, entry in self._entries.items()
+            if entry.refs == 0 and now - entry.last_access >= self.retention
+        ]
+
+        victims: list[str] = []
+        total_size = self._total_size
+
+        if self.max_age > 0:
+            expired = [key for last_access, key in candidates if now - last_access >= self.max_age]
+            victims.extend(expired)
+            total_size -= sum(self._entries[key].size for key in expired)
+
+        if self.quota > 0 and total_size > self.quota:
+            target = self.quota * LOW_WATERMARK
+            expired_set = set(victims)
+            for _, key in sorted(candidates):
+                if total_size <= target:
+                    break
+                if key in expired_set:
+                    continue
+                victims.append(key)
+                total_size -= self._entries[key].size
+
+        return victims
+
+    def _remove_files(self, keys: list[str]):
+        for key in keys:
+            try:
+                (self.root / key).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"删除文件失败: {key} ({e})")
+
+    async def evict(self):
+        """
+        淘汰超出配额或过期的文件
+        """
+        now = time.time()
+        over_quota = self.quota > 0 and self._total_size > self.quota
+        sweep_due = self.max_age > 0 and now - self._last_sweep >= SWEEP_INTERVAL
+        if not (over_quota or sweep_due):
+            return
+
+        async with self._lock:
+            await self.load()
+            self._last_sweep = now
+            victims = self._select_victims(now)
+            if not victims:
+                return
+
+            for key in victims:
+                entry = self._entries.pop(key)
+                self._total_size -= entry.size
+            self._dirty = True
+
+            await asyncio.to_thread(self._remove_files, victims)
+            logger.info(f"已淘汰 {len(victims)} 个文件: {self.root} (当前 {self._total_size} bytes)")
+
+    def stats(self) -> dict:
+        """
+        获取存储统计信息
+        """
+        return {
+            "files": len(self._entries),
+            "total_size": self._total_size,
+            "referenced": sum(1 for entry in self._entries.values() if entry.refs > 0),
+            "quota": self.quota,
+        }
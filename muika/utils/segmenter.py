@@ -0,0 +1,134 @@
+import re
+import time
+from typing import Optional
+
+SENTENCE_BOUNDARY = re.compile(r"[。！？!?…~～]+[”’」』)）]*|\.(?=\s)|\n")
+"""句子边界：中英文句末标点（含紧随的引号、括号）以及换行"""
+
+
+class StreamSegmenter:
+    """
+    流式输出分段器
+
+    每次只扫描新到达的文本块，遇到空行时立即切分出一个段落；
+    若待发送文本等待过久或过长，则在最后一个句子边界处提前切分，避免长回复迟迟没有输出
+    """
+
+    def __init__(self, flush_interval: float = 1.5, max_length: int = 300) -> None:
+        self.flush_interval = flush_interval
+        """待发送文本的最长等待时间（秒），<= 0 则不启用"""
+        self.max_length = max_length
+        """待发送文本的最大长度，<= 0 则不启用"""
+
+        self._pieces: list[str] = []
+        """当前段落的文本块"""
+        self._length: int = 0
+        """当前段落长度"""
+        self._ends_with_newline: bool = False
+        """上一个文本块是否以换行结尾（用于识别跨块的空行）"""
+        self._pending_since: Optional[float] = None
+        """当前段落首个字符到达的时间"""
+        self._last_boundary: Optional[int] = None
+        """当前段落中最后一个句子边界的结束位置"""
+        self._tail: str = ""
+        """当前段落末尾可能与之后的文本组成句子边界的部分（如句末标点、待确认的英文句号），需要与新文本一同扫描"""
+
+    def _scan(self, text: str):
+        """
+        扫描新到达的文本，更新最后一个句子边界的位置。每个字符只扫描一次（除末尾可能延续的句子边界外）
+        """
+        window = self._tail + text
+        base = self._length - len(window)
+        tail_start = len(window)
+        for match in SENTENCE_BOUNDARY.finditer(window):
+            self._last_boundary = base + match.end()
+            if match.end() == len(window):
+                # 句末标点或闭合引号可能在下一块中延续
+                tail_start = match.start()
+        if window.endswith("."):
+            # 英文句号需要下一个字符确认
+            tail_start = min(tail_start, len(window) - 1)
+        self._tail = window[tail_start:]
+
+    def _append(self, text: str):
+        if not text:
+            return
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+        self._pieces.append(text)
+        self._length += len(text)
+        self._scan(text)
+
+    def _take(self, end: Optional[int] = None) -> Optional[str]:
+        """
+        取出当前段落（或其前 end 个字符）
+        """
+        text = "".join(self._pieces)
+        rest = text[end:] if end is not None else ""
+        text = text[:end] if end is not None else text
+
+        self._pieces = [rest] if rest else []
+        self._length = len(rest)
+        self._pending_since = time.monotonic() if rest else None
+        self._last_boundary = None
+        self._tail = ""
+        # 剩余部分位于最后一个句子边界之后，重新扫描的字符总数不超过输入的长度
+        self._scan(rest)
+
+        text = text.strip()
+        return text or None
+
+    def _should_flush_early(self) -> bool:
+        if self.max_length > 0 and self._length >= self.max_length:
+            return True
+        return (
+            self.flush_interval > 0
+            and self._pending_since is not None
+            and time.monotonic() - self._pending_since >= self.flush_interval
+        )
+
+    def _flush_early(self) -> Optional[str]:
+        """
+        在最后一个句子边界处切分；超出最大长度且没有句子边界时整段切分
+        """
+        if self._last_boundary is not None:
+            return self._take(self._last_boundary)
+        if self.max_length > 0 and self._length >= self.max_length:
+            return self._take()
+        return None
+
+    def feed(self, chunk: str) -> list[str]:
+        """
+        输入一个文本块，返回可以发送的段落列表
+        """
+        segments: list[str] = []
+        if not chunk:
+            return segments
+
+        # 上一块以换行结尾、本块以换行开头，两者组成一个空行
+        if self._ends_with_newline and chunk.startswith("\n"):
+            chunk = chunk[1:]
+            if paragraph := self._take():
+                segments.append(paragraph)
+
+        parts = chunk.split("\n\n")
+        for part in parts[:-1]:
+            self._append(part)
+            if paragraph := self._take():
+                segments.append(paragraph)
+
+        self._append(parts[-1])
+        self._ends_with_newline = chunk.endswith("\n")
+
+        if self._pieces and self._should_flush_early():
+            if paragraph := self._flush_early():
+                segments.append(paragraph)
+
+        return segments
+
+    def close(self) -> Optional[str]:
+        """
+        结束输入，返回剩余的文本
+        """
+        self._ends_with_newline = False
+        return self._take()
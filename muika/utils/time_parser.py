@@ -0,0 +1,359 @@
+"""
+自然语言时间解析
+
+- 快速路径：以预编译的规则解析模型常用的相对与绝对时间表达（如 `in 10 minutes`、`tomorrow at 8am`、`明晚8点`）
+- 回退路径：快速路径无法解析时交由 dateparser 解析（导入与解析都较慢，应通过 `parse_time_async` 在事件循环外执行）
+- 规则匹配的结果与 dateparser 的绝对时间结果均按规范化后的短语进行 LRU 缓存
+
+本模块只依赖标准库（dateparser 在回退时才导入）
+"""
+
+import asyncio
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache, partial
+from typing import Callable, Optional
+
+Resolver = Callable[[datetime], datetime]
+
+_NUMBER_WORDS = {
+    "a": 1,
+    "an": 1,
+    "one": 1,
+    "a couple of": 2,
+    "a few": 3,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "eleven": 11,
+    "twelve": 12,
+    "fifteen": 15,
+    "twenty": 20,
+    "thirty": 30,
+    "forty": 40,
+    "forty-five": 45,
+    "fifty": 50,
+    "sixty": 60,
+}
+_CN_DIGITS = {"零": 0, "一": 1, "二": 2, "两": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_CN_UNIT_SECONDS = {"秒": 1, "分": 60, "小": 3600, "钟": 3600, "天": 86400, "周": 604800, "星": 604800, "礼": 604800}
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+_EN_NUMBER = r"\d+(?:\.\d+)?|" + "|".join(sorted(map(re.escape, _NUMBER_WORDS), key=len, reverse=True))
+_EN_UNIT = r"(?P<unit>s|secs?|seconds?|m|mins?|minutes?|h|hrs?|hours?|d|days?|w|wks?|weeks?)"
+_EN_TIME = (
+    r"(?P<noon>noon|midnight)|(?P<hour>\d{1,2})(?:[:.](?P<minute>\d{2}))?\s*(?P<ampm>a\.?m\.?|p\.?m\.?|o'?clock)?"
+)
+_EN_ANCHOR = (
+    r"(?P<anchor>now|right now|immediately|today|tonight|this morning|this afternoon|this evening|"
+    r"(?:the day after )?tomorrow(?: (?:morning|afternoon|evening|night))?|"
+    r"(?:next |this |on )?(?:" + "|".join(_WEEKDAYS) + r")(?: (?:morning|afternoon|evening|night))?)"
+)
+_CN_NUMBER = r"\d+|[零一二两三四五六七八九十]+"
+
+EN_RELATIVE = re.compile(
+    rf"^(?:(?:in|after)\s+(?P<n1>{_EN_NUMBER}|half an?)\s*{_EN_UNIT}(?:\s+later|\s+from now)?"
+    rf"|(?P<n2>{_EN_NUMBER}|half an?)\s*{_EN_UNIT.replace('unit', 'unit2')}\s+(?:later|from now))$"
+)
+EN_ANCHOR_FIRST = re.compile(rf"^{_EN_ANCHOR}(?:\s+(?:at|around|by)?\s*(?:{_EN_TIME}))?$")
+EN_TIME_FIRST = re.compile(rf"^(?:at|around|by)?\s*(?:{_EN_TIME})(?:\s+{_EN_ANCHOR})?$")
+CN_RELATIVE = re.compile(
+    rf"^(?:再?过)?(?P<n>{_CN_NUMBER}|半)\s*个?\s*(?P<unit>秒钟?|分钟?|小时|钟头|天|周|星期|礼拜)(?:之后|以后|后)$"
+)
+CN_ABSOLUTE = re.compile(
+    r"^(?P<day>今天|明天|后天|大后天|今|明)?"
+    r"(?P<period>早上|早晨|上午|中午|下午|傍晚|晚上|凌晨|夜里|早|晚)?"
+    rf"(?:(?P<hour>{_CN_NUMBER})\s*[点:：时](?:(?P<half>半)|(?P<quarter>一刻|三刻)|(?P<minute>{_CN_NUMBER})分?)?)?"
+    r"(?:的时候)?$"
+)
+
+_PERIOD_DEFAULTS = {"morning": 9, "afternoon": 15, "evening": 19, "night": 21}
+_NIGHT_PERIODS = ("evening", "night", "tonight")
+"""“12 点”指午夜（次日 0 点）的时段"""
+_LATE_NIGHT_PERIODS = ("night", "tonight")
+"""凌晨的时刻（`_SMALL_HOURS`）指次日凌晨的时段"""
+_SMALL_HOURS = range(1, 6)
+"""夜间时段中指次日凌晨的时刻"""
+_CN_PERIOD_DEFAULTS = {
+    "早上": 8,
+    "早晨": 8,
+    "早": 8,
+    "上午": 9,
+    "中午": 12,
+    "下午": 15,
+    "傍晚": 18,
+    "晚上": 20,
+    "晚": 20,
+    "夜里": 22,
+    "凌晨": 2,
+}
+_CN_DAY_OFFSETS = {"今天": 0, "今": 0, "明天": 1, "明": 1, "后天": 2, "大后天": 3}
+_CN_NIGHT_PERIODS = ("晚上", "晚", "夜里")
+"""“12 点”指午夜（次日 0 点）、凌晨的时刻（`_SMALL_HOURS`）指次日凌晨的时段"""
+
+
+def normalize(text: str) -> str:
+    """
+    规范化时间短语（小写、合并空白、去除首尾标点）
+    """
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.strip(" .,!?;。，！？；")
+
+
+def _cn_to_int(text: str) -> int:
+    """
+    转换阿拉伯数字或 100 以内的中文数字
+    """
+    if text.isdigit():
+        return int(text)
+    if "十" in text:
+        tens, _, ones = text.partition("十")
+        return (_CN_DIGITS[tens] if tens else 1) * 10 + (_CN_DIGITS[ones] if ones else 0)
+    return _CN_DIGITS[text]
+
+
+def _en_to_number(text: str) -> float:
+    if text.startswith("half"):
+        return 0.5
+    return _NUMBER_WORDS[text] if text in _NUMBER_WORDS else float(text)
+
+
+def _after(seconds: float, now: datetime) -> datetime:
+    return now + timedelta(seconds=seconds)
+
+
+def _at(day_offset: int, hour: Optional[int], minute: int, roll_over: bool, now: datetime) -> datetime:
+    """
+    在 `day_offset` 天后的指定时刻（hour 为 None 时保持当前时刻）；`roll_over` 为 True 时若已过去则顺延一天
+    """
+    target = now + timedelta(days=day_offset)
+    if hour is None:
+        return target
+    target = target.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if roll_over and target <= now:
+        target += timedelta(days=1)
+    return target
+
+
+def _at_weekday(weekday: int, force_next_week: bool, hour: int, minute: int, day_shift: int, now: datetime) -> datetime:
+    """
+    在指定星期几的指定时刻，`day_shift` 为 1 时表示该日结束时的午夜（如 “friday night at 12”）
+    """
+    days = (weekday - now.weekday()) % 7
+    if force_next_week and days == 0:
+        days = 7
+    target = (now + timedelta(days=days + day_shift)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=7)
+    return target
+
+
+def _to_24h(hour: int, ampm: Optional[str], pm_hint: bool) -> int:
+    if ampm and ampm.startswith("p") and hour < 12:
+        return hour + 12
+    if ampm and ampm.startswith("a") and hour == 12:
+        return 0
+    if not (ampm and ampm[0] in "ap") and pm_hint and hour < 12:
+        return hour + 12
+    return hour
+
+
+def _compile_en_relative(match: re.Match) -> Optional[Resolver]:
+    number = match.group("n1") or match.group("n2")
+    unit = match.group("unit") or match.group("unit2")
+    return partial(_after, _en_to_number(number) * _UNIT_SECONDS[unit[0]])
+
+
+def _compile_en_absolute(match: re.Match) -> Optional[Resolver]:
+    anchor = match.group("anchor")
+    hour: Optional[int] = None
+    minute = 0
+
+    if anchor in ("now", "right now", "immediately"):
+        return None if match.group("hour") or match.group("noon") else partial(_after, 0)
+
+    period = next((p for p in _PERIOD_DEFAULTS if anchor and anchor.endswith(p)), None)
+    if anchor == "tonight":
+        period = "tonight"
+    pm_hint = period in ("afternoon", "evening", "night", "tonight")
+    day_shift = 0
+
+    if noon := match.group("noon"):
+        hour = 12 if noon == "noon" else 0
+        # 今天（今晚）的午夜指当天结束时
+        day_shift = int(noon == "midnight" and anchor in ("today", "tonight"))
+    elif match.group("hour") is not None:
+        hour = int(match.group("hour"))
+        minute = int(match.group("minute") or 0)
+        ampm = (match.group("ampm") or "").replace(".", "")
+        # 没有上下文的裸数字（如 "at 8"）交由 dateparser 处理
+        if not anchor and not ampm and match.group("minute") is None:
+            return None
+        if hour in _SMALL_HOURS and period in _LATE_NIGHT_PERIODS and not ampm.startswith(("a", "p")):
+            # 夜间的凌晨时刻指次日凌晨（如 "tonight at 2"）
+            day_shift = 1
+        else:
+            hour = _to_24h(hour, ampm, pm_hint)
+        if hour > 23 or minute > 59:
+            return None
+        if hour == 12 and period in _NIGHT_PERIODS and not ampm.startswith(("a", "p")):
+            # 夜间的 12 点指午夜
+            hour, day_shift = 0, 1
+    elif period:
+        hour = 20 if period == "tonight" else _PERIOD_DEFAULTS[period]
+
+    if not anchor:
+        return partial(_at, 0, hour, minute, True)
+
+    for index, weekday in enumerate(_WEEKDAYS):
+        if weekday in anchor:
+            hour = 9 if hour is None else hour
+            return partial(_at_weekday, index, anchor.startswith("next"), hour, minute, day_shift)
+
+    day_offset = 2 if anchor.startswith("the day after") else 1 if anchor.startswith("tomorrow") else 0
+    # 当天的时刻已过去时顺延一天，不返回过去的时间
+    return partial(_at, day_offset + day_shift, hour, minute, day_offset + day_shift == 0)
+
+
+def _compile_cn_relative(match: re.Match) -> Optional[Resolver]:
+    number = 0.5 if match.group("n") == "半" else _cn_to_int(match.group("n"))
+    return partial(_after, number * _CN_UNIT_SECONDS[match.group("unit")[0]])
+
+
+def _compile_cn_absolute(match: re.Match) -> Optional[Resolver]:
+    day, period = match.group("day"), match.group("period")
+    if not (day or period or match.group("hour")):
+        return None
+    # 单独的“今/明”必须与时段连用（如“今晚”“明早”）
+    if day in ("今", "明") and not period:
+        return None
+
+    hour: Optional[int] = None
+    minute = 0
+    day_shift = 0
+    if match.group("hour"):
+        hour = _cn_to_int(match.group("hour"))
+        if match.group("half"):
+            minute = 30
+        elif quarter := match.group("quarter"):
+            minute = 15 if quarter == "一刻" else 45
+        elif match.group("minute"):
+            minute = _cn_to_int(match.group("minute"))
+
+        if period in _CN_NIGHT_PERIODS and hour == 12:
+            # 夜间的 12 点指午夜
+            hour, day_shift = 0, 1
+        elif period in _CN_NIGHT_PERIODS and hour in _SMALL_HOURS:
+            # 夜间的凌晨时刻指次日凌晨（如“晚上1点”）
+            day_shift = 1
+        elif period == "凌晨" and hour == 12:
+            hour = 0
+        elif period in ("下午", "傍晚", "晚上", "晚") and hour < 12:
+            hour += 12
+        elif period == "中午" and hour < 6:
+            hour += 12
+        elif period == "夜里" and 6 <= hour < 12:
+            hour += 12
+    elif period:
+        hour = _CN_PERIOD_DEFAULTS[period]
+
+    if hour is None or hour > 23 or minute > 59:
+        return None if hour is not None else partial(_at, _CN_DAY_OFFSETS[day], None, 0, False)
+
+    day_offset = (_CN_DAY_OFFSETS[day] if day else 0) + day_shift
+    # 当天的时刻已过去时顺延一天，不返回过去的时间
+    return partial(_at, day_offset, hour, minute, day_offset == 0)
+
+
+_RULES: list[tuple[re.Pattern, Callable[[re.Match], Optional[Resolver]]]] = [
+    (EN_RELATIVE, _compile_en_relative),
+    (EN_ANCHOR_FIRST, _compile_en_absolute),
+    (EN_TIME_FIRST, _compile_en_absolute),
+    (CN_RELATIVE, _compile_cn_relative),
+    (CN_ABSOLUTE, _compile_cn_absolute),
+]
+
+
+@lru_cache(maxsize=1024)
+def compile_phrase(phrase: str) -> Optional[Resolver]:
+    """
+    将规范化后的短语编译为时间解析函数，无法通过快速路径解析时返回 None
+    """
+    for pattern, compiler in _RULES:
+        if match := pattern.match(phrase):
+            try:
+                if resolver := compiler(match):
+                    return resolver
+            except (KeyError, ValueError):
+                continue
+    return None
+
+
+def parse_time_fast(natural_time: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    通过快速路径解析时间，无法解析时返回 None
+    """
+    resolver = compile_phrase(normalize(natural_time))
+    return resolver(now or datetime.now()) if resolver else None
+
+
+DATEPARSER_CACHE_SIZE = 512
+"""dateparser 解析结果缓存的最大条目数"""
+_dateparser_cache: OrderedDict[str, Optional[datetime]] = OrderedDict()
+"""dateparser 解析结果缓存（仅缓存与当前时间无关的绝对时间与解析失败）"""
+
+
+def _parse_with_dateparser(phrase: str, now: datetime) -> Optional[datetime]:
+    if phrase in _dateparser_cache:
+        _dateparser_cache.move_to_end(phrase)
+        return _dateparser_cache[phrase]
+
+    import dateparser
+
+    settings = {"PREFER_DATES_FROM": "future", "RELATIVE_BASE": now}
+    result = dateparser.parse(phrase, settings=settings)  # type:ignore
+
+    # 以另一个基准时间再次解析，结果不变说明是绝对时间，可以缓存
+    if result is not None:
+        settings["RELATIVE_BASE"] = now + timedelta(hours=1, minutes=1)
+        if dateparser.parse(phrase, settings=settings) != result:  # type:ignore
+            return result
+
+    _dateparser_cache[phrase] = result
+    while len(_dateparser_cache) > DATEPARSER_CACHE_SIZE:
+        _dateparser_cache.popitem(last=False)
+    return result
+
+
+def parse_time(natural_time: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    解析自然语言时间（同步版本，回退至 dateparser 时会阻塞）
+
+    :param natural_time: 自然语言时间描述
+    :param now: 基准时间，默认为当前时间
+    """
+    now = now or datetime.now()
+    if (result := parse_time_fast(natural_time, now)) is not None:
+        return result
+    return _parse_with_dateparser(normalize(natural_time), now)
+
+
+async def parse_time_async(natural_time: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    解析自然语言时间，回退至 dateparser 时在事件循环外执行
+
+    :param natural_time: 自然语言时间描述
+    :param now: 基准时间，默认为当前时间
+    """
+    now = now or datetime.now()
+    if (result := parse_time_fast(natural_time, now)) is not None:
+        return result
+    return await asyncio.to_thread(_parse_with_dateparser, normalize(natural_time), now)
@@ -1,16 +1,17 @@
+import asyncio
 import base64
 import os
-import ssl
 import sys
 import time
+from functools import lru_cache
 from importlib.metadata import PackageNotFoundError, version
 from io import BytesIO
 from mimetypes import guess_type
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
+from urllib.parse import urlparse
 
 import fleep
-import httpx
 import nonebot_plugin_localstore as store
 from nonebot import get_bot, logger
 from nonebot.adapters import Event, MessageSegment
@@ -21,6 +22,8 @@ from nonebot_plugin_userinfo import get_user_info
 from ..config import mas_config
 from ..models import Resource
 from .adapters import ADAPTER_CLASSES
+from .downloader import Downloader
+from .file_store import FileStore
 
 FILES_DIR = store.get_plugin_data_dir() / "files"
 FILES_CACHED_DIR = store.get_plugin_cache_dir() / "files"
@@ -28,38 +31,52 @@ FILES_CACHED_DIR = store.get_plugin_cache_dir() / "files"
 FILES_DIR.mkdir(parents=True, exist_ok=True)
 FILES_CACHED_DIR.mkdir(parents=True, exist_ok=True)
 
+file_store = FileStore(
+    FILES_DIR, quota=mas_config.files_quota_mb * 1024 * 1024, max_age=mas_config.files_max_age_days * 86400
+)
+"""多模态文件存储"""
+cached_file_store = FileStore(
+    FILES_CACHED_DIR, quota=mas_config.files_quota_mb * 1024 * 1024, max_age=mas_config.files_max_age_days * 86400
+)
+"""多模态文件缓存存储"""
+
 User_Agent = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
     "AppleWebKit/537.36 (KHTML, like Gecko)"
     "Chrome/134.0.0.0 Safari/537.36 Edg/134.0.0.0"
 )
 
+downloader = Downloader(headers={"User-Agent": User_Agent})
+"""共享下载服务"""
+
 
 async def download_file(
-    file_url: str, file_name: Optional[str] = None, proxy: Optional[str] = None, cache: bool = False
+    file_url: str,
+    file_name: Optional[str] = None,
+    proxy: Optional[str] = None,
+    cache: bool = False,
+    max_size: Optional[int] = None,
 ) -> str:
     """
     保存文件至本地目录(在未提供后缀的情况下, 默认为.jpg后缀)
 
+    文件以内容哈希命名，相同内容的文件只会保存一份
+
     :param file_url: 图片在线地址
-    :param file_name: 要保存的文件名
+    :param file_name: 原始文件名（仅用于确定文件后缀）
     :param proxy: 代理地址
     :param cache: 保存至缓存目录
+    :param max_size: 文件最大大小（字节），为 None 则不限制
 
     :return: 保存后的本地目录
+
+    :raise ValueError: 文件大小超出限制
     """
-    ssl_context = ssl.create_default_context()
-    ssl_context.set_ciphers("DEFAULT")
-    file_subfix = file_url.split(".")[-1].lower() if "." in file_url else "jpg"
-    file_name = file_name if file_name else f"{time.time_ns()}.{file_subfix}"
+    _, suffix = os.path.splitext(file_name or urlparse(file_url).path)
+    suffix = suffix.lower() or ".jpg"
+    store = cached_file_store if cache else file_store
 
-    async with httpx.AsyncClient(proxy=proxy, verify=ssl_context) as client:
-        r = await client.get(file_url, headers={"User-Agent": User_Agent})
-        file_dir = FILES_CACHED_DIR if cache else FILES_DIR
-        local_path = (file_dir / file_name).resolve()
-        with open(local_path, "wb") as file:
-            file.write(r.content)
-        return str(local_path)
+    return await downloader.download(file_url, store, suffix=suffix, proxy=proxy, max_size=max_size)
 
 
 async def save_image_as_base64(image_url: str, proxy: Optional[str] = None) -> str:
@@ -69,12 +86,9 @@ async def save_image_as_base64(image_url: str, proxy: Optional[str] = None) -> s
     :image_url: 图片在线地址
     :return: 本地地址
     """
-    ssl_context = ssl.create_default_context()
-    ssl_context.set_ciphers("DEFAULT")
-
-    async with httpx.AsyncClient(proxy=proxy, verify=ssl_context) as client:
-        r = await client.get(image_url, headers={"User-Agent": User_Agent})
-        image_base64 = base64.b64encode(r.content)
+    client = downloader.get_client(proxy)
+    r = await client.get(image_url)
+    image_base64 = base64.b64encode(r.content)
     return image_base64.decode("utf-8")
 
 
@@ -216,6 +230,49 @@ async def get_username(user_id: Optional[str] = None, event: Optional[Event] = N
     return user_info.user_name if user_info else user_id
 
 
+def _sniff_mimetype(header: Optional[bytes], path: str = "") -> Optional[str]:
+    """
+    根据文件头（及路径后缀）判断 mimetype
+    """
+    if header:
+        info = fleep.get(header)
+
+        # fleep 对于文档类文件失准，如果有后缀就不判断了
+        if info.type and info.type[0] == "document" and Path(path).suffix:
+            return None
+
+        if info.mime:
+            return info.mime[0]
+    elif path:
+        return guess_type(path)[0]
+
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _guess_file_mimetype(path: str, mtime_ns: int, size: int) -> Optional[str]:
+    """
+    读取文件头判断 mimetype，结果按 (路径, 修改时间, 文件大小) 缓存
+    """
+    try:
+        with open(path, "rb") as file:
+            header = file.read(128)
+    except Exception as e:
+        logger.warning(f"读取文件头时发生错误: {e} | {path}")
+        header = None
+
+    return _sniff_mimetype(header, path)
+
+
+def _read_raw_header(raw: Union[bytes, BytesIO]) -> bytes:
+    """
+    读取原始数据头，不改变 BytesIO 的读取位置
+    """
+    if isinstance(raw, BytesIO):
+        return raw.getbuffer()[:128].tobytes()
+    return raw[:128]
+
+
 def guess_mimetype(resource: Resource) -> Optional[str]:
     """
     尝试获取 minetype 类型
@@ -224,37 +281,28 @@ def guess_mimetype(resource: Resource) -> Optional[str]:
         return guess_type(resource.url)[0]
 
     elif resource.path and os.path.exists(resource.path):
-        try:
-            with open(resource.path, "rb") as file:
-                header = file.read(128)
-        except Exception as e:
-            logger.warning(f"读取文件头时发生错误: {e} | {resource}")
-            header = None
+        stat = os.stat(resource.path)
+        return _guess_file_mimetype(os.path.abspath(resource.path), stat.st_mtime_ns, stat.st_size)
 
     elif resource.raw:
         try:
-            header = resource.raw.read(128) if isinstance(resource.raw, BytesIO) else resource.raw[:128]
+            header = _read_raw_header(resource.raw)
         except Exception as e:
             logger.warning(f"读取原始数据头时发生错误: {e} | {resource}")
             return None
+        return _sniff_mimetype(header, resource.path)
 
-    else:
-        logger.warning(f"此实例无法获取元类型! {resource}")
-        return None
-
-    if header:
-        info = fleep.get(header)
+    logger.warning(f"此实例无法获取元类型! {resource}")
+    return None
 
-        # fleep 对于文档类文件失准，如果有后缀就不判断了
-        if info.type and info.type[0] == "document" and Path(resource.path).suffix:
-            return None
 
-        if info.mime:
-            return info.mime[0]
-    elif resource.path:
-        return guess_type(resource.path)[0]
-
-    return None
+async def guess_mimetype_async(resource: Resource) -> Optional[str]:
+    """
+    尝试获取 minetype 类型，读取本地文件头的操作在事件循环外进行
+    """
+    if resource.path and not resource.url:
+        return await asyncio.to_thread(guess_mimetype, resource)
+    return guess_mimetype(resource)
 
 
 def clamp(value: float, min_value: float, max_value: float) -> float:
@@ -0,0 +1,29 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import nonebot
+
+WORKDIR = Path(tempfile.mkdtemp(prefix="muika-test-"))
+"""测试工作目录（模型配置与插件数据）"""
+
+MODELS_CONFIG = """
+echo:
+  provider: _echo
+  default: true
+"""
+
+
+def pytest_configure(config):
+    (WORKDIR / "configs").mkdir()
+    (WORKDIR / "configs" / "models.yml").write_text(MODELS_CONFIG, encoding="utf-8")
+
+    # 跳过首次运行时的用户协议确认
+    agreement = WORKDIR / "data" / "muika" / "user_agreement.json"
+    agreement.parent.mkdir(parents=True)
+    agreement.write_text(json.dumps({"has_agreed": True, "timestamp": "2026-02-01T00:00:00", "version": "2099-01-01"}))
+
+    os.chdir(WORKDIR)
+    nonebot.init(superusers={"10000"}, localstore_use_cwd=True)
+    nonebot.load_plugin("muika")
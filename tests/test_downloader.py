@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import httpx
+import pytest
+
+from muika.utils.downloader import Downloader
+from muika.utils.file_store import FileStore
+
+
+class AvatarServer:
+    """
+    模拟头像服务：支持 ETag 条件请求，内容可被替换
+    """
+
+    def __init__(self) -> None:
+        self.content = b"avatar-v1"
+        self.requests: list[httpx.Request] = []
+
+    @property
+    def etag(self) -> str:
+        return f'"{hash(self.content)}"'
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304)
+        return httpx.Response(200, content=self.content, headers={"ETag": self.etag})
+
+
+@pytest.fixture
+def server() -> AvatarServer:
+    return AvatarServer()
+
+
+def _downloader(server: AvatarServer, ttl: float) -> Downloader:
+    downloader = Downloader(url_cache_ttl=ttl)
+    downloader._clients[None] = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    return downloader
+
+
+async def test_repeated_download_within_ttl_skips_request(server: AvatarServer, tmp_path: Path):
+    downloader = _downloader(server, ttl=600)
+    store = FileStore(tmp_path)
+
+    first = await downloader.download("https://example.com/avatar", store, ".jpg")
+    second = await downloader.download("https://example.com/avatar", store, ".jpg")
+
+    assert first == second
+    assert len(server.requests) == 1
+
+
+async def test_expired_entry_is_revalidated(server: AvatarServer, tmp_path: Path):
+    downloader = _downloader(server, ttl=0)
+    store = FileStore(tmp_path)
+
+    first = await downloader.download("https://example.com/avatar", store, ".jpg")
+    second = await downloader.download("https://example.com/avatar", store, ".jpg")
+    assert second == first
+    assert server.requests[1].headers["If-None-Match"] == server.etag
+
+    # 同一 URL 的内容已变化，应返回新的文件
+    server.content = b"avatar-v2"
+    third = await downloader.download("https://example.com/avatar", store, ".jpg")
+    assert third != first
+    assert Path(third).read_bytes() == b"avatar-v2"
+    assert len(server.requests) == 3
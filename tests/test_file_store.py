@@ -0,0 +1,41 @@
+import hashlib
+from pathlib import Path
+
+from muika.utils.file_store import FileStore
+
+
+async def _write(store: FileStore, content: bytes) -> Path:
+    temp_path = store.root / f".{len(content)}.part"
+    temp_path.write_bytes(content)
+    path = await store.commit(temp_path, hashlib.sha256(content).hexdigest(), ".bin")
+    await store.add(path, len(content))
+    return path
+
+
+def test_path_for_does_not_touch_filesystem(tmp_path: Path):
+    store = FileStore(tmp_path)
+    path = store.path_for("abcdef", ".jpg")
+    assert path == tmp_path.resolve() / "ab" / "abcdef.jpg"
+    assert not path.parent.exists()
+
+
+async def test_commit_deduplicates_content(tmp_path: Path):
+    store = FileStore(tmp_path)
+    first = await _write(store, b"hello")
+    second = await _write(store, b"hello")
+
+    assert first == second
+    assert first.read_bytes() == b"hello"
+    assert not list(tmp_path.glob(".*.part"))
+    assert store.stats()["files"] == 1
+
+
+async def test_evicted_files_are_filtered_from_history(tmp_path: Path):
+    # 超出配额时淘汰未被引用的旧文件；数据库中的消息仍可能引用它们
+    store = FileStore(tmp_path, quota=8, retention=0)
+    old = await _write(store, b"old-file")
+    store.retain([str(old)])
+    recent = await _write(store, b"new-file")
+
+    assert old.exists() and not recent.exists()
+    assert await store.existing([str(old), str(recent), ""]) == {str(old)}
@@ -0,0 +1,47 @@
+from collections import deque
+
+from muika.llm import HistoryBudget, ModelRequest
+from muika.llm.history import SUMMARY_CHUNK_TURNS
+from muika.models import Message
+
+
+async def test_sliding_window_summarizes_each_turn_once():
+    calls = 0
+
+    async def summarize(previous: str, text: str) -> str:
+        nonlocal calls
+        calls += 1
+        return ",".join(filter(None, [previous, *text.splitlines()]))
+
+    # 每轮 10 tokens，预算内保留约 10 轮；与 MemoryManager 一样只保留最近 64 轮
+    budget = HistoryBudget(max_tokens=200, summary_max_tokens=100, summarizer=summarize)
+    window: deque[str] = deque(maxlen=64)
+    per_turn: list[int] = []
+    for index in range(100):
+        window.append(f"turn {index}")
+        before = calls
+        compacted = await budget.compact(list(window), str, lambda turn: 10)
+        per_turn.append(calls - before)
+
+    # 首次超出预算时一次性折叠，此后每轮至多摘要一次
+    first_fold = next(index for index, count in enumerate(per_turn) if count)
+    assert max(per_turn[first_fold + 1 :]) <= 1
+    assert calls <= 100 // SUMMARY_CHUNK_TURNS + 1
+
+    # 滚动摘要仍包括已滑出窗口的对话
+    first = 100 - len(window)
+    assert compacted.summary.split(",") == [f"turn {index}" for index in range(first + compacted.folded)]
+    assert compacted.turns == list(window)[compacted.folded :]
+
+
+async def test_compact_request_leaves_original_request_untouched():
+    history = [Message(message=f"message {index} " * 20, respond=f"respond {index} " * 20) for index in range(20)]
+    request = ModelRequest("hello", history=history, system="system")
+    budget = HistoryBudget(max_tokens=300, summary_max_tokens=100)
+
+    compacted = await budget.compact_request(request)
+
+    assert request.history == history and len(request.history) == 20
+    assert request.system == "system"
+    assert len(compacted.history) < len(history)
+    assert compacted.system.startswith("system\n\nSummary of the earlier conversation:")
@@ -0,0 +1,106 @@
+import json
+import random
+import time
+from typing import Any
+
+import pytest
+
+from muika.llm.utils.json_utils import IncrementalJSONParser, extract_json_from_text
+
+COGNITIVE_RESULT = {
+    "action": {"name": "send_message", "content": '早上好呀~ 今天也要{加油}哦！\\n"嘿嘿"', "confidence": 0.9},
+    "memory": {"type": "remember", "key": "favorite_food", "value": "草莓蛋糕 [最爱]"},
+}
+COGNITIVE_JSON = json.dumps(COGNITIVE_RESULT, ensure_ascii=False)
+
+CORPUS: list[tuple[str, Any]] = [
+    (COGNITIVE_JSON, COGNITIVE_RESULT),
+    (json.dumps(COGNITIVE_RESULT, ensure_ascii=False, indent=2), COGNITIVE_RESULT),
+    (f"```json\n{COGNITIVE_JSON}\n```", COGNITIVE_RESULT),
+    (f"Sure! Here is my decision:\n```json\n{COGNITIVE_JSON}\n```\nAnything {{else}}?", COGNITIVE_RESULT),
+    (f'<think>Should I output {{"action": null}}? No...</think>\n{COGNITIVE_JSON}', COGNITIVE_RESULT),
+    (f"<think>\n[1] The user is {{happy}}.\n</think>\n\n```\n{COGNITIVE_JSON}\n```", COGNITIVE_RESULT),
+    (f"Output (see [schema]): {COGNITIVE_JSON} -- {{end}}", COGNITIVE_RESULT),
+    (f'{COGNITIVE_JSON}\n\nP.S. {{"extra": true}}', COGNITIVE_RESULT),
+    (f"I think {{ the answer is\n{COGNITIVE_JSON}", COGNITIVE_RESULT),
+    ('[{"title": "a"}, {"title": "b"}]', [{"title": "a"}, {"title": "b"}]),
+    ('Results:\n[{"title": "a]"}, {"title": "b"}]\nDone.', [{"title": "a]"}, {"title": "b"}]),
+    ('{"text": "第一行\n第二行"}', {"text": "第一行\n第二行"}),
+]
+"""语料：(模型输出, 期望结果)"""
+
+FUZZ_PROSE = ["Sure!", "Here you go:", "{note}", "[1]", "见 {上文}", '<think>{"draft": 1}</think>', "}", "]", '"q"']
+"""模糊测试中包裹 JSON 的正文片段"""
+
+
+def _random_value(rng: random.Random, depth: int = 0) -> Any:
+    kind = rng.randrange(7 if depth < 3 else 4)
+    if kind == 0:
+        return rng.randint(-1000, 1000)
+    if kind == 1:
+        return rng.choice([True, False, None, 1.5])
+    if kind in (2, 3):
+        return "".join(rng.choice('ab{}[]"\\:, 你好\n') for _ in range(rng.randrange(12)))
+    if kind in (4, 5):
+        return {f"k{i}": _random_value(rng, depth + 1) for i in range(rng.randrange(4))}
+    return [_random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+
+
+@pytest.mark.parametrize(("text", "expected"), CORPUS)
+def test_extract_json_from_text(text: str, expected: Any):
+    assert extract_json_from_text(text) == expected
+
+
+def test_extract_json_fuzz():
+    # 随机生成 JSON 对象，以随机的正文、`<think>` 块与代码块包裹后检查能否被正确提取
+    rng = random.Random(0)
+    failures: list[str] = []
+    for _ in range(1000):
+        expected = {"action": _random_value(rng), "memory": _random_value(rng)}
+        payload = json.dumps(expected, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]))
+        if rng.random() < 0.5:
+            payload = f"```json\n{payload}\n```"
+        before = " ".join(rng.choice(FUZZ_PROSE) for _ in range(rng.randrange(3)) if rng.random() < 0.7)
+        after = " ".join(rng.choice(FUZZ_PROSE) for _ in range(rng.randrange(3)))
+        text = f"{before}\n{payload}\n{after}"
+
+        try:
+            result = extract_json_from_text(text)
+        except ValueError:
+            result = None
+        if result != expected:
+            failures.append(text)
+
+    assert not failures
+
+
+@pytest.mark.parametrize("text", [text for text, _ in CORPUS[:6]])
+def test_incremental_parser_matches_extract(text: str):
+    parser = IncrementalJSONParser()
+    members = []
+    for start in range(0, len(text), 7):
+        members.extend(parser.feed(text[start : start + 7]))
+        if parser.done:
+            break
+
+    expected = extract_json_from_text(text)
+    assert parser.done and parser.result == expected
+    assert dict(members) == expected
+
+
+def _best_time(text: str, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assert extract_json_from_text(text) == COGNITIVE_RESULT
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_extract_json_scales_linearly():
+    # 长篇输出：大量正文（含不成对的括号）之后才出现 JSON
+    def large(scale: int) -> str:
+        return "这是一段很长的内心独白 {其中有括号} [以及引用] " * scale + f"\n```json\n{COGNITIVE_JSON}\n```"
+
+    # 正文增长 10 倍时耗时应接近 10 倍（平方复杂度为 100 倍），留出足够的余量
+    assert _best_time(large(2000)) < _best_time(large(200)) * 30
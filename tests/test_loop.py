@@ -0,0 +1,56 @@
+from muika.config import mas_config
+from muika.core.events import UserMessageEvent, UserMessagePayload
+from muika.core.executor import ActionResult, ExecutionOutcome
+from muika.core.intents import Intent
+from muika.core.loop import Muika
+from muika.core.state import MuikaState
+from muika.llm import ModelRequest, ModelStreamCompletions
+from muika.models import Message
+
+STREAM_CHUNKS = [
+    '{"action": {"name": "send_message", "content": "Hi~", ',
+    '"confidence": 0.9}, ',
+    '"memory": null}',
+]
+"""模拟的流式输出"""
+
+
+async def test_stream_cognition_sends_early_action_once(monkeypatch):
+    monkeypatch.setattr(mas_config, "stream_cognition", True)
+    muika = Muika()
+    event = UserMessageEvent(UserMessagePayload(Message(message="hello")))
+
+    async def ask(request: ModelRequest, event, state: MuikaState, *, stream: bool = False):
+        async def generate():
+            for chunk in STREAM_CHUNKS:
+                yield ModelStreamCompletions(chunk)
+
+        return generate()
+
+    executed: list[Intent] = []
+
+    async def execute(intent: Intent, state: MuikaState) -> ExecutionOutcome:
+        executed.append(intent)
+        return ExecutionOutcome(executed=True, result=ActionResult(success=True, output="sent"))
+
+    async def collect_events():
+        # 只运行一轮循环
+        muika.is_alive = False
+        return event
+
+    monkeypatch.setattr(muika.brain.router, "ask", ask)
+    monkeypatch.setattr(muika.executor, "execute", execute)
+    monkeypatch.setattr(muika, "collect_events", collect_events)
+
+    muika.is_alive = True
+    await muika.loop()
+
+    assert [intent.name for intent in executed] == ["send_message"]
+    assert not muika.state.pending_intents
+
+
+def test_history_summarizer_is_local_by_default(monkeypatch):
+    assert Muika().memory.history.summarizer is None
+
+    monkeypatch.setattr(mas_config, "history_summarize", True)
+    assert Muika().memory.history.summarizer is not None
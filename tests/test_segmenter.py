@@ -0,0 +1,56 @@
+import re
+
+from muika.utils import segmenter as segmenter_module
+from muika.utils.segmenter import StreamSegmenter
+
+
+def _feed_all(segmenter: StreamSegmenter, chunks: list[str]) -> list[str]:
+    segments = [segment for chunk in chunks for segment in segmenter.feed(chunk)]
+    if rest := segmenter.close():
+        segments.append(rest)
+    return segments
+
+
+def test_blank_lines_split_paragraphs_across_chunks():
+    segmenter = StreamSegmenter(flush_interval=0, max_length=0)
+    assert _feed_all(segmenter, ["第一段\n", "\n第二", "段\n\n第三段"]) == ["第一段", "第二段", "第三段"]
+
+
+def test_flush_at_last_sentence_boundary():
+    segmenter = StreamSegmenter(flush_interval=0, max_length=10)
+    chunks = ["你好呀。今天", "天气不错！", "”我们", "去散步吧"]
+    assert _feed_all(segmenter, chunks) == ["你好呀。今天天气不错！", "”我们去散步吧"]
+
+
+def test_boundary_split_across_chunks():
+    segmenter = StreamSegmenter(flush_interval=0, max_length=16)
+    # 句号与其后的空白、连续的感叹号分别位于不同的块中
+    segments = _feed_all(segmenter, ["Hi", " there.", " How", " are", " you!", "!", " fine"])
+    assert segments == ["Hi there.", "How are you!!", "fine"]
+
+
+def test_each_character_is_scanned_once(monkeypatch):
+    scanned = 0
+    pattern = segmenter_module.SENTENCE_BOUNDARY
+
+    class CountingPattern:
+        def finditer(self, text: str):
+            nonlocal scanned
+            scanned += len(text)
+            return pattern.finditer(text)
+
+    monkeypatch.setattr(segmenter_module, "SENTENCE_BOUNDARY", CountingPattern())
+
+    # 等待时间已到但没有句子边界：每块都会尝试提前切分
+    segmenter = StreamSegmenter(flush_interval=1e-9, max_length=0)
+    chunks = ["没有标点的长回复" for _ in range(500)]
+    assert _feed_all(segmenter, chunks) == ["".join(chunks)]
+    assert scanned == sum(map(len, chunks))
+
+
+def test_sentence_boundary_pattern():
+    assert [m.group() for m in re.finditer(segmenter_module.SENTENCE_BOUNDARY, "好！”呀…… ok. end.")] == [
+        "！”",
+        "……",
+        ".",
+    ]
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+
+from muika.utils import time_parser
+from muika.utils.time_parser import (
+    compile_phrase,
+    normalize,
+    parse_time,
+    parse_time_fast,
+)
+
+NOW = datetime(2026, 10, 18, 14, 30)
+"""基准时间（周日 14:30）"""
+
+CORPUS: list[tuple[str, datetime]] = [
+    ("in 10 minutes", datetime(2026, 10, 18, 14, 40)),
+    ("in 5 mins", datetime(2026, 10, 18, 14, 35)),
+    ("in an hour", datetime(2026, 10, 18, 15, 30)),
+    ("in half an hour", datetime(2026, 10, 18, 15, 0)),
+    ("in 2 hours", datetime(2026, 10, 18, 16, 30)),
+    ("in 1.5 hours", datetime(2026, 10, 18, 16, 0)),
+    ("in a few minutes", datetime(2026, 10, 18, 14, 33)),
+    ("in 3 days", datetime(2026, 10, 21, 14, 30)),
+    ("in a week", datetime(2026, 10, 25, 14, 30)),
+    ("30 seconds later", datetime(2026, 10, 18, 14, 30, 30)),
+    ("20 minutes from now", datetime(2026, 10, 18, 14, 50)),
+    ("now", datetime(2026, 10, 18, 14, 30)),
+    ("tonight", datetime(2026, 10, 18, 20, 0)),
+    ("tonight at 9", datetime(2026, 10, 18, 21, 0)),
+    ("tonight at 10:30pm", datetime(2026, 10, 18, 22, 30)),
+    ("tonight at 12", datetime(2026, 10, 19, 0, 0)),
+    ("tonight at midnight", datetime(2026, 10, 19, 0, 0)),
+    ("tonight at 2", datetime(2026, 10, 19, 2, 0)),
+    ("tonight at 1am", datetime(2026, 10, 19, 1, 0)),
+    ("tonight at 5:30", datetime(2026, 10, 19, 5, 30)),
+    ("this evening", datetime(2026, 10, 18, 19, 0)),
+    ("this afternoon at 2", datetime(2026, 10, 19, 14, 0)),
+    ("this afternoon at 4", datetime(2026, 10, 18, 16, 0)),
+    ("this morning", datetime(2026, 10, 19, 9, 0)),
+    ("today at 5pm", datetime(2026, 10, 18, 17, 0)),
+    ("today at 9am", datetime(2026, 10, 19, 9, 0)),
+    ("tomorrow", datetime(2026, 10, 19, 14, 30)),
+    ("tomorrow at 8am", datetime(2026, 10, 19, 8, 0)),
+    ("Tomorrow at 8 AM.", datetime(2026, 10, 19, 8, 0)),
+    ("tomorrow morning", datetime(2026, 10, 19, 9, 0)),
+    ("tomorrow night", datetime(2026, 10, 19, 21, 0)),
+    ("tomorrow night at 12", datetime(2026, 10, 20, 0, 0)),
+    ("tomorrow night at 1", datetime(2026, 10, 20, 1, 0)),
+    ("tomorrow at noon", datetime(2026, 10, 19, 12, 0)),
+    ("the day after tomorrow at 7:15pm", datetime(2026, 10, 20, 19, 15)),
+    ("at 8am", datetime(2026, 10, 19, 8, 0)),
+    ("at 6pm", datetime(2026, 10, 18, 18, 0)),
+    ("9:45 pm", datetime(2026, 10, 18, 21, 45)),
+    ("at 20:00", datetime(2026, 10, 18, 20, 0)),
+    ("8am tomorrow", datetime(2026, 10, 19, 8, 0)),
+    ("next monday", datetime(2026, 10, 19, 9, 0)),
+    ("on friday at 3pm", datetime(2026, 10, 23, 15, 0)),
+    ("friday night at 12", datetime(2026, 10, 24, 0, 0)),
+    ("friday night at 2", datetime(2026, 10, 24, 2, 0)),
+    ("next sunday", datetime(2026, 10, 25, 9, 0)),
+    ("10分钟后", datetime(2026, 10, 18, 14, 40)),
+    ("半小时后", datetime(2026, 10, 18, 15, 0)),
+    ("两个小时后", datetime(2026, 10, 18, 16, 30)),
+    ("三天后", datetime(2026, 10, 21, 14, 30)),
+    ("今晚", datetime(2026, 10, 18, 20, 0)),
+    ("今晚8点", datetime(2026, 10, 18, 20, 0)),
+    ("今晚12点", datetime(2026, 10, 19, 0, 0)),
+    ("晚上12点", datetime(2026, 10, 19, 0, 0)),
+    ("明晚12点", datetime(2026, 10, 20, 0, 0)),
+    ("凌晨12点", datetime(2026, 10, 19, 0, 0)),
+    ("晚上1点", datetime(2026, 10, 19, 1, 0)),
+    ("今晚2点", datetime(2026, 10, 19, 2, 0)),
+    ("明晚1点", datetime(2026, 10, 20, 1, 0)),
+    ("夜里3点", datetime(2026, 10, 19, 3, 0)),
+    ("今天下午2点", datetime(2026, 10, 19, 14, 0)),
+    ("下午2点", datetime(2026, 10, 19, 14, 0)),
+    ("明天早上八点半", datetime(2026, 10, 19, 8, 30)),
+    ("明早", datetime(2026, 10, 19, 8, 0)),
+    ("明天下午3点", datetime(2026, 10, 19, 15, 0)),
+    ("后天中午12点", datetime(2026, 10, 20, 12, 0)),
+    ("晚上十点一刻", datetime(2026, 10, 18, 22, 15)),
+    ("明天", datetime(2026, 10, 19, 14, 30)),
+]
+"""语料：(短语, 以 `NOW` 为基准的期望时间)"""
+
+
+@pytest.mark.parametrize(("phrase", "expected"), CORPUS)
+def test_parse_time_fast(phrase: str, expected: datetime):
+    assert parse_time_fast(phrase, NOW) == expected
+
+
+@pytest.mark.parametrize("phrase", [phrase for phrase, _ in CORPUS])
+def test_never_in_the_past(phrase: str):
+    result = parse_time_fast(phrase, NOW)
+    assert result is not None and result >= NOW
+
+
+def test_fast_path_skips_dateparser(monkeypatch):
+    def fail(phrase: str, now: datetime):
+        raise AssertionError(f"快速路径应能解析: {phrase}")
+
+    monkeypatch.setattr(time_parser, "_parse_with_dateparser", fail)
+    for phrase, expected in CORPUS:
+        assert parse_time(phrase, NOW) == expected
+
+
+def test_compiled_phrases_are_cached():
+    compile_phrase.cache_clear()
+    for _ in range(3):
+        for phrase, _ in CORPUS:
+            parse_time_fast(phrase, NOW)
+
+    # 每个规范化后的短语只编译一次
+    phrases = {normalize(phrase) for phrase, _ in CORPUS}
+    info = compile_phrase.cache_info()
+    assert info.misses == len(phrases)
+    assert info.hits == 3 * len(CORPUS) - len(phrases)
@@ -0,0 +1,40 @@
+import pytest
+
+from muika.core import triage as triage_module
+from muika.core.events import UserMessageEvent, UserMessagePayload
+from muika.core.state import MuikaState
+from muika.core.triage import create_default_triage
+from muika.llm import ModelConfig
+from muika.models import Message, Resource
+
+
+def _user_message(text: str = "", resources: list[Resource] | None = None) -> UserMessageEvent:
+    return UserMessageEvent(UserMessagePayload(Message(message=text, resources=resources or [])))
+
+
+@pytest.fixture
+def multimodal(monkeypatch):
+    config = ModelConfig(provider="_echo", multimodal=True)
+    monkeypatch.setattr(triage_module, "get_model_config", lambda: config)
+
+
+async def test_sticker_only_message_uses_template():
+    result = await create_default_triage().evaluate(_user_message(), MuikaState())
+    assert result.decision == "template"
+
+
+async def test_media_only_message_uses_template_without_multimodal_model():
+    event = _user_message(resources=[Resource("image", path="photo.jpg")])
+    result = await create_default_triage().evaluate(event, MuikaState())
+    assert result.decision == "template"
+
+
+async def test_media_only_message_is_escalated_with_multimodal_model(multimodal):
+    event = _user_message(resources=[Resource("image", path="photo.jpg")])
+    result = await create_default_triage().evaluate(event, MuikaState())
+    assert result.decision == "think"
+
+
+async def test_text_message_is_escalated():
+    result = await create_default_triage().evaluate(_user_message("hello"), MuikaState())
+    assert result.decision == "think"
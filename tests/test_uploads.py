@@ -0,0 +1,118 @@
+from pathlib import Path
+from uuid import uuid4
+
+import httpx
+import openai
+import pytest
+
+from muika.llm import ModelConfig, ModelRequest
+from muika.llm.providers.openai import Openai
+from muika.llm.utils.uploads import UploadRegistry, upload_registry
+from muika.models import Resource
+
+
+class FilesServer:
+    """
+    本地替身文件接口：记录上传请求并依次分配文件 ID
+    """
+
+    def __init__(self) -> None:
+        self.uploads = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        assert request.method == "POST" and request.url.path.endswith("/files")
+        self.uploads += 1
+        return httpx.Response(
+            200,
+            json={
+                "id": f"file-{self.uploads}",
+                "object": "file",
+                "bytes": len(request.content),
+                "created_at": 0,
+                "filename": "document.txt",
+                "purpose": "user_data",
+                "status": "processed",
+            },
+        )
+
+
+@pytest.fixture
+def server() -> FilesServer:
+    return FilesServer()
+
+
+@pytest.fixture
+def document(tmp_path: Path) -> Resource:
+    path = tmp_path / "document.txt"
+    path.write_text("Muika's notes", encoding="utf-8")
+    return Resource("file", path=str(path))
+
+
+def _model(server: FilesServer) -> Openai:
+    # 每个测试使用独立的服务地址，使上传记录的作用域互不影响
+    api_host = f"http://files.test/{uuid4().hex}/v1"
+    config = ModelConfig(
+        provider="openai", api_key="test", model_name="test", api_host=api_host, multimodal=True, upload_files=True
+    )
+    model = Openai(config)
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    model.client = openai.AsyncOpenAI(api_key="test", base_url=api_host, http_client=http_client)
+    return model
+
+
+def _file_ids(messages: list) -> list[str]:
+    return [
+        part["file"]["file_id"]
+        for message in messages
+        if isinstance(message["content"], list)
+        for part in message["content"]
+        if part["type"] == "file" and "file_id" in part["file"]
+    ]
+
+
+async def _send(model: Openai, document: Resource) -> list[str]:
+    request = await model._preload_resources(ModelRequest("read this", resources=[document]))
+    return _file_ids(model._build_messages(request))
+
+
+async def test_uploaded_file_is_reused(server: FilesServer, document: Resource):
+    model = _model(server)
+
+    assert await _send(model, document) == ["file-1"]
+    assert model.last_transfer_stats.uploaded_files == 1
+
+    assert await _send(model, document) == ["file-1"]
+    assert model.last_transfer_stats.reused_files == 1
+    assert model.last_transfer_stats.uploaded_files == 0
+    assert server.uploads == 1
+
+
+async def test_expired_upload_is_uploaded_again(server: FilesServer, document: Resource):
+    model = _model(server)
+    model.upload_ttl = 60
+
+    assert await _send(model, document) == ["file-1"]
+    # 提供者文件已过期
+    for entry in upload_registry._entries.values():
+        entry.uploaded_at -= 120
+
+    assert await _send(model, document) == ["file-2"]
+    assert model.last_transfer_stats.uploaded_files == 1
+    assert server.uploads == 2
+
+
+async def test_modified_file_is_uploaded_again(document: Resource):
+    registry = UploadRegistry()
+    uploaded: list[str] = []
+
+    async def upload(resource: Resource) -> str:
+        uploaded.append(resource.path)
+        return f"file-{len(uploaded)}"
+
+    await registry.ensure("scope", [document], upload)
+    assert registry.lookup("scope", document.path) == "file-1"
+
+    Path(document.path).write_text("Muika's updated notes", encoding="utf-8")
+    stats = await registry.ensure("scope", [document], upload)
+    assert stats.uploaded_files == 1
+    assert registry.lookup("scope", document.path) == "file-2"